@@ -0,0 +1,109 @@
+""" benchmark for throughput of AsyncHttpRunner compared with sequential HttpRunner.
+
+Usage:
+    $ pip install httpx
+    $ python benchmarks/async_runner_bench.py
+
+Each request is served in-process with a simulated server latency, thus the measured
+throughput shows how many requests are in flight at the same time.
+
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from loguru import logger
+from requests import Response
+from requests.adapters import BaseAdapter
+
+from httprunner.client import HttpSession
+from httprunner.ext.aio import AsyncHttpRunner
+from httprunner.loader import load_testcase
+from httprunner.models import ProjectMeta
+from httprunner.runner import HttpRunner
+
+LATENCY = 0.02  # seconds
+TESTCASES_COUNT = 500
+CONCURRENCY = 200
+
+
+class LatencyAdapter(BaseAdapter):
+    """ echo request url after simulated latency, without network io """
+
+    def send(self, request, **kwargs):
+        time.sleep(LATENCY)
+        resp = Response()
+        resp.status_code = 200
+        resp._content = b'{"url": "%s"}' % request.url.encode("utf-8")
+        resp.request = request
+        resp.url = request.url
+        return resp
+
+    def close(self):
+        pass
+
+
+async def handle_with_latency(request):
+    await asyncio.sleep(LATENCY)
+    return httpx.Response(200, json={"url": str(request.url)})
+
+
+def make_testcase():
+    return load_testcase(
+        {
+            "config": {
+                "name": "async runner benchmark",
+                "base_url": "http://httprunner.local",
+                "variables": {"uid": 1000},
+            },
+            "teststeps": [
+                {
+                    "name": f"step {index}",
+                    "request": {"method": "GET", "url": f"/api/users/$uid/{index}"},
+                    "extract": {"url": "body.url"},
+                    "validate": [{"eq": ["status_code", 200]}],
+                }
+                for index in range(3)
+            ],
+        }
+    )
+
+
+def main():
+    logger.remove()
+    project_meta = ProjectMeta()
+    testcase = make_testcase()
+    requests_count = TESTCASES_COUNT * len(testcase.teststeps)
+
+    # sequential, only a small part is run for the simulated latency
+    sync_count = TESTCASES_COUNT // 20
+    session = HttpSession()
+    session.mount("http://", LatencyAdapter())
+    runner = HttpRunner().with_project_meta(project_meta).with_session(session)
+    start_at = time.time()
+    for _ in range(sync_count):
+        runner.run_testcase(testcase)
+        assert runner.success
+    sync_rps = sync_count * len(testcase.teststeps) / (time.time() - start_at)
+
+    async_runner = AsyncHttpRunner(
+        concurrency=CONCURRENCY,
+        project_meta=project_meta,
+        transport=httpx.MockTransport(handle_with_latency),
+    )
+    start_at = time.time()
+    results = async_runner.run([testcase] * TESTCASES_COUNT)
+    async_rps = requests_count / (time.time() - start_at)
+    assert all(result.success for result in results)
+
+    print(f"simulated latency: {LATENCY * 1000:.0f} ms")
+    print(f"HttpRunner sequential:             {sync_rps:.1f} requests/s")
+    print(f"AsyncHttpRunner concurrency={CONCURRENCY}: {async_rps:.1f} requests/s")
+
+
+if __name__ == "__main__":
+    main()
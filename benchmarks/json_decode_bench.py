@@ -0,0 +1,92 @@
+""" benchmark for decoding 1 MB json response bodies.
+
+Usage:
+    $ python benchmarks/json_decode_bench.py
+    $ pip install orjson && python benchmarks/json_decode_bench.py
+
+Each response is recorded by client recorder, then extracted and validated with
+ResponseObject, which is what one teststep does with the response.
+Json body is decoded once per response and shared by all of them.
+
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loguru import logger
+from requests import Request, Response
+from requests.structures import CaseInsensitiveDict
+
+from httprunner import utils
+from httprunner.client import get_req_resp_record
+from httprunner.response import ResponseObject
+
+ITEMS_COUNT = 6000
+ROUNDS = 20
+
+
+def make_response(body: bytes) -> Response:
+    resp = Response()
+    resp.status_code = 200
+    resp.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+    resp._content = body
+    resp.encoding = "utf-8"
+    resp.request = Request("GET", "http://httprunner.local/items").prepare()
+    resp.url = resp.request.url
+    return resp
+
+
+def handle_response(resp: Response):
+    get_req_resp_record(resp)
+    resp_obj = ResponseObject(resp)
+    resp_obj.extract({"first_id": "body.items[0].id", "total": "body.total"})
+    resp_obj.validate(
+        [
+            {"eq": ["status_code", 200]},
+            {"eq": ["body.total", ITEMS_COUNT]},
+            {"eq": ["body.items[-1].name", f"item-{ITEMS_COUNT - 1}"]},
+        ]
+    )
+
+
+def main():
+    logger.remove()
+    body = json.dumps(
+        {
+            "total": ITEMS_COUNT,
+            "items": [
+                {"id": i, "name": f"item-{i}", "tags": ["a", "b"], "price": i * 1.5}
+                for i in range(ITEMS_COUNT)
+            ],
+            "padding": "x" * 650000,
+        }
+    ).encode("utf-8")
+    print(f"json body size: {len(body) / 1024 / 1024:.2f} MB")
+
+    backends = [("json", json.loads)]
+    if utils.json_loads is not json.loads:
+        backends.append(("orjson", utils.json_loads))
+
+    for backend_name, json_loads in backends:
+        decode_count = 0
+
+        def counted_json_loads(content):
+            nonlocal decode_count
+            decode_count += 1
+            return json_loads(content)
+
+        utils.json_loads = counted_json_loads
+        cost = timeit.timeit(
+            lambda: handle_response(make_response(body)), number=ROUNDS
+        )
+        print(
+            f"{backend_name:<8} {cost / ROUNDS * 1000:8.2f} ms per response, "
+            f"{decode_count / ROUNDS:.0f} json decode per response"
+        )
+
+
+if __name__ == "__main__":
+    main()
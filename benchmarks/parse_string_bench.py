@@ -0,0 +1,81 @@
+""" microbenchmark for parser.parse_string with compiled string cache.
+
+Usage:
+    $ python benchmarks/parse_string_bench.py [testcase file/folder path]
+
+All string contents in examples/httpbin testcases are rendered repeatedly,
+with compiled strings cache cleared before each round (cold) or kept (warm).
+
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from httprunner import loader, parser
+
+EXAMPLES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples", "httpbin"
+)
+
+
+def collect_strings(content, strings):
+    if isinstance(content, str):
+        strings.append(content.strip(" \t"))
+    elif isinstance(content, (list, tuple)):
+        for item in content:
+            collect_strings(item, strings)
+    elif isinstance(content, dict):
+        for key, value in content.items():
+            collect_strings(key, strings)
+            collect_strings(value, strings)
+
+    return strings
+
+
+def prepare_templates(tests_path):
+    raw_strings = []
+    for test_file in loader.load_folder_files(tests_path):
+        if not test_file.lower().endswith((".yml", ".yaml", ".json")):
+            continue
+
+        collect_strings(loader.load_test_file(test_file), raw_strings)
+
+    templates = [s for s in raw_strings if "$" in s]
+    variables_mapping = {
+        var_name: "value" for var_name in parser.extract_variables(templates)
+    }
+    functions_mapping = {
+        func_name: lambda *args, **kwargs: "value"
+        for template in templates
+        for func_name, _ in parser.regex_findall_functions(template)
+    }
+    return templates, variables_mapping, functions_mapping
+
+
+def main():
+    tests_path = sys.argv[1] if len(sys.argv) > 1 else EXAMPLES_DIR
+    templates, variables_mapping, functions_mapping = prepare_templates(tests_path)
+
+    def render_all():
+        for template in templates:
+            parser.parse_string(template, variables_mapping, functions_mapping)
+
+    def render_all_cold():
+        parser.compile_string.cache_clear()
+        render_all()
+
+    rounds = 2000
+    cold = timeit.timeit(render_all_cold, number=rounds)
+    render_all()
+    warm = timeit.timeit(render_all, number=rounds)
+
+    print(f"templates: {len(templates)}, rounds: {rounds}")
+    print(f"cold (compile + render): {cold * 1000 / rounds:.4f} ms/round")
+    print(f"warm (render only):      {warm * 1000 / rounds:.4f} ms/round")
+    print(f"speedup: {cold / warm:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+""" benchmark for per-iteration overhead of HttpRunner.run_testcase.
+
+Usage:
+    $ python benchmarks/run_testcase_bench.py
+
+Requests are served by an in-process transport adapter, thus the measured time
+is spent in HttpRunner itself, e.g. parsing variables and requests, extracting and validating.
+
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loguru import logger
+from requests import Request, Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from httprunner.client import HttpSession
+from httprunner.loader import load_testcase
+from httprunner.models import ProjectMeta
+from httprunner.runner import HttpRunner
+
+STEPS_COUNT = 10
+
+
+def make_response(request):
+    resp = Response()
+    resp.status_code = 200
+    resp.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+    resp._content = json.dumps(
+        {
+            "url": request.url,
+            "headers": dict(request.headers),
+            "items": [{"id": i, "name": f"item-{i}"} for i in range(20)],
+        }
+    ).encode("utf-8")
+    resp.encoding = "utf-8"
+    resp.request = request
+    resp.url = request.url
+    return resp
+
+
+class LocalAdapter(BaseAdapter):
+    """ echo request url and headers in json body, without network io """
+
+    def send(self, request, **kwargs):
+        return make_response(request)
+
+    def close(self):
+        pass
+
+
+class StubSession(object):
+    """ return prepared response directly, neither sending nor recording request """
+
+    def __init__(self):
+        self.response = make_response(
+            Request("POST", "http://httprunner.local").prepare()
+        )
+
+    def request(self, method, url, name=None, **kwargs):
+        return self.response
+
+
+def make_testcase():
+    teststeps = []
+    for index in range(STEPS_COUNT):
+        teststeps.append(
+            {
+                "name": f"step {index}",
+                "variables": {"index": index, "path": "/api/$version/items/$index"},
+                "request": {
+                    "method": "POST",
+                    "url": "$path",
+                    "params": {"page": "1", "size": "20"},
+                    "headers": {
+                        "User-Agent": "HttpRunner/$version",
+                        "Authorization": "Bearer $token",
+                        "Accept": "application/json",
+                    },
+                    "json": {
+                        "index": "$index",
+                        "sum": "${sum_two($index, 1)}",
+                        "tags": ["a", "b", "c"],
+                        "meta": {"source": "benchmark", "version": 3},
+                    },
+                },
+                "extract": {"first_id": "body.items[0].id"},
+                "validate": [
+                    {"eq": ["status_code", 200]},
+                    {"eq": ["body.items[0].name", "item-0"]},
+                    {"length_equal": ["body.items", 20]},
+                    {"eq": ["$first_id", 0]},
+                ],
+            }
+        )
+
+    return load_testcase(
+        {
+            "config": {
+                "name": "run testcase benchmark",
+                "base_url": "http://httprunner.local",
+                "variables": {"version": "v1", "token": "abc${sum_two(1, 2)}"},
+            },
+            "teststeps": teststeps,
+        }
+    )
+
+
+def measure(runner, testcase, rounds=200):
+    def run_once():
+        runner.run_testcase(testcase)
+        assert runner.success
+
+    run_once()
+    return timeit.timeit(run_once, number=rounds) * 1000 / rounds
+
+
+def main():
+    logger.remove()
+    project_meta = ProjectMeta(functions={"sum_two": lambda m, n: m + n})
+    testcase = make_testcase()
+
+    session = HttpSession()
+    session.mount("http://", LocalAdapter())
+    runner = HttpRunner().with_project_meta(project_meta).with_session(session)
+    full_ms = measure(runner, testcase)
+
+    runner = HttpRunner().with_project_meta(project_meta).with_session(StubSession())
+    runner_ms = measure(runner, testcase)
+
+    print(f"steps: {STEPS_COUNT}")
+    print(f"with HttpSession:     {full_ms:.3f} ms/iteration")
+    print(f"HttpRunner overhead:  {runner_ms:.3f} ms/iteration")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+""" benchmark for extracting and validating very large json response body in stream mode.
+
+Usage:
+    $ pip install ijson && python benchmarks/stream_bench.py
+
+Each response extracts one field and checks a count, with the whole body materialized
+or with body field paths searched from response body stream.
+
+"""
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loguru import logger
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from httprunner.ext.stream import search_step_stream
+from httprunner.response import ResponseObject, uniform_validator
+
+ITEMS_COUNT = 500000
+
+EXTRACTORS = {"first_id": "body.items[0].id"}
+VALIDATORS = [
+    uniform_validator({"eq": ["status_code", 200]}),
+    uniform_validator({"eq": ["body.total", ITEMS_COUNT]}),
+]
+
+
+def make_response(body: bytes) -> Response:
+    resp = Response()
+    resp.status_code = 200
+    resp.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+    resp.encoding = "utf-8"
+    resp.raw = io.BytesIO(body)
+    return resp
+
+
+def handle_response(resp: Response, stream: bool):
+    resp_obj = ResponseObject(resp)
+    if stream:
+        search_step_stream(resp_obj, EXTRACTORS, VALIDATORS)
+
+    resp_obj.extract(EXTRACTORS)
+    resp_obj.validate(VALIDATORS)
+
+
+def main():
+    logger.remove()
+    body = json.dumps(
+        {
+            "total": ITEMS_COUNT,
+            "items": [
+                {"id": i, "name": f"item-{i}", "tags": ["a", "b"], "price": i * 1.5}
+                for i in range(ITEMS_COUNT)
+            ],
+        }
+    ).encode("utf-8")
+    print(f"json body size: {len(body) / 1024 / 1024:.2f} MB")
+
+    for mode, stream in [("full", False), ("stream", True)]:
+        resp = make_response(body)
+        tracemalloc.start()
+        start_at = time.perf_counter()
+        handle_response(resp, stream)
+        cost = time.perf_counter() - start_at
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"{mode:<8} {cost * 1000:8.2f} ms, "
+            f"peak memory: {peak / 1024 / 1024:8.2f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+""" benchmark for extracting and validating one response with many jmespath expressions.
+
+Usage:
+    $ python benchmarks/validate_bench.py
+
+Each step extracts 5 variables and checks 25 validators on a json response,
+jmespath expressions are compiled once, plain field paths are searched without
+jmespath interpreter, and response meta is built once per response.
+Validators are compiled once per teststep like the compiled plan does, raw validators
+are compiled in each validation.
+
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loguru import logger
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from httprunner.response import ResponseObject, compile_validators
+
+VALIDATORS_COUNT = 25
+EXTRACTORS_COUNT = 5
+ROUNDS = 2000
+
+BODY = json.dumps(
+    {
+        "code": 0,
+        "message": "success",
+        "data": {
+            "items": [
+                {"id": i, "name": f"item-{i}", "price": i * 1.5, "tags": ["a", "b"]}
+                for i in range(VALIDATORS_COUNT)
+            ],
+            "total": VALIDATORS_COUNT,
+        },
+    }
+).encode("utf-8")
+
+EXTRACTORS = {
+    f"item_{i}_name": f"body.data.items[{i}].name" for i in range(EXTRACTORS_COUNT)
+}
+
+VALIDATORS = [{"eq": ["status_code", 200]}, {"eq": ["body.code", 0]}] + [
+    {"eq": [f"body.data.items[{i}].id", i]} for i in range(VALIDATORS_COUNT - 2)
+]
+
+
+def make_response() -> Response:
+    resp = Response()
+    resp.status_code = 200
+    resp.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+    resp._content = BODY
+    resp.encoding = "utf-8"
+    return resp
+
+
+def handle_response(validators):
+    resp_obj = ResponseObject(make_response())
+    resp_obj.extract(EXTRACTORS)
+    resp_obj.validate(validators)
+
+
+def main():
+    logger.remove()
+    for mode, validators in [
+        ("raw", VALIDATORS),
+        ("compiled", compile_validators(VALIDATORS)),
+    ]:
+        cost = timeit.timeit(lambda: handle_response(validators), number=ROUNDS)
+        print(
+            f"{VALIDATORS_COUNT} validators ({mode}) and {EXTRACTORS_COUNT} extractors: "
+            f"{cost / ROUNDS * 1000:.3f} ms per response"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,9 @@ __description__ = "One-stop solution for HTTP(S) testing."
 
 # import firstly for monkey patch if needed
 from httprunner.ext.locust import main_locusts
+from httprunner.memoization import memoize
 from httprunner.parser import parse_parameters as Parameters
+from httprunner.parser import parse_parameters_lazy as LazyParameters
 from httprunner.runner import HttpRunner
 from httprunner.testcase import Config, Step, RunRequest, RunTestCase
 
@@ -16,4 +18,6 @@ __all__ = [
     "RunRequest",
     "RunTestCase",
     "Parameters",
+    "LazyParameters",
+    "memoize",
 ]
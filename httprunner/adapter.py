@@ -0,0 +1,148 @@
+""" requests adapter with timing instrumented urllib3 connections.
+
+Each phase of request is timed in connection, name resolution, TCP connect, TLS
+handshake and time to first byte, and bytes sent are counted. Timings of reused
+connection only include time to first byte, since connecting phases are skipped.
+
+Timings are attached to urllib3 response and read with get_response_timings(),
+`new_connection` is 1 if the response is received on new connection, otherwise 0.
+
+"""
+import socket
+import time
+from typing import Dict, Text, Union
+
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.connection import HTTPConnection, HTTPSConnection
+
+
+def new_timings() -> Dict[Text, float]:
+    return {
+        "dns_ms": 0,
+        "connect_ms": 0,
+        "tls_ms": 0,
+        "ttfb_ms": 0,
+        "request_size": 0,
+        "new_connection": 0,
+    }
+
+
+class TimingConnectionMixin(object):
+    """ time connecting phases and count bytes sent in urllib3 connection
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TimingConnectionMixin, self).__init__(*args, **kwargs)
+        self.hrun_timings = new_timings()
+        self.hrun_connected_at = 0
+        self.hrun_request_at = 0
+
+    def _new_conn(self) -> socket.socket:
+        dns_host = self._dns_host
+        start_at = time.perf_counter()
+        try:
+            addr_info = socket.getaddrinfo(dns_host, self.port, 0, socket.SOCK_STREAM)
+        except (socket.gaierror, UnicodeError):
+            # name resolution error is raised by urllib3
+            addr_info = []
+        resolved_at = time.perf_counter()
+        self.hrun_timings["dns_ms"] = (resolved_at - start_at) * 1000
+
+        if not addr_info:
+            sock = super(TimingConnectionMixin, self)._new_conn()
+        else:
+            # connect to resolved address, thus name is not resolved again
+            self._dns_host = addr_info[0][4][0]
+            try:
+                sock = super(TimingConnectionMixin, self)._new_conn()
+            except Exception:
+                # fallback to connect with all resolved addresses by urllib3
+                self._dns_host = dns_host
+                sock = super(TimingConnectionMixin, self)._new_conn()
+            finally:
+                self._dns_host = dns_host
+
+        self.hrun_connected_at = time.perf_counter()
+        self.hrun_timings["connect_ms"] = (self.hrun_connected_at - resolved_at) * 1000
+        return sock
+
+    def connect(self):
+        super(TimingConnectionMixin, self).connect()
+        if isinstance(self, HTTPSConnection) and self.hrun_connected_at:
+            # time from TCP connected to TLS handshake finished
+            connected_at = self.hrun_connected_at
+            self.hrun_connected_at = time.perf_counter()
+            self.hrun_timings["tls_ms"] = (self.hrun_connected_at - connected_at) * 1000
+
+    def putrequest(self, *args, **kwargs):
+        self.hrun_request_at = time.perf_counter()
+        return super(TimingConnectionMixin, self).putrequest(*args, **kwargs)
+
+    def send(self, data):
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            self.hrun_timings["request_size"] += len(data)
+        elif isinstance(data, str):
+            self.hrun_timings["request_size"] += len(data.encode("iso-8859-1"))
+
+        return super(TimingConnectionMixin, self).send(data)
+
+    def getresponse(self, *args, **kwargs):
+        response = super(TimingConnectionMixin, self).getresponse(*args, **kwargs)
+        # time from request started (after connected) to response headers received
+        request_at = max(self.hrun_request_at, self.hrun_connected_at)
+        self.hrun_timings["ttfb_ms"] = (time.perf_counter() - request_at) * 1000
+        self.hrun_timings["new_connection"] = 1 if self.hrun_connected_at else 0
+
+        response.hrun_timings = self.hrun_timings
+        self.hrun_timings = new_timings()
+        self.hrun_connected_at = 0
+        return response
+
+
+class TimingHTTPConnection(TimingConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimingHTTPSConnection(TimingConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimingHTTPConnection
+
+
+class TimingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimingHTTPSConnection
+
+
+TIMING_POOL_CLASSES = {
+    "http": TimingHTTPConnectionPool,
+    "https": TimingHTTPSConnectionPool,
+}
+
+
+class TimingHTTPAdapter(HTTPAdapter):
+    """ requests adapter, requests are sent with timing instrumented connections
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(TimingHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = TIMING_POOL_CLASSES
+
+    def proxy_manager_for(self, *args, **kwargs):
+        manager = super(TimingHTTPAdapter, self).proxy_manager_for(*args, **kwargs)
+        manager.pool_classes_by_scheme = TIMING_POOL_CLASSES
+        return manager
+
+
+def get_response_timings(raw_response) -> Union[Dict[Text, float], None]:
+    """ get timings of urllib3 response, None if not sent with timing connection
+    """
+    timings = getattr(raw_response, "hrun_timings", None)
+    if timings is None:
+        # urllib3 1.x, timings are attached to http.client response
+        original_response = getattr(raw_response, "_original_response", None)
+        timings = getattr(original_response, "hrun_timings", None)
+
+    return timings
@@ -2,6 +2,7 @@ import argparse
 import enum
 import os
 import sys
+from typing import List, Text, Tuple, Union
 
 import pytest
 from loguru import logger
@@ -9,6 +10,7 @@ from sentry_sdk import capture_message
 
 from httprunner import __description__, __version__
 from httprunner.compat import ensure_cli_args
+from httprunner.direct import main_run_direct
 from httprunner.ext.har2case import init_har2case_parser, main_har2case
 from httprunner.make import init_make_parser, main_make
 from httprunner.scaffold import init_parser_scaffold, main_scaffold
@@ -19,16 +21,66 @@ init_sentry_sdk()
 
 def init_parser_run(subparsers):
     sub_parser_run = subparsers.add_parser(
-        "run", help="Make HttpRunner testcases and run with pytest."
+        "run",
+        help="Make HttpRunner testcases and run with pytest, "
+        "or run YAML/JSON testcases directly with --direct, "
+        "in process pool with --direct --workers N.",
     )
     return sub_parser_run
 
 
+def parse_workers_arg(extra_args: List[Text]) -> Tuple[Union[int, None], List[Text]]:
+    """ pop --workers N or --workers=N from extra args
+    """
+    workers = None
+    extra_args_new = []
+    args_iter = iter(extra_args)
+    for item in args_iter:
+        if item == "--workers":
+            value = next(args_iter, "")
+        elif item.startswith("--workers="):
+            value = item[len("--workers=") :]
+        else:
+            extra_args_new.append(item)
+            continue
+
+        if not value.isdigit() or int(value) < 1:
+            logger.error(f"--workers should be positive integer, got: {value}")
+            sys.exit(1)
+
+        workers = int(value)
+
+    return workers, extra_args_new
+
+
 def main_run(extra_args) -> enum.IntEnum:
     capture_message("start to run")
+    workers, extra_args = parse_workers_arg(extra_args)
+    if "--direct" in extra_args:
+        # run YAML/JSON testcases in process, without making pytest files,
+        # testcases with each parameter are run in process pool with --workers N
+        extra_args = [item for item in extra_args if item != "--direct"]
+        return main_run_direct(extra_args, workers=workers or 1)
+
+    if workers:
+        # pytest files, pytest arguments and reports are not supported in direct mode
+        logger.error(
+            "--workers runs YAML/JSON testcases in process pool, which requires "
+            "direct run mode, while pytest files, pytest arguments and reports are "
+            "not supported, run with: hrun --direct --workers N [--save-tests] "
+            "path/to/testcases, or parallelize pytest mode with pytest-xdist: "
+            "hrun -n N path/to/testcases"
+        )
+        sys.exit(1)
+
     # keep compatibility with v2
     extra_args = ensure_cli_args(extra_args)
 
+    # regenerate all pytest files ignoring make cache, named apart from --force of
+    # pytest plugins, which is forwarded to pytest
+    force_make = "--make-force" in extra_args
+    extra_args = [item for item in extra_args if item != "--make-force"]
+
     tests_path_list = []
     extra_args_new = []
     for item in extra_args:
@@ -44,7 +96,7 @@ def main_run(extra_args) -> enum.IntEnum:
         logger.error(f"No valid testcase path in cli arguments: {extra_args}")
         sys.exit(1)
 
-    testcase_path_list = main_make(tests_path_list)
+    testcase_path_list = main_make(tests_path_list, force=force_make)
     if not testcase_path_list:
         logger.error("No valid testcases found, exit 1.")
         sys.exit(1)
@@ -120,7 +172,7 @@ def main():
     elif sys.argv[1] == "har2case":
         main_har2case(args)
     elif sys.argv[1] == "make":
-        main_make(args.testcase_path)
+        main_make(args.testcase_path, force=args.force, workers=args.workers)
 
 
 def main_hrun_alias():
@@ -1,5 +1,6 @@
 import json
 import time
+from typing import Callable, List, Text
 
 import requests
 import urllib3
@@ -12,9 +13,16 @@ from requests.exceptions import (
     RequestException,
 )
 
-from httprunner.models import RequestData, ResponseData
+from httprunner.adapter import TimingHTTPAdapter, get_response_timings
+from httprunner.models import RecordLevelEnum, RequestData, ResponseData
 from httprunner.models import SessionData, ReqRespData
-from httprunner.utils import lower_dict_keys, omit_long_data
+from httprunner.models import ConnectionStat, TConnectionPool
+from httprunner.utils import (
+    lower_dict_keys,
+    omit_long_data,
+    load_response_json,
+    is_response_streamed,
+)
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -26,25 +34,48 @@ class ApiResponse(Response):
         Response.raise_for_status(self)
 
 
-def get_req_resp_record(resp_obj: Response) -> ReqRespData:
-    """ get request and response info from Response() object.
+def format_req_resp_record(req_resp: ReqRespData) -> Text:
+    """ format request and response details for debug log
     """
-
-    def log_print(req_or_resp, r_type):
-        msg = f"\n================== {r_type} details ==================\n"
+    msg = ""
+    for r_type, req_or_resp in [
+        ("request", req_resp.request),
+        ("response", req_resp.response),
+    ]:
+        msg += f"\n================== {r_type} details ==================\n"
         for key, value in req_or_resp.dict().items():
             if isinstance(value, dict) or isinstance(value, list):
                 value = json.dumps(value, indent=4, ensure_ascii=False)
 
             msg += "{:<8} : {}\n".format(key, value)
-        logger.debug(msg)
 
+    return msg
+
+
+def log_req_resp_records(get_records: Callable[[], List[ReqRespData]]):
+    """ log request and response details in debug mode,
+        records are built and formatted only if debug log is enabled.
+    """
+    logger.opt(lazy=True).debug(
+        "{}",
+        lambda: "".join(format_req_resp_record(req_resp) for req_resp in get_records()),
+    )
+
+
+def get_req_resp_record(
+    resp_obj: Response, record_level: Text = RecordLevelEnum.FULL
+) -> ReqRespData:
+    """ get request and response info from Response() object,
+        request and response body are omitted in meta record level.
+    """
     # record actual request info
     request_headers = dict(resp_obj.request.headers)
     request_cookies = resp_obj.request._cookies.get_dict()
 
     request_body = resp_obj.request.body
-    if request_body is not None:
+    if record_level == RecordLevelEnum.META:
+        request_body = None
+    elif request_body is not None:
         try:
             request_body = json.loads(request_body)
         except json.JSONDecodeError:
@@ -70,21 +101,22 @@ def get_req_resp_record(resp_obj: Response) -> ReqRespData:
         body=request_body,
     )
 
-    # log request details in debug mode
-    log_print(request_data, "request")
-
     # record response info
     resp_headers = dict(resp_obj.headers)
     lower_resp_headers = lower_dict_keys(resp_headers)
     content_type = lower_resp_headers.get("content-type", "")
 
-    if "image" in content_type:
+    if record_level == RecordLevelEnum.META:
+        response_body = ""
+    elif is_response_streamed(resp_obj):
+        response_body = "response body stream (OMITTED)"
+    elif "image" in content_type:
         # response is image type, record bytes content only
         response_body = resp_obj.content
     else:
         try:
             # try to record json data
-            response_body = resp_obj.json()
+            response_body = load_response_json(resp_obj)
         except ValueError:
             # only record at most 512 text charactors
             resp_text = resp_obj.text
@@ -99,9 +131,6 @@ def get_req_resp_record(resp_obj: Response) -> ReqRespData:
         body=response_body,
     )
 
-    # log response details in debug mode
-    log_print(response_data, "response")
-
     req_resp_data = ReqRespData(request=request_data, response=response_data)
     return req_resp_data
 
@@ -116,9 +145,60 @@ class HttpSession(requests.Session):
     :py:class:`requests.Session` class and mostly this class works exactly the same.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        record_level: Text = RecordLevelEnum.FULL,
+        connection_pool: TConnectionPool = None,
+    ):
         super(HttpSession, self).__init__()
+        connection_pool = connection_pool or TConnectionPool()
+        # requests are sent with timing instrumented connections
+        for prefix in ["http://", "https://"]:
+            adapter = TimingHTTPAdapter(
+                pool_connections=connection_pool.pool_connections,
+                pool_maxsize=connection_pool.pool_maxsize,
+                pool_block=connection_pool.pool_block,
+            )
+            self.mount(prefix, adapter)
+
+        if not connection_pool.keep_alive:
+            self.headers["Connection"] = "close"
+
         self.data = SessionData()
+        self.record_level = RecordLevelEnum(record_level)
+        # connections created and reused by requests, including 30X redirection
+        self.connection_stat = ConnectionStat()
+
+    def record_req_resps(
+        self, session_data: SessionData, response: Response
+    ) -> List[ReqRespData]:
+        """
+        record request and response histories of Response() object in session data,
+        include 30X redirection. Records are built in session record level lazily, only
+        when report or failed validation needs them, and only once.
+        """
+        if self.record_level != RecordLevelEnum.OFF and not session_data.req_resps:
+            response_list = response.history + [response]
+            session_data.req_resps = [
+                get_req_resp_record(resp_obj, self.record_level)
+                for resp_obj in response_list
+            ]
+
+        return session_data.req_resps
+
+    def count_connections(self, response: Response):
+        """ count new and reused connections of response, include 30X redirection.
+        """
+        for resp_obj in response.history + [response]:
+            timings = get_response_timings(resp_obj.raw)
+            if timings is None:
+                # request failed, or sent without timing connection
+                continue
+
+            if timings["new_connection"]:
+                self.connection_stat.new_connections += 1
+            else:
+                self.connection_stat.reused_connections += 1
 
     def update_last_req_resp_record(self, resp_obj):
         """
@@ -126,7 +206,7 @@ class HttpSession(requests.Session):
         """
         # TODO: fix
         self.data.req_resps.pop()
-        self.data.req_resps.append(get_req_resp_record(resp_obj))
+        self.data.req_resps.append(get_req_resp_record(resp_obj, self.record_level))
 
     def request(self, method, url, name=None, **kwargs):
         """
@@ -172,12 +252,14 @@ class HttpSession(requests.Session):
         # timeout default to 120 seconds
         kwargs.setdefault("timeout", 120)
 
+        # response body is searched in stream mode, see httprunner.ext.stream
+        stream_body = kwargs.get("stream", False)
+
         # set stream to True, in order to get client/server IP/Port
         kwargs["stream"] = True
 
-        start_timestamp = time.time()
+        start_timestamp = time.perf_counter()
         response = self._send_request_safe_mode(method, url, **kwargs)
-        response_time_ms = round((time.time() - start_timestamp) * 1000, 2)
 
         try:
             client_ip, client_port = response.raw.connection.sock.getsockname()
@@ -195,19 +277,46 @@ class HttpSession(requests.Session):
         except AttributeError as ex:
             logger.warning(f"failed to get server address info: {ex}")
 
-        # get length of the response content
-        content_size = int(dict(response.headers).get("content-length") or 0)
-
-        # record the consumed time
-        self.data.stat.response_time_ms = response_time_ms
-        self.data.stat.elapsed_ms = response.elapsed.microseconds / 1000.0
-        self.data.stat.content_size = content_size
-
-        # record request and response histories, include 30X redirection
-        response_list = response.history + [response]
-        self.data.req_resps = [
-            get_req_resp_record(resp_obj) for resp_obj in response_list
-        ]
+        # read response body after address info got, connection is released then
+        download_timestamp = time.perf_counter()
+        if stream_body:
+            # response body is searched later in stream mode
+            content_size = int(response.headers.get("content-length") or 0)
+        else:
+            content_size = len(response.content or b"")
+            if hasattr(response.raw, "tell"):
+                # bytes received, before decoding content encoding like gzip
+                content_size = response.raw.tell()
+
+        end_timestamp = time.perf_counter()
+        response_time_ms = round((end_timestamp - start_timestamp) * 1000, 2)
+
+        # record the consumed time and timing breakdown
+        stat = self.data.stat
+        stat.response_time_ms = response_time_ms
+        stat.elapsed_ms = round(response.elapsed.total_seconds() * 1000, 2)
+        stat.download_ms = round((end_timestamp - download_timestamp) * 1000, 2)
+        stat.content_size = content_size
+        self.count_connections(response)
+        timings = get_response_timings(response.raw)
+        if timings:
+            stat.dns_ms = round(timings["dns_ms"], 2)
+            stat.connect_ms = round(timings["connect_ms"], 2)
+            stat.tls_ms = round(timings["tls_ms"], 2)
+            stat.ttfb_ms = round(timings["ttfb_ms"], 2)
+            stat.request_size = timings["request_size"]
+
+        logger.debug(
+            f"timings(ms): dns {stat.dns_ms}, connect {stat.connect_ms}, "
+            f"tls {stat.tls_ms}, ttfb {stat.ttfb_ms}, download {stat.download_ms}, "
+            f"request_size: {stat.request_size} bytes"
+        )
+
+        # request and response histories are recorded lazily, log them in debug mode
+        # response body in stream mode is not read for logging
+        if self.record_level != RecordLevelEnum.OFF and not stream_body:
+            session_data = self.data
+            log_req_resp_records(lambda: self.record_req_resps(session_data, response))
 
         try:
             response.raise_for_status()
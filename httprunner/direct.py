@@ -0,0 +1,407 @@
+""" run YAML/JSON testcases directly in process, skipping pytest files making.
+
+    $ hrun --direct path/to/testcases
+
+Testcases are loaded with pydantic models and run by HttpRunner.run_testcase,
+referenced testcases are loaded in memory, thus no file is written. Parameters,
+testsuites and referenced testcases are supported as in pytest mode, while pytest
+arguments are ignored. Pytest files generated by HttpRunner are skipped since their
+YAML/JSON testcases are run instead, other pytest files are not supported.
+
+Testcases and parameter combinations can also be run in process pool, and summaries
+are merged into one report in the original order, saved as summary.json in logs of
+project RootDir with --save-tests.
+
+    $ hrun --direct --workers 4 --save-tests path/to/testcases
+
+"""
+import enum
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, Iterator, List, NoReturn, Text, Tuple
+
+import pytest
+from loguru import logger
+
+from httprunner import exceptions, __version__
+from httprunner.compat import (
+    convert_variables,
+    ensure_path_sep,
+    ensure_testcase_v3,
+    get_summary_path,
+)
+from httprunner.loader import (
+    load_folder_files,
+    load_project_meta,
+    load_testcase,
+    load_testsuite,
+)
+from httprunner.make import load_test_content, prepare_testsuite_testcase
+from httprunner.models import TestCase, TestCaseSummary, TestCaseTime, TestSuiteSummary
+from httprunner.parser import parse_parameters_lazy
+from httprunner.plan import TestCasePlan
+from httprunner.runner import HttpRunner
+from httprunner.utils import ExtendJSONEncoder, get_platform, is_support_multiprocessing
+
+""" cache referenced testcases loaded in memory, shared testcase is loaded only once
+"""
+ref_testcases_cache: Dict[Text, TestCase] = {}
+
+""" testcases and their execution plans loaded in worker process
+"""
+worker_testcases: List[TestCase] = []
+worker_plans: Dict[int, TestCasePlan] = {}
+
+# max pending runs of each worker, runs are handed out once any worker is free
+WORKER_PENDING_RUNS = 2
+
+
+def load_ref_testcase(ref_testcase_path: Text) -> TestCase:
+    """ load referenced testcase in memory, path is relative to project RootDir
+    """
+    ref_testcase_path = ensure_path_sep(ref_testcase_path)
+    if not os.path.isabs(ref_testcase_path):
+        project_meta = load_project_meta(ref_testcase_path)
+        ref_testcase_path = os.path.join(project_meta.RootDir, ref_testcase_path)
+
+    if ref_testcase_path in ref_testcases_cache:
+        return ref_testcases_cache[ref_testcase_path]
+
+    test_content = load_test_content(ref_testcase_path)
+    if test_content is None or "teststeps" not in test_content:
+        raise exceptions.TestCaseFormatError(
+            f"Invalid referenced testcase: {ref_testcase_path}"
+        )
+
+    testcase_obj = prepare_testcase(test_content)
+    ref_testcases_cache[ref_testcase_path] = testcase_obj
+    return testcase_obj
+
+
+def prepare_testcase(testcase: Dict) -> TestCase:
+    """ convert testcase dict to TestCase, referenced testcases are loaded in memory
+    """
+    # ensure compatibility with testcase format v2
+    testcase = ensure_testcase_v3(testcase)
+
+    config = testcase["config"]
+    config["variables"] = convert_variables(config.get("variables", {}), config["path"])
+
+    for teststep in testcase["teststeps"]:
+        if not teststep.get("testcase"):
+            continue
+
+        ref_testcase = load_ref_testcase(teststep["testcase"])
+
+        # override testcase export
+        if ref_testcase.config.export:
+            step_export: List = teststep.setdefault("export", [])
+            step_export.extend(ref_testcase.config.export)
+            teststep["export"] = list(set(step_export))
+
+        teststep["testcase"] = ref_testcase
+
+    return load_testcase(testcase)
+
+
+def is_generated_pytest_file(pytest_path: Text) -> bool:
+    """ check if pytest file is generated by HttpRunner from YAML/JSON testcase
+    """
+    with open(pytest_path, encoding="utf-8") as f:
+        return f.readline().startswith("# NOTE: Generated By HttpRunner")
+
+
+def load_tests(tests_path: Text) -> List[TestCase]:
+    """ load testcases from testcase/testsuite/folder absolute path
+    """
+    load_project_meta(tests_path)
+
+    test_files = []
+    if os.path.isdir(tests_path):
+        test_files.extend(load_folder_files(tests_path))
+    elif os.path.isfile(tests_path):
+        test_files.append(tests_path)
+    else:
+        raise exceptions.TestcaseNotFound(f"Invalid tests path: {tests_path}")
+
+    testcases = []
+    for test_file in test_files:
+        if test_file.lower().endswith("_test.py"):
+            if test_file == tests_path or not is_generated_pytest_file(test_file):
+                raise exceptions.ParamsError(
+                    f"pytest file is not supported in direct run mode, "
+                    f"run its YAML/JSON testcase or run without --direct: {test_file}"
+                )
+
+            logger.debug(f"skip pytest file generated from YAML/JSON: {test_file}")
+            continue
+
+        test_content = load_test_content(test_file)
+        if test_content is None:
+            continue
+
+        try:
+            # testcase
+            if "teststeps" in test_content:
+                testcases.append(prepare_testcase(test_content))
+
+            # testsuite
+            elif "testcases" in test_content:
+                load_testsuite(test_content)
+                testsuite_config = test_content["config"]
+                testsuite_variables = convert_variables(
+                    testsuite_config.get("variables", {}), test_file
+                )
+                for testcase in test_content["testcases"]:
+                    testcase_dict = prepare_testsuite_testcase(
+                        testcase, testsuite_config, testsuite_variables
+                    )
+                    testcases.append(prepare_testcase(testcase_dict))
+
+            # invalid format
+            else:
+                logger.warning(
+                    f"Invalid test file: {test_file}\n"
+                    f"reason: file content is neither testcase nor testsuite"
+                )
+
+        except exceptions.FileFormatError as ex:
+            logger.warning(f"Invalid test file: {test_file}\n{type(ex).__name__}: {ex}")
+
+    return testcases
+
+
+def iter_testcase_parameters(testcase: TestCase) -> Iterator[Dict]:
+    """ iterate parameter combinations of testcase, combinations are generated lazily
+    """
+    if testcase.config.parameters:
+        yield from parse_parameters_lazy(testcase.config.parameters)
+    else:
+        yield {}
+
+
+def run_testcase_with_param(
+    testcase: TestCase, plan: TestCasePlan, param: Dict
+) -> TestCaseSummary:
+    """ run testcase with one parameter combination, return summary of the run
+    """
+    variables = dict(testcase.config.variables)
+    variables.update(param)
+    testcase_run = testcase.copy(
+        update={"config": testcase.config.copy(update={"variables": variables})}
+    )
+
+    case_id = str(uuid.uuid4())
+    runner = HttpRunner().with_case_id(case_id).with_variables({}).with_plan(plan)
+    start_at = time.time()
+    logger.info(
+        f"Start to run testcase: {testcase.config.name}, TestCase ID: {case_id}"
+    )
+    try:
+        runner.run_testcase(testcase_run)
+        return runner.get_summary()
+    except Exception as ex:
+        if isinstance(ex, exceptions.MyBaseFailure):
+            logger.error(f"{type(ex).__name__}: {ex}")
+        else:
+            logger.exception(f"{type(ex).__name__}: {ex}")
+
+        return TestCaseSummary(
+            name=testcase.config.name,
+            success=False,
+            case_id=case_id,
+            time=TestCaseTime(
+                start_at=start_at,
+                start_at_iso_format=datetime.utcfromtimestamp(start_at).isoformat(),
+                duration=time.time() - start_at,
+            ),
+            step_datas=runner.get_step_datas(),
+        )
+
+
+def run_testcase(testcase: TestCase) -> List[TestCaseSummary]:
+    """ run testcase with each parameter, return summary of each run
+    """
+    plan = TestCasePlan(testcase.teststeps)
+    return [
+        run_testcase_with_param(testcase, plan, param)
+        for param in iter_testcase_parameters(testcase)
+    ]
+
+
+def __init_worker(tests_paths: List[Text]) -> None:
+    """ load project meta and testcases once in each worker process
+    """
+    worker_testcases[:] = load_tests_paths(tests_paths)
+    worker_plans.clear()
+
+
+def __run_worker_job(testcase_index: int, param: Dict) -> TestCaseSummary:
+    """ run testcase with one parameter combination in worker process
+    """
+    testcase = worker_testcases[testcase_index]
+    if testcase_index not in worker_plans:
+        worker_plans[testcase_index] = TestCasePlan(testcase.teststeps)
+
+    return run_testcase_with_param(testcase, worker_plans[testcase_index], param)
+
+
+def run_testcases_in_pool(
+    tests_paths: List[Text], testcases: List[TestCase], workers: int
+) -> Iterator[TestCaseSummary]:
+    """ run testcases with each parameter in process pool, runs are handed out
+        dynamically for load balancing, summaries are yielded in the original order.
+    """
+    jobs: Iterator[Tuple[int, Dict]] = (
+        (testcase_index, param)
+        for testcase_index, testcase in enumerate(testcases)
+        for param in iter_testcase_parameters(testcase)
+    )
+
+    summaries: Dict[int, TestCaseSummary] = {}
+    next_index = 0
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=__init_worker, initargs=(tests_paths,)
+    ) as executor:
+        pending = {}
+        for job_index, (testcase_index, param) in enumerate(jobs):
+            future = executor.submit(__run_worker_job, testcase_index, param)
+            pending[future] = job_index
+            if len(pending) < workers * WORKER_PENDING_RUNS:
+                continue
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                summaries[pending.pop(future)] = future.result()
+
+            while next_index in summaries:
+                yield summaries.pop(next_index)
+                next_index += 1
+
+        for future in pending:
+            summaries[pending[future]] = future.result()
+
+    while next_index in summaries:
+        yield summaries.pop(next_index)
+        next_index += 1
+
+
+def load_tests_paths(tests_paths: List[Text]) -> List[TestCase]:
+    """ load testcases from testcase/testsuite/folder absolute paths
+    """
+    testcases: List[TestCase] = []
+    for tests_path in tests_paths:
+        testcases.extend(load_tests(tests_path))
+
+    return testcases
+
+
+def run_tests(tests_paths: List[Text], workers: int = 1) -> TestSuiteSummary:
+    """ load and run testcases in process, return summary of all testcases,
+        testcases with each parameter are run in process pool if workers more than 1.
+    """
+    tests_abs_paths = []
+    for tests_path in tests_paths:
+        tests_path = ensure_path_sep(tests_path)
+        if not os.path.isabs(tests_path):
+            tests_path = os.path.join(os.getcwd(), tests_path)
+
+        tests_abs_paths.append(tests_path)
+
+    testcases = load_tests_paths(tests_abs_paths)
+
+    start_at = time.time()
+    summary = TestSuiteSummary(
+        success=True,
+        time=TestCaseTime(
+            start_at=start_at,
+            start_at_iso_format=datetime.utcfromtimestamp(start_at).isoformat(),
+        ),
+        platform=get_platform(),
+        testcases=[],
+    )
+
+    if workers > 1 and testcases and is_support_multiprocessing():
+        logger.info(f"run testcases with {workers} workers")
+        testcase_summaries = run_testcases_in_pool(tests_abs_paths, testcases, workers)
+    else:
+        testcase_summaries = (
+            testcase_summary
+            for testcase in testcases
+            for testcase_summary in run_testcase(testcase)
+        )
+
+    for testcase_summary in testcase_summaries:
+        summary.testcases.append(testcase_summary)
+        summary.success &= testcase_summary.success
+        summary.stat.total += 1
+        if testcase_summary.success:
+            summary.stat.success += 1
+        else:
+            summary.stat.fail += 1
+
+    summary.time.duration = time.time() - start_at
+    return summary
+
+
+def dump_summary(summary: TestSuiteSummary, summary_path: Text) -> NoReturn:
+    """ dump summary of all testcases to json file
+    """
+    summary_dir = os.path.dirname(summary_path)
+    os.makedirs(summary_dir, exist_ok=True)
+
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(
+            summary.dict(), f, indent=4, ensure_ascii=False, cls=ExtendJSONEncoder
+        )
+
+    logger.info(f"generated task summary: {summary_path}")
+
+
+def main_run_direct(extra_args: List[Text], workers: int = 1) -> enum.IntEnum:
+    """ run YAML/JSON testcases directly, exit code is the same as pytest mode
+    """
+    tests_path_list = []
+    save_tests = False
+    for item in extra_args:
+        if item == "--save-tests":
+            save_tests = True
+        elif os.path.exists(item):
+            # item is file/folder path
+            tests_path_list.append(item)
+        else:
+            logger.warning(f"ignore argument in direct run mode: {item}")
+
+    if len(tests_path_list) == 0:
+        # has not specified any testcase path
+        logger.error(f"No valid testcase path in cli arguments: {extra_args}")
+        sys.exit(1)
+
+    logger.info(f"start to run tests directly. HttpRunner version: {__version__}")
+    try:
+        summary = run_tests(tests_path_list, workers=workers)
+    except exceptions.MyBaseError as ex:
+        logger.error(ex)
+        sys.exit(1)
+
+    if summary.stat.total == 0:
+        logger.error("No valid testcases found, exit 1.")
+        sys.exit(1)
+
+    for testcase_summary in summary.testcases:
+        result = "PASSED" if testcase_summary.success else "FAILED"
+        logger.info(f"{result} {testcase_summary.name}")
+
+    logger.info(
+        f"{summary.stat.fail} failed, {summary.stat.success} passed "
+        f"in {summary.time.duration:.2f}s"
+    )
+    if save_tests:
+        dump_summary(summary, get_summary_path(tests_path_list[0]))
+
+    return pytest.ExitCode.OK if summary.success else pytest.ExitCode.TESTS_FAILED
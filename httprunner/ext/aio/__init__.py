@@ -0,0 +1,427 @@
+""" asyncio extension, run testcases concurrently in one event loop.
+
+If you want to use this extension, you should install the following dependencies first.
+
+- httpx
+
+Each testcase run is performed by HttpRunner with its own AsyncHttpSession, just like
+a virtual user holding its own cookies, while connections are pooled in one transport.
+Hooks, extract and validate work the same as in sync mode, and step datas are recorded
+in the same SessionData format.
+
+    import asyncio
+    from httprunner.ext.aio import AsyncHttpRunner
+    from httprunner.loader import load_testcase_file
+
+    testcase_obj = load_testcase_file("path/to/testcase.yml")
+    runner = AsyncHttpRunner(concurrency=1000)
+    results = asyncio.run(runner.run_testcases([testcase_obj] * 5000))
+    print(sum(result.success for result in results))
+
+Notice: certificate verification is configured by AsyncHttpRunner(verify=...) for all
+testcases, `verify` in testcase config is ignored.
+
+"""
+
+import asyncio
+import json
+import sys
+import time
+import uuid
+from http.cookies import SimpleCookie
+from typing import Dict, List, Text
+from urllib.parse import urlencode
+
+from loguru import logger
+
+from httprunner.client import log_req_resp_records
+from httprunner.exceptions import ValidationFailure
+from httprunner.models import (
+    ProjectMeta,
+    RecordLevelEnum,
+    ReqRespData,
+    RequestData,
+    ResponseData,
+    SessionData,
+    TestCase,
+    VariablesMapping,
+)
+from httprunner.plan import TestCasePlan
+from httprunner.runner import HttpRunner
+from httprunner.utils import load_response_json, lower_dict_keys, omit_long_data
+
+try:
+    import httpx
+
+    AIO_READY = True
+except ModuleNotFoundError:
+    AIO_READY = False
+
+
+def ensure_aio_ready():
+    if AIO_READY:
+        return
+
+    msg = """
+    aio extension dependencies uninstalled, install first and try again.
+    install with pip:
+    $ pip install httpx
+
+    or you can install httprunner with optional aio dependencies:
+    $ pip install "httprunner[aio]"
+    """
+    logger.error(msg)
+    sys.exit(1)
+
+
+def prepare_request_kwargs(kwargs: Dict) -> Dict:
+    """ convert requests style arguments to httpx.AsyncClient.build_request arguments
+
+    Returns:
+        dict: request arguments, follow_redirects is kept for sending request
+
+    """
+    kwargs = dict(kwargs)
+
+    # client level arguments in httpx
+    for key in ["verify", "stream", "proxies", "cert"]:
+        kwargs.pop(key, None)
+
+    kwargs["follow_redirects"] = kwargs.pop("allow_redirects", True)
+
+    data = kwargs.get("data")
+    if isinstance(data, (Text, bytes)):
+        kwargs["content"] = kwargs.pop("data")
+    elif hasattr(data, "read"):
+        # e.g. MultipartEncoder for upload
+        kwargs["content"] = kwargs.pop("data").read()
+
+    return kwargs
+
+
+def get_req_resp_record(
+    resp_obj: "httpx.Response", record_level: Text = RecordLevelEnum.FULL
+) -> ReqRespData:
+    """ get request and response info from httpx.Response object,
+        request and response body are omitted in meta record level.
+    """
+    # record actual request info
+    request = resp_obj.request
+    request_headers = dict(request.headers)
+    request_cookies = {
+        key: morsel.value
+        for key, morsel in SimpleCookie(request.headers.get("cookie", "")).items()
+    }
+
+    request_body = request.content or None
+    if record_level == RecordLevelEnum.META:
+        request_body = None
+    elif request_body is not None:
+        try:
+            request_body = json.loads(request_body)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            # str: a=1&b=2, or bytes: request body in protobuf
+            pass
+
+        request_content_type = lower_dict_keys(request_headers).get("content-type")
+        if request_content_type and "multipart/form-data" in request_content_type:
+            # upload file type
+            request_body = "upload file stream (OMITTED)"
+
+    request_data = RequestData(
+        method=request.method,
+        url=str(request.url),
+        headers=request_headers,
+        cookies=request_cookies,
+        body=request_body,
+    )
+
+    # record response info
+    resp_headers = dict(resp_obj.headers)
+    content_type = lower_dict_keys(resp_headers).get("content-type", "")
+
+    if record_level == RecordLevelEnum.META:
+        response_body = ""
+    elif "image" in content_type:
+        # response is image type, record bytes content only
+        response_body = resp_obj.content
+    else:
+        try:
+            # try to record json data
+            response_body = load_response_json(resp_obj)
+        except ValueError:
+            # only record at most 512 text charactors
+            response_body = omit_long_data(resp_obj.text)
+
+    response_data = ResponseData(
+        status_code=resp_obj.status_code,
+        cookies=dict(resp_obj.cookies),
+        encoding=resp_obj.encoding,
+        headers=resp_headers,
+        content_type=content_type,
+        body=response_body,
+    )
+
+    return ReqRespData(request=request_data, response=response_data)
+
+
+class RequestTrace(object):
+    """ httpcore trace callback, time connecting phases and first byte of request.
+        name resolution is timed in TCP connect by httpcore.
+    """
+
+    def __init__(self):
+        self.started_at: Dict[Text, float] = {}
+        self.timings: Dict[Text, float] = {}
+
+    async def __call__(self, event_name: Text, info: Dict):
+        now = time.perf_counter()
+        phase, _, state = event_name.rpartition(".")
+        if state == "started":
+            self.started_at[phase] = now
+            return
+
+        if state != "complete":
+            return
+
+        if phase == "connection.connect_tcp":
+            self.timings["connect_ms"] = (now - self.started_at[phase]) * 1000
+        elif phase == "connection.start_tls":
+            self.timings["tls_ms"] = (now - self.started_at[phase]) * 1000
+        elif phase.endswith(".receive_response_headers"):
+            # time from request headers started sending to response headers received
+            protocol = phase.split(".")[0]
+            sent_at = self.started_at.get(f"{protocol}.send_request_headers", now)
+            self.timings["ttfb_ms"] = (now - sent_at) * 1000
+
+
+class AsyncHttpSession(object):
+    """
+    Awaitable counterpart of httprunner.client.HttpSession, requests are sent with
+    httpx.AsyncClient and each request is recorded in SessionData.
+    """
+
+    def __init__(
+        self,
+        client: "httpx.AsyncClient" = None,
+        record_level: Text = RecordLevelEnum.FULL,
+        **client_kwargs,
+    ):
+        ensure_aio_ready()
+        self.client = client or httpx.AsyncClient(**client_kwargs)
+        self.data = SessionData()
+        self.record_level = RecordLevelEnum(record_level)
+
+    def record_req_resps(
+        self, session_data: SessionData, response: "httpx.Response"
+    ) -> List[ReqRespData]:
+        """
+        record request and response histories of httpx.Response object in session data,
+        include 30X redirection. Records are built lazily and only once, the same as
+        httprunner.client.HttpSession.
+        """
+        if self.record_level != RecordLevelEnum.OFF and not session_data.req_resps:
+            response_list = response.history + [response]
+            session_data.req_resps = [
+                get_req_resp_record(resp_obj, self.record_level)
+                for resp_obj in response_list
+            ]
+
+        return session_data.req_resps
+
+    async def request(self, method, url, name=None, **kwargs) -> "httpx.Response":
+        """
+        Constructs and sends a request with requests style arguments.
+        Returns :py:class:`httpx.Response` object.
+        """
+        self.data = SessionData()
+
+        # timeout default to 120 seconds
+        kwargs.setdefault("timeout", 120)
+
+        start_timestamp = time.time()
+        response = await self._send_request_safe_mode(method, url, **kwargs)
+        response_time_ms = round((time.time() - start_timestamp) * 1000, 2)
+
+        try:
+            network_stream = response.extensions["network_stream"]
+            client_ip, client_port = network_stream.get_extra_info("client_addr")
+            server_ip, server_port = network_stream.get_extra_info("server_addr")
+            self.data.address.client_ip = client_ip
+            self.data.address.client_port = client_port
+            self.data.address.server_ip = server_ip
+            self.data.address.server_port = server_port
+            logger.debug(f"client IP: {client_ip}, Port: {client_port}")
+            logger.debug(f"server IP: {server_ip}, Port: {server_port}")
+        except (KeyError, TypeError, ValueError) as ex:
+            logger.warning(f"failed to get client/server address info: {ex}")
+
+        # bytes received, before decoding content encoding like gzip
+        content_size = response.num_bytes_downloaded
+
+        # record the consumed time and timing breakdown
+        self.data.stat.response_time_ms = response_time_ms
+        self.data.stat.content_size = content_size
+        trace = response.request.extensions.get("trace")
+        if isinstance(trace, RequestTrace):
+            for key, value in trace.timings.items():
+                setattr(self.data.stat, key, round(value, 2))
+        try:
+            self.data.stat.elapsed_ms = response.elapsed.total_seconds() * 1000
+        except RuntimeError:
+            # response is not sent, connection error occurred
+            self.data.stat.elapsed_ms = 0
+
+        # request and response histories are recorded lazily, log them in debug mode
+        if self.record_level != RecordLevelEnum.OFF:
+            session_data = self.data
+            log_req_resp_records(lambda: self.record_req_resps(session_data, response))
+
+        if response.is_error or response.status_code == 0:
+            logger.error(f"status_code: {response.status_code}, url: {url}")
+        else:
+            logger.info(
+                f"status_code: {response.status_code}, "
+                f"response_time(ms): {response_time_ms} ms, "
+                f"response_length: {content_size} bytes"
+            )
+
+        return response
+
+    async def _send_request_safe_mode(self, method, url, **kwargs):
+        """
+        Send a HTTP request, and catch any exception that might occur due to connection problems.
+        """
+        kwargs = prepare_request_kwargs(kwargs)
+        follow_redirects = kwargs.pop("follow_redirects")
+        # append params to query string in url like requests, instead of replacing
+        params = kwargs.pop("params", None)
+        if params:
+            url += ("&" if "?" in url else "?") + urlencode(params, doseq=True)
+
+        request = self.client.build_request(method, url, **kwargs)
+        request.extensions.setdefault("trace", RequestTrace())
+        try:
+            return await self.client.send(request, follow_redirects=follow_redirects)
+        except (httpx.UnsupportedProtocol, httpx.InvalidURL):
+            raise
+        except httpx.HTTPError as ex:
+            logger.error(f"{type(ex).__name__}: {ex}")
+            # with this status_code, content returns b""
+            return httpx.Response(0, request=request)
+
+
+class AsyncHttpRunner(object):
+    """ run testcases concurrently in one event loop, at most `concurrency` testcases
+        are running at the same time, sharing one connection pool.
+
+    Examples:
+        >>> runner = AsyncHttpRunner(concurrency=100)
+        >>> results = asyncio.run(runner.run_testcases([testcase_obj] * 1000))
+
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 100,
+        project_meta: ProjectMeta = None,
+        verify: bool = False,
+        transport: "httpx.AsyncBaseTransport" = None,
+    ):
+        ensure_aio_ready()
+        self.concurrency = concurrency
+        self.project_meta = project_meta
+        self.verify = verify
+        self.__transport = transport
+
+    async def run_testcase(
+        self,
+        testcase: TestCase,
+        variables: VariablesMapping = None,
+        transport: "httpx.AsyncBaseTransport" = None,
+        plan: TestCasePlan = None,
+    ) -> HttpRunner:
+        """ run testcase with a new session, failure or error of testcase is recorded
+            in result, thus other testcases running concurrently are not affected,
+            teststeps are compiled into plan unless compiled plan is given.
+        """
+        transport = transport or self.__transport
+        session = AsyncHttpSession(
+            record_level=testcase.config.record,
+            verify=self.verify,
+            transport=transport,
+        )
+        runner = (
+            HttpRunner()
+            .with_session(session)
+            .with_case_id(str(uuid.uuid4()))
+            .with_variables(dict(variables or {}))
+            .with_plan(plan or TestCasePlan(testcase.teststeps))
+        )
+        if self.project_meta:
+            runner.with_project_meta(self.project_meta)
+
+        try:
+            await runner.run_testcase_async(testcase)
+        except ValidationFailure:
+            pass
+        except Exception as ex:
+            # e.g. ExtractFailure, or error raised by transport
+            logger.error(
+                f"failed to run testcase {testcase.config.name}: "
+                f"{type(ex).__name__}: {ex}"
+            )
+            runner.success = False
+        finally:
+            if transport is None:
+                # client owns its transport if not shared
+                await session.client.aclose()
+
+        return runner
+
+    async def run_testcases(
+        self, testcases: List[TestCase], variables: VariablesMapping = None
+    ) -> List[HttpRunner]:
+        """ run testcases concurrently, results are in the same order of testcases
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        transport = self.__transport or httpx.AsyncHTTPTransport(
+            verify=self.verify, limits=httpx.Limits(max_connections=self.concurrency)
+        )
+
+        # teststeps of each testcase are compiled once in this run, plans are keyed by id
+        # of teststeps kept alive by testcases, and released with them after the run
+        plans: Dict[int, TestCasePlan] = {}
+        for testcase in testcases:
+            if id(testcase.teststeps) not in plans:
+                plans[id(testcase.teststeps)] = TestCasePlan(testcase.teststeps)
+
+        async def run_with_semaphore(testcase: TestCase) -> HttpRunner:
+            async with semaphore:
+                return await self.run_testcase(
+                    testcase, variables, transport, plans[id(testcase.teststeps)]
+                )
+
+        tasks = [
+            asyncio.ensure_future(run_with_semaphore(testcase))
+            for testcase in testcases
+        ]
+        try:
+            return await asyncio.gather(*tasks)
+        finally:
+            # shared transport is closed only after all tasks finished, e.g. cancelled
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+
+            if transport is not self.__transport:
+                await transport.aclose()
+
+    def run(
+        self, testcases: List[TestCase], variables: VariablesMapping = None
+    ) -> List[HttpRunner]:
+        """ run testcases concurrently in a new event loop
+        """
+        return asyncio.run(self.run_testcases(testcases, variables))
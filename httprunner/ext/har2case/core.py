@@ -10,7 +10,7 @@ from loguru import logger
 from sentry_sdk import capture_exception
 
 from httprunner.ext.har2case import utils
-from httprunner.make import make_testcase, format_pytest_with_black
+from httprunner.make import make_testcase
 
 try:
     from json.decoder import JSONDecodeError
@@ -372,6 +372,5 @@ class HarParser(object):
             # default to generate pytest file
             testcase["config"]["path"] = self.har_file_path
             output_testcase_file = make_testcase(testcase)
-            format_pytest_with_black(output_testcase_file)
 
         logger.info(f"generated testcase: {output_testcase_file}")
@@ -19,15 +19,48 @@ $ pip install locust
 import importlib.util
 import inspect
 import os
-from typing import List
+import threading
+from typing import List, Text, Union
 
 from loguru import logger
+from pydantic import ValidationError
 
+from httprunner.exceptions import TestSuiteFormatError
+from httprunner.ext.locust.scheduler import LocustScheduler
+from httprunner.ext.locust.shape import LoadProfile, build_load_stages
+from httprunner.models import TLoadShape
 
 """ converted pytest files from YAML/JSON testcases
 """
 pytest_files: List = []
 
+""" testcase classes loaded from pytest files, loaded once in each process and shared
+    read-only by all locust users, teststeps of each class are compiled on first run
+"""
+locust_testcases: Union[List, None] = None
+locust_testcases_lock = threading.Lock()
+
+""" testcases scheduler shared by all locust users in process,
+    select testcases in deterministic round robin with `--round-robin` argument
+"""
+locust_scheduler: Union[LocustScheduler, None] = None
+locust_round_robin: bool = False
+
+""" request events of teststeps are named by step name,
+    or by url template with `--name-by-url` argument, e.g. /users/$uid
+"""
+locust_name_by_url: bool = False
+
+""" run testcases on locust FastHttpSession (geventhttpclient) with `--fast-http`
+    argument, instead of requests based HttpSession
+"""
+locust_fast_http: bool = False
+
+""" load profile of `load_shape` declared in testsuite config, which is ticked by load
+    shape in locustfile, and paces users towards target rate of each stage
+"""
+locust_load_profile: Union[LoadProfile, None] = None
+
 
 def is_httprunner_testcase(item):
     """ check if a variable is a HttpRunner testcase class
@@ -42,27 +75,135 @@ def is_httprunner_testcase(item):
     )
 
 
-def prepare_locust_tests() -> List:
-    """ prepare locust testcases
+def load_locust_testcases() -> List:
+    """ load testcase classes from pytest files, each pytest file is imported only
+        once in current process.
 
     Returns:
         list: testcase class list
+
     """
+    global locust_testcases
+    with locust_testcases_lock:
+        if locust_testcases is not None:
+            return locust_testcases
 
-    locust_tests = []
+        testcases = []
+        for index, pytest_file in enumerate(pytest_files):
+            module_name = f"httprunner_locust_{index}"
+            spec = importlib.util.spec_from_file_location(module_name, pytest_file)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
 
-    for pytest_file in pytest_files:
-        spec = importlib.util.spec_from_file_location("module.name", pytest_file)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+            for name, item in vars(module).items():
+                if is_httprunner_testcase(item):
+                    testcases.append(item)
 
-        for name, item in vars(module).items():
+        logger.info(f"loaded {len(testcases)} testcases for locust users")
+        locust_testcases = testcases
+        return locust_testcases
 
-            if not is_httprunner_testcase(item):
-                continue
 
-            for _ in range(item.config.weight):
-                locust_tests.append(item)
+def get_locust_scheduler() -> LocustScheduler:
+    """ get testcases scheduler shared in current process, created on first call
+    """
+    global locust_scheduler
+    testcases = load_locust_testcases()
+    with locust_testcases_lock:
+        if locust_scheduler is None:
+            locust_scheduler = LocustScheduler(
+                testcases,
+                weights=[testcase.config.weight for testcase in testcases],
+                rates=[testcase.config.rate for testcase in testcases],
+                round_robin=locust_round_robin,
+            )
+
+        return locust_scheduler
+
+
+def load_locust_load_profile(test_path: Text) -> Union[LoadProfile, None]:
+    """ load profile of load shape declared in testsuite config
+
+    Returns:
+        LoadProfile: None if test path is not testsuite, or no load shape declared
+
+    """
+    from httprunner.loader import load_test_file
+
+    if os.path.splitext(test_path)[1].lower() not in [".yml", ".yaml", ".json"]:
+        return None
+
+    test_content = load_test_file(test_path)
+    if "testcases" not in test_content:
+        return None
+
+    load_shape = test_content.get("config", {}).get("load_shape")
+    if not load_shape:
+        return None
+
+    try:
+        load_shape = TLoadShape.parse_obj(load_shape)
+    except ValidationError as ex:
+        raise TestSuiteFormatError(
+            f"Invalid load_shape in testsuite config:\n"
+            f"file: {test_path}\nerror: {ex}"
+        )
+
+    stages = build_load_stages(load_shape)
+    logger.info(f"loaded load shape {load_shape.type.value} in {len(stages)} stages")
+    return LoadProfile(stages)
+
+
+def fire_request_event(
+    events,
+    request_type: Text,
+    name: Text,
+    response_time: float,
+    response_length: int,
+    exception: Exception = None,
+):
+    """ fire locust request event of teststep, listener of HttpRunner request steps
+    """
+    if hasattr(events, "request"):
+        # locust >= 1.5, request event for both success and failure
+        events.request.fire(
+            request_type=request_type,
+            name=name,
+            response_time=response_time,
+            response_length=response_length,
+            response=None,
+            context={},
+            exception=exception,
+        )
+    elif exception is not None:
+        events.request_failure.fire(
+            request_type=request_type,
+            name=name,
+            response_time=response_time,
+            response_length=response_length,
+            exception=exception,
+        )
+    else:
+        events.request_success.fire(
+            request_type=request_type,
+            name=name,
+            response_time=response_time,
+            response_length=response_length,
+        )
+
+
+def prepare_locust_tests() -> List:
+    """ prepare locust testcases, testcase classes are loaded once in each process,
+        deprecated, use get_locust_scheduler() to select testcases by weight instead.
+
+    Returns:
+        list: testcase class list, each class is repeated as its weight
+
+    """
+    locust_tests = []
+    for testcase in load_locust_testcases():
+        for _ in range(testcase.config.weight):
+            locust_tests.append(testcase)
 
     return locust_tests
 
@@ -80,6 +221,22 @@ def main_locusts():
     logger.remove()
     logger.add(sys.stderr, level="WARNING")
 
+    global locust_round_robin, locust_name_by_url, locust_fast_http
+    if "--round-robin" in sys.argv:
+        # select testcases in deterministic round robin instead of random
+        sys.argv.remove("--round-robin")
+        locust_round_robin = True
+
+    if "--name-by-url" in sys.argv:
+        # name request events by url template instead of step name
+        sys.argv.remove("--name-by-url")
+        locust_name_by_url = True
+
+    if "--fast-http" in sys.argv:
+        # send requests with FastHttpSession of FastHttpUser
+        sys.argv.remove("--fast-http")
+        locust_fast_http = True
+
     sys.argv[0] = "locust"
     if len(sys.argv) == 1:
         sys.argv.extend(["-h"])
@@ -104,8 +261,9 @@ def main_locusts():
 
     from httprunner.make import main_make
 
-    global pytest_files
+    global pytest_files, locust_load_profile
     testcase_file_path = sys.argv[testcase_index]
+    locust_load_profile = load_locust_load_profile(testcase_file_path)
     pytest_files = main_make([testcase_file_path])
     if not pytest_files:
         print("No valid testcases found, exit 1.")
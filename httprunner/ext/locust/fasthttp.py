@@ -0,0 +1,144 @@
+""" run HttpRunner testcases on locust FastHttpSession (geventhttpclient), select with
+`hrun locusts --fast-http`.
+
+Requests style arguments of teststeps are prepared into url, headers and body with
+requests, then sent by FastHttpSession without firing locust request event, since
+requests are reported per teststep by HttpRunner. Responses are adapted into
+requests.Response, thus extract, validate and recording work the same as HttpSession.
+
+Notice: `timeout` and `verify` of teststeps are ignored, they are configured in
+FastHttpUser by `network_timeout` and `insecure`. Response body is always read, thus
+stream mode of teststep only searches body materialized.
+
+"""
+import email.message
+import time
+from datetime import timedelta
+from typing import Dict, List, Text
+
+from loguru import logger
+from requests import PreparedRequest, Request
+from requests.cookies import extract_cookies_to_jar
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from httprunner.client import ApiResponse, get_req_resp_record, log_req_resp_records
+from httprunner.models import RecordLevelEnum, ReqRespData, SessionData
+
+
+def prepare_request(method: Text, url: Text, kwargs: Dict) -> PreparedRequest:
+    """ prepare requests style arguments into url, headers and body of request
+    """
+    kwargs = dict(kwargs)
+    # arguments configured in FastHttpUser, or handled in sending
+    for key in ["timeout", "verify", "stream", "proxies", "cert", "allow_redirects"]:
+        kwargs.pop(key, None)
+
+    prepared = Request(method, url, **kwargs).prepare()
+    if hasattr(prepared.body, "read"):
+        # e.g. MultipartEncoder for upload
+        prepared.body = prepared.body.read()
+    elif isinstance(prepared.body, str):
+        # e.g. form data a=1&b=2
+        prepared.body = prepared.body.encode("utf-8")
+
+    return prepared
+
+
+class _OriginalResponse(object):
+    """ response headers message, which is read by requests cookies extraction """
+
+    def __init__(self, headers: List):
+        self.msg = email.message.Message()
+        for key, value in headers:
+            self.msg[key] = value
+
+
+def adapt_response(fast_response, request: PreparedRequest) -> ApiResponse:
+    """ adapt FastResponse of locust FastHttpSession into requests.Response
+    """
+    headers = list(fast_response.headers.items()) if fast_response.headers else []
+
+    response = ApiResponse()
+    response.status_code = fast_response.status_code or 0
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = getattr(fast_response, "url", None) or request.url
+    response.request = request
+    response._content = fast_response.content or b""
+    response._content_consumed = True
+    response.error = getattr(fast_response, "error", None)
+
+    # cookies set by response, cookies of session are kept by FastHttpSession
+    response._original_response = _OriginalResponse(headers)
+    extract_cookies_to_jar(response.cookies, request, response)
+    return response
+
+
+class FastHttpRunnerSession(object):
+    """
+    Counterpart of httprunner.client.HttpSession on locust FastHttpSession, each request
+    is recorded in SessionData in the same format.
+    """
+
+    def __init__(self, client, record_level: Text = RecordLevelEnum.OFF):
+        self.client = client
+        self.data = SessionData()
+        self.record_level = RecordLevelEnum(record_level)
+
+    def record_req_resps(
+        self, session_data: SessionData, response: ApiResponse
+    ) -> List[ReqRespData]:
+        """
+        record request and response of adapted response in session data, redirection
+        is followed by FastHttpSession and only final response is recorded.
+        """
+        if self.record_level != RecordLevelEnum.OFF and not session_data.req_resps:
+            session_data.req_resps = [get_req_resp_record(response, self.record_level)]
+
+        return session_data.req_resps
+
+    def request(self, method, url, name=None, **kwargs) -> ApiResponse:
+        """
+        Constructs and sends a request with requests style arguments.
+        Returns adapted :py:class:`requests.Response` object.
+        """
+        self.data = SessionData()
+        request = prepare_request(method, url, kwargs)
+
+        start_timestamp = time.perf_counter()
+        # request event is fired only when response context is exited, thus never
+        fast_response = self.client.request(
+            request.method,
+            request.url,
+            name=name,
+            data=request.body,
+            headers=dict(request.headers),
+            allow_redirects=kwargs.get("allow_redirects", True),
+            catch_response=True,
+        )
+        response = adapt_response(fast_response, request)
+        response_time_ms = round((time.perf_counter() - start_timestamp) * 1000, 2)
+        response.elapsed = timedelta(milliseconds=response_time_ms)
+
+        self.data.stat.response_time_ms = response_time_ms
+        self.data.stat.content_size = len(response.content)
+
+        # request and response histories are recorded lazily, log them in debug mode
+        if self.record_level != RecordLevelEnum.OFF:
+            session_data = self.data
+            log_req_resp_records(lambda: self.record_req_resps(session_data, response))
+
+        if response.error or response.status_code == 0:
+            logger.error(
+                f"status_code: {response.status_code}, url: {url}, "
+                f"error: {response.error}"
+            )
+        else:
+            logger.info(
+                f"status_code: {response.status_code}, "
+                f"response_time(ms): {response_time_ms} ms, "
+                f"response_length: {self.data.stat.content_size} bytes"
+            )
+
+        return response
@@ -1,30 +1,89 @@
-import random
+import functools
 
-from locust import task, HttpUser, between
+from locust import task, events, between, User
 
-from httprunner.ext.locust import prepare_locust_tests
+from httprunner.client import HttpSession
+from httprunner.exceptions import ExtractFailure, ValidationFailure
+from httprunner.ext import locust as hrun_locust
+from httprunner.ext.locust import fire_request_event, get_locust_scheduler
+from httprunner.ext.locust.fasthttp import FastHttpRunnerSession
+from httprunner.ext.locust.shape import Pacer
+from httprunner.models import RecordLevelEnum
 
+if hrun_locust.locust_fast_http:
+    # client of FastHttpUser is FastHttpSession, based on geventhttpclient
+    from locust.contrib.fasthttp import FastHttpUser as BaseUser
+else:
+    BaseUser = User
 
-class HttpRunnerUser(HttpUser):
-    host = ""
-    wait_time = between(5, 15)
+
+class HttpRunnerUser(BaseUser):
+    # urls of teststeps are absolute, FastHttpUser only requires a valid host
+    host = "http://localhost" if hrun_locust.locust_fast_http else ""
+    # think time if target rate is declared in neither load shape nor testcases
+    think_time = between(5, 15)
+
+    def wait_time(self):
+        load_profile = hrun_locust.locust_load_profile
+        interval = load_profile.get_pacing_interval() if load_profile else 0
+        if interval:
+            return self.pacer.wait_time(interval)
+
+        if self.scheduler.is_rate_driven():
+            # only testcases with rate target exist, wait until next one is due
+            return self.scheduler.seconds_until_due()
+
+        return self.think_time()
 
     def on_start(self):
-        locust_tests = prepare_locust_tests()
-        self.testcase_runners = [
-            testcase().with_session(self.client) for testcase in locust_tests
-        ]
+        # testcases are loaded once in each process, and selected by shared scheduler
+        self.scheduler = get_locust_scheduler()
+        # requests are reported by runner per teststep, instead of by session per url
+        if hrun_locust.locust_fast_http:
+            self.session = FastHttpRunnerSession(self.client)
+        else:
+            self.session = HttpSession(record_level=RecordLevelEnum.OFF)
+        self.request_listener = functools.partial(
+            fire_request_event, self.environment.events
+        )
+        self.pacer = Pacer()
 
     @task
     def test_any(self):
-        test_runner = random.choice(self.testcase_runners)
+        testcase = self.scheduler.select()
+        if testcase is None:
+            # none of testcases with rate target is due, waited in wait_time
+            return
+
+        # runner is lightweight, only holding per user session and variables
+        test_runner = (
+            testcase()
+            .with_session(self.session)
+            .with_variables({})
+            .with_request_listener(
+                self.request_listener, name_by_url=hrun_locust.locust_name_by_url
+            )
+        )
         try:
             test_runner.run()
-        except Exception as ex:
-            self.environment.events.request_failure.fire(
-                request_type="Failed",
-                name=test_runner.config.name,
-                response_time=0,
-                response_length=0,
-                exception=ex,
-            )
+        except (ExtractFailure, ValidationFailure):
+            # failure has been reported as failed request of the teststep,
+            # other exceptions are raised to locust as errors of task
+            pass
+
+
+if hrun_locust.locust_load_profile is not None:
+    # LoadTestShape is missing in early locust 1.x, only required by load shape
+    from locust import LoadTestShape
+
+    class HttpRunnerLoadShape(LoadTestShape):
+        """ load shape declared in testsuite config, users and spawn rate of stages
+        """
+
+        def tick(self):
+            return hrun_locust.locust_load_profile.tick(self.get_run_time())
+
+    @events.test_start.add_listener
+    def on_test_start(**kwargs):
+        # users are paced by stages of run time in each process
+        hrun_locust.locust_load_profile.reset_time()
@@ -0,0 +1,161 @@
+""" select testcases for locust users by weight and rate targets.
+
+Weighted testcases are selected randomly with alias table in O(1), or in deterministic
+round robin with binary search of cumulative weights table in O(log n), memory of both
+is O(n) no matter how large the weights are.
+
+Testcases with rate target (`rate` in config, runs per second in each process) are
+paced by due times, and selected before weighted testcases once they are due. If only
+testcases with rate target exist, users wait until next one is due, without think time.
+
+"""
+import bisect
+import heapq
+import itertools
+import math
+import random
+import threading
+import time
+from typing import Any, List, Tuple, Union
+
+
+def build_alias_table(weights: List[float]) -> Tuple[List[float], List[int]]:
+    """ build alias table of weights with Vose's alias method
+
+    Returns:
+        tuple: probabilities and aliases of each index
+
+    """
+    count = len(weights)
+    total = sum(weights)
+    probabilities = [weight * count / total for weight in weights]
+    aliases = list(range(count))
+
+    small = [index for index, prob in enumerate(probabilities) if prob < 1]
+    large = [index for index, prob in enumerate(probabilities) if prob >= 1]
+    while small and large:
+        small_index = small.pop()
+        large_index = large.pop()
+        aliases[small_index] = large_index
+        probabilities[large_index] += probabilities[small_index] - 1
+        if probabilities[large_index] < 1:
+            small.append(large_index)
+        else:
+            large.append(large_index)
+
+    # left probabilities are 1, except float rounding errors
+    for index in small + large:
+        probabilities[index] = 1
+
+    return probabilities, aliases
+
+
+def get_coprime_stride(total: int) -> int:
+    """ get stride coprime with total and close to golden ratio of total,
+        thus positions of k * stride % total are spread evenly in each cycle.
+    """
+    stride = max(int(total * 0.6180339887), 1)
+    while math.gcd(stride, total) != 1:
+        stride += 1
+
+    return stride
+
+
+class LocustScheduler(object):
+    """ select testcases by weight and rate target, shared by all users in process.
+
+    Examples:
+        >>> scheduler = LocustScheduler([TestCaseA, TestCaseB], weights=[1, 300])
+        >>> scheduler.select()
+        TestCaseB
+
+    """
+
+    def __init__(
+        self,
+        items: List[Any],
+        weights: List[int],
+        rates: List[float] = None,
+        round_robin: bool = False,
+        seed: Any = None,
+    ):
+        rates = rates or [0] * len(items)
+        self.round_robin = round_robin
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+        # weighted items
+        self.items = [
+            item
+            for item, weight, rate in zip(items, weights, rates)
+            if not rate and weight > 0
+        ]
+        weights = [
+            weight for weight, rate in zip(weights, rates) if not rate and weight > 0
+        ]
+        if weights:
+            self.probabilities, self.aliases = build_alias_table(weights)
+            self.cumulative_weights = list(itertools.accumulate(weights))
+            self.total_weight = self.cumulative_weights[-1]
+            self.stride = get_coprime_stride(self.total_weight)
+        self.counter = itertools.count()
+
+        # items with rate target, heap of (due time, index)
+        self.rate_items = [item for item, rate in zip(items, rates) if rate]
+        self.intervals = [1.0 / rate for rate in rates if rate]
+        now = time.monotonic()
+        self.due_heap = [(now, index) for index in range(len(self.rate_items))]
+
+    def __select_due(self, now: float) -> Union[Any, None]:
+        with self.lock:
+            due_time, index = self.due_heap[0]
+            if due_time > now:
+                return None
+
+            # keep pace, lagging behind is caught up with at most one run
+            next_due_time = max(due_time + self.intervals[index], now)
+            heapq.heapreplace(self.due_heap, (next_due_time, index))
+            return self.rate_items[index]
+
+    def __select_weighted(self) -> Any:
+        if self.round_robin:
+            position = next(self.counter) * self.stride % self.total_weight
+            index = bisect.bisect_right(self.cumulative_weights, position)
+            return self.items[index]
+
+        value = self.random.random() * len(self.items)
+        index = int(value)
+        if value - index >= self.probabilities[index]:
+            index = self.aliases[index]
+
+        return self.items[index]
+
+    def select(self, now: float = None) -> Union[Any, None]:
+        """ select testcase, testcases with rate target are selected once they are due.
+
+        Returns:
+            testcase selected, None if only testcases with rate target exist and
+            none of them is due, wait seconds_until_due() then.
+
+        """
+        if self.due_heap:
+            item = self.__select_due(time.monotonic() if now is None else now)
+            if item is not None:
+                return item
+
+        if not self.items:
+            return None
+
+        return self.__select_weighted()
+
+    def is_rate_driven(self) -> bool:
+        """ only testcases with rate target exist, thus users are paced by due times """
+        return bool(self.due_heap) and not self.items
+
+    def seconds_until_due(self, now: float = None) -> float:
+        """ seconds until next testcase with rate target is due """
+        if not self.due_heap:
+            return 0
+
+        now = time.monotonic() if now is None else now
+        return max(self.due_heap[0][0] - now, 0)
@@ -0,0 +1,157 @@
+""" load shapes declared in testsuite config for hrun locusts.
+
+Load shape of ramp stages, constant arrival rate, spike or step-up is translated into
+load stages, which are ticked by locust LoadTestShape in locustfile. Target rate of
+stage is achieved by pacing each user, instead of fixed wait time.
+
+    config:
+        name: demo testsuite
+        load_shape:
+            type: step
+            duration: 600
+            users: 10
+            step_users: 10
+            step_duration: 60
+            rate: 5
+
+"""
+import bisect
+import itertools
+import math
+import time
+from typing import List, Tuple, Union
+
+from httprunner.exceptions import ParamsError
+from httprunner.models import LoadShapeEnum, TLoadShape, TLoadStage
+
+
+def build_load_stages(load_shape: TLoadShape) -> List[TLoadStage]:
+    """ translate load shape into load stages, rate of stages in spike and step shape
+        is scaled with users, thus each user is paced in the same interval.
+    """
+    if load_shape.type == LoadShapeEnum.RAMP:
+        if not load_shape.stages:
+            raise ParamsError("stages of ramp load shape should not be empty")
+        return list(load_shape.stages)
+
+    if load_shape.duration <= 0 or load_shape.users <= 0:
+        raise ParamsError(
+            f"duration and users of {load_shape.type.value} load shape should be "
+            f"positive, got duration: {load_shape.duration}, users: {load_shape.users}"
+        )
+
+    def new_stage(duration: float, users: int, spawn_rate: float) -> TLoadStage:
+        rate = load_shape.rate * users / load_shape.users
+        return TLoadStage(
+            duration=duration, users=users, spawn_rate=spawn_rate, rate=rate
+        )
+
+    if load_shape.type == LoadShapeEnum.CONSTANT_RATE:
+        if load_shape.rate <= 0:
+            raise ParamsError("rate of constant_rate load shape should be positive")
+        return [new_stage(load_shape.duration, load_shape.users, load_shape.spawn_rate)]
+
+    if load_shape.type == LoadShapeEnum.SPIKE:
+        if load_shape.spike_users <= load_shape.users or load_shape.spike_duration <= 0:
+            raise ParamsError(
+                "spike_users of spike load shape should be more than users, "
+                "and spike_duration should be positive"
+            )
+        # spike users are started and stopped in one second
+        spike_spawn_rate = max(
+            load_shape.spawn_rate, load_shape.spike_users - load_shape.users
+        )
+        stages = []
+        if load_shape.spike_at > 0:
+            stages.append(
+                new_stage(load_shape.spike_at, load_shape.users, load_shape.spawn_rate)
+            )
+        stages.append(
+            new_stage(
+                load_shape.spike_duration, load_shape.spike_users, spike_spawn_rate
+            )
+        )
+        rest = load_shape.duration - load_shape.spike_at - load_shape.spike_duration
+        if rest > 0:
+            stages.append(new_stage(rest, load_shape.users, spike_spawn_rate))
+        return stages
+
+    # step
+    if load_shape.step_users <= 0 or load_shape.step_duration <= 0:
+        raise ParamsError(
+            "step_users and step_duration of step load shape should be positive"
+        )
+    stages = []
+    for index in range(math.ceil(load_shape.duration / load_shape.step_duration)):
+        duration = min(
+            load_shape.step_duration,
+            load_shape.duration - index * load_shape.step_duration,
+        )
+        users = load_shape.users + index * load_shape.step_users
+        stages.append(new_stage(duration, users, load_shape.spawn_rate))
+    return stages
+
+
+class LoadProfile(object):
+    """ load stages ticked by run time, shared by locust load shape and users in process
+
+    Examples:
+        >>> profile = LoadProfile(build_load_stages(load_shape))
+        >>> profile.tick(run_time=30)
+        (10, 1.0)
+
+    """
+
+    def __init__(self, stages: List[TLoadStage]):
+        self.stages = stages
+        # run time at which each stage ends
+        self.end_times = list(itertools.accumulate(stage.duration for stage in stages))
+        self.start_time = time.monotonic()
+
+    def reset_time(self):
+        """ reset start time when load test starts """
+        self.start_time = time.monotonic()
+
+    def get_stage(self, run_time: float = None) -> Union[TLoadStage, None]:
+        """ get stage of run time, None if all stages are finished """
+        if run_time is None:
+            run_time = time.monotonic() - self.start_time
+
+        index = bisect.bisect_right(self.end_times, run_time)
+        if index >= len(self.stages):
+            return None
+
+        return self.stages[index]
+
+    def tick(self, run_time: float = None) -> Union[Tuple[int, float], None]:
+        """ get target users and spawn rate of run time, None to stop load test """
+        stage = self.get_stage(run_time)
+        if stage is None:
+            return None
+
+        return stage.users, stage.spawn_rate
+
+    def get_pacing_interval(self, run_time: float = None) -> float:
+        """ get seconds between starts of testcase runs for each user in stage,
+            thus all users of stage run testcases in target rate, 0 if unpaced.
+        """
+        stage = self.get_stage(run_time)
+        if stage is None or stage.rate <= 0:
+            return 0
+
+        return stage.users / stage.rate
+
+
+class Pacer(object):
+    """ pace runs of one user, each run starts in interval after previous one starts
+    """
+
+    def __init__(self):
+        self.next_start_at = time.monotonic()
+
+    def wait_time(self, interval: float, now: float = None) -> float:
+        """ get seconds to wait after current run, before next run starts """
+        now = time.monotonic() if now is None else now
+        # lagging behind is not caught up, otherwise runs burst after slow responses
+        self.next_start_at = max(self.next_start_at + interval, now)
+        return self.next_start_at - now
@@ -0,0 +1,301 @@
+""" stream extension, extract and validate very large json response body incrementally.
+
+If you want to use this extension, you should install the following dependencies first.
+
+- ijson
+
+Then you can enable stream mode for teststep as below:
+
+    - test:
+        name: export all orders
+        request:
+            url: http://httpbin.org/orders/export
+            method: GET
+            stream: true
+        extract:
+            first_order_id: body.orders[0].id
+        validate:
+            - eq: ["status_code", 200]
+            - eq: ["body.total", 100000]
+
+Or in pytest format with `RunRequest(...).get(...).set_stream(True)`.
+
+Field paths of body in extract and validate, e.g. body.total or body.orders[0].id, are
+searched together in one prefix scan of response body stream with iterative json parser,
+only the searched values are built, and reading stops once all of them are found.
+Thus peak memory is bounded no matter how large the response body is.
+
+Response body is materialized as usual if any expression can not be answered from stream,
+e.g. `body` itself, negative index, jmespath functions/projections, or check item with
+variables and functions, and for response read already (e.g. by teardown hooks).
+
+"""
+
+from typing import Any, Dict, Iterator, List, NoReturn, Text, Tuple, Union
+
+import requests
+from loguru import logger
+
+from httprunner.exceptions import ParamsError
+from httprunner.models import Validators, VariablesMapping
+from httprunner.response import (
+    FieldPathExpression,
+    ResponseObject,
+    RESPONSE_META_FIELDS,
+    compile_jmespath,
+    compile_validators,
+)
+
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+
+    STREAM_READY = True
+except ModuleNotFoundError:
+    STREAM_READY = False
+
+
+# bytes read from response body stream each time
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def ensure_stream_ready():
+    """ raise ModuleNotFoundError if stream extension dependencies uninstalled """
+    if STREAM_READY:
+        return
+
+    msg = """
+    stream extension dependencies uninstalled, install first and try again.
+    install with pip:
+    $ pip install ijson
+
+    or you can install httprunner with optional stream dependencies:
+    $ pip install "httprunner[stream]"
+    """
+    logger.error(msg)
+    raise ModuleNotFoundError(msg)
+
+
+def get_stream_paths(
+    exprs: List[Any],
+) -> Union[Dict[Text, Tuple[Tuple[bool, Any], ...]], None]:
+    """ get body field paths of jmespath expressions, which can be searched from stream.
+
+    Returns:
+        dict: mapping of expression and body field path, e.g.
+            {"body.orders[0].id": ((False, "orders"), (True, 0), (False, "id"))}
+        None: if any expression needs the whole body
+
+    """
+    stream_paths = {}
+    for expr in exprs:
+        if not isinstance(expr, Text) or "$" in expr:
+            # variable or function, check item is unknown until evaluated
+            return None
+
+        if not expr.startswith(RESPONSE_META_FIELDS):
+            # not response field
+            continue
+
+        compiled = compile_jmespath(expr)
+        if not isinstance(compiled, FieldPathExpression):
+            return None
+
+        field, path = compiled.path[0], tuple(compiled.path[1:])
+        if field != (False, "body"):
+            # status_code, headers or cookies
+            continue
+
+        if not path or any(is_index and key < 0 for is_index, key in path):
+            # the whole body or negative index needs the whole body
+            return None
+
+        stream_paths[expr] = path
+
+    return stream_paths
+
+
+class _ChunksReader(object):
+    """ file-like reader of response body chunks, consumed by ijson """
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self.chunks = chunks
+
+    def read(self, size: int = -1) -> bytes:
+        if size == 0:
+            # ijson reads 0 bytes to check source type
+            return b""
+
+        return next(self.chunks, b"")
+
+
+class JsonStreamScanner(object):
+    """ search field paths in json stream with one prefix scan,
+        only values of searched paths are built and scan stops once all are found.
+    """
+
+    def __init__(self, stream_paths: Dict[Text, Tuple[Tuple[bool, Any], ...]]):
+        # trie of field paths, each node is {"exprs": [...], "children": {key: node}}
+        self.trie = {"exprs": [], "children": {}}
+        for expr, path in stream_paths.items():
+            node = self.trie
+            for key in path:
+                node = node["children"].setdefault(key, {"exprs": [], "children": {}})
+            node["exprs"].append(expr)
+
+        # paths not found are None, same as jmespath
+        self.values: Dict[Text, Any] = {expr: None for expr in stream_paths}
+        self.resolved = set()
+        self.events: Iterator[Tuple[Text, Any]] = iter(())
+
+    @property
+    def pending(self) -> int:
+        return len(self.values) - len(self.resolved)
+
+    def scan(self, events: Iterator[Tuple[Text, Any]]) -> Dict[Text, Any]:
+        """ scan ijson basic_parse events, return mapping of expression and searched value
+        """
+        self.events = events
+        for event, value in self.events:
+            # only one top level json value
+            self.__scan_value(event, value, self.trie)
+            break
+
+        return self.values
+
+    def __resolve(self, node: Dict, value: Any) -> NoReturn:
+        """ resolve all unresolved expressions under node with value """
+        for expr in node["exprs"]:
+            if expr not in self.resolved:
+                self.values[expr] = value
+                self.resolved.add(expr)
+
+        for (is_index, key), child in node["children"].items():
+            if value is None:
+                child_value = None
+            elif is_index:
+                # same as jmespath, index is only applied to list
+                is_valid = isinstance(value, list) and key < len(value)
+                child_value = value[key] if is_valid else None
+            else:
+                child_value = value.get(key) if isinstance(value, dict) else None
+
+            self.__resolve(child, child_value)
+
+    def __build_value(self, event: Text, value: Any) -> Any:
+        builder = ObjectBuilder()
+        builder.event(event, value)
+        depth = 1 if event in ["start_map", "start_array"] else 0
+        while depth > 0:
+            event, value = next(self.events)
+            if event in ["start_map", "start_array"]:
+                depth += 1
+            elif event in ["end_map", "end_array"]:
+                depth -= 1
+            builder.event(event, value)
+
+        return builder.value
+
+    def __skip_value(self, event: Text) -> NoReturn:
+        depth = 1 if event in ["start_map", "start_array"] else 0
+        while depth > 0:
+            event, _ = next(self.events)
+            if event in ["start_map", "start_array"]:
+                depth += 1
+            elif event in ["end_map", "end_array"]:
+                depth -= 1
+
+    def __scan_value(self, event: Text, value: Any, node: Dict) -> NoReturn:
+        if node["exprs"]:
+            # build value once, expressions under it are resolved with built value
+            self.__resolve(node, self.__build_value(event, value))
+            return
+
+        if event == "start_map":
+            for event, value in self.events:
+                if event == "end_map":
+                    break
+
+                # map_key, followed by its value
+                child = node["children"].get((False, value))
+                event, value = next(self.events)
+                if child is None:
+                    self.__skip_value(event)
+                else:
+                    self.__scan_value(event, value, child)
+
+                if self.pending == 0:
+                    return
+
+        elif event == "start_array":
+            index = 0
+            for event, value in self.events:
+                if event == "end_array":
+                    break
+
+                child = node["children"].get((True, index))
+                if child is None:
+                    self.__skip_value(event)
+                else:
+                    self.__scan_value(event, value, child)
+
+                if self.pending == 0:
+                    return
+
+                index += 1
+
+        # fields not found in container or under scalar value are None
+        self.__resolve(node, None)
+
+
+def search_response_stream(resp_obj: ResponseObject, exprs: List[Any]) -> NoReturn:
+    """ search body field paths of expressions from response body stream,
+        searched values are saved in ResponseObject.stream_values.
+    """
+    resp = resp_obj.resp_obj
+    if not isinstance(resp, requests.Response) or resp._content_consumed:
+        # response has been read, e.g. by teardown hooks or other sessions
+        return
+
+    encoding = (resp.encoding or "utf-8").lower().replace("-", "")
+    if encoding != "utf8":
+        return
+
+    stream_paths = get_stream_paths(exprs)
+    if not stream_paths:
+        return
+
+    ensure_stream_ready()
+    scanner = JsonStreamScanner(stream_paths)
+    reader = _ChunksReader(resp.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+    try:
+        stream_values = scanner.scan(ijson.basic_parse(reader, use_float=True))
+    except (ijson.JSONError, StopIteration) as ex:
+        # response body is not in json format or incomplete, body can not be read again,
+        # thus searching body fields raises with the parse error
+        err_msg = f"failed to parse response body stream in json: {repr(ex)}"
+        logger.error(err_msg)
+        resp.hrun_stream_error = err_msg
+        return
+    finally:
+        # drop the rest of body, connection is released
+        resp.close()
+        resp.hrun_body_streamed = True
+
+    logger.debug(f"searched from response body stream: {list(stream_values.keys())}")
+    resp_obj.stream_values.update(stream_values)
+
+
+def search_step_stream(
+    resp_obj: ResponseObject, extractors: VariablesMapping, validators: Validators
+) -> NoReturn:
+    """ search response body stream with extractors and validators of teststep
+    """
+    try:
+        validators = compile_validators(validators)
+    except ParamsError:
+        # invalid validator is reported when validating
+        return
+
+    exprs = list(extractors.values()) + [v.check for v in validators]
+    search_response_stream(resp_obj, exprs)
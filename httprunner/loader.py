@@ -1,10 +1,13 @@
+import builtins
 import csv
 import importlib
 import json
 import os
 import sys
 import types
-from typing import Tuple, Dict, Union, Text, List, Callable
+from collections import ChainMap
+from collections.abc import Sequence
+from typing import Tuple, Dict, Union, Text, List, Callable, Mapping, Any, NoReturn
 
 import yaml
 from loguru import logger
@@ -12,7 +15,7 @@ from pydantic import ValidationError
 
 from httprunner import builtin, utils
 from httprunner import exceptions
-from httprunner.models import TestCase, ProjectMeta, TestSuite
+from httprunner.models import TestCase, ProjectMeta, TestSuite, FunctionsMapping
 
 try:
     # PyYAML version >= 5.1
@@ -24,6 +27,19 @@ except AttributeError:
 
 project_meta: Union[ProjectMeta, None] = None
 
+""" function lookup tables, built on first lookup and reset when project meta reloaded
+"""
+builtin_functions_table: Dict[Text, Any] = {}
+project_functions_table: Dict[Text, Any] = {}
+# merged project functions mapping and its count, project table is rebuilt if project
+# functions mapping is replaced or functions are added
+project_functions_source: Union[FunctionsMapping, None] = None
+project_functions_count: int = -1
+
+""" loaded csv files, csv file path => ((mtime, size), CSVParameters)
+"""
+csv_files_cache: Dict[Text, Tuple[Tuple[int, int], "CSVParameters"]] = {}
+
 
 def _load_yaml_file(yaml_file: Text) -> Dict:
     """ load yaml file and check file content format
@@ -145,14 +161,137 @@ def load_dot_env_file(dot_env_path: Text) -> Dict:
     return env_variables_mapping
 
 
-def load_csv_file(csv_file: Text) -> List[Dict]:
-    """ load csv file and check file content format
+class CSVParameters(Sequence):
+    """ csv file content stored in columns, each row is converted to dict on demand """
+
+    def __init__(self, headers: List[Text], columns: List[Tuple[Text, ...]]):
+        self.headers = headers
+        self.columns = columns
+        self.rows_count = len(columns[0]) if columns else 0
+
+    def __len__(self) -> int:
+        return self.rows_count
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict, List[Dict]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.rows_count))]
+
+        return {
+            header: column[index] for header, column in zip(self.headers, self.columns)
+        }
+
+    def __iter__(self):
+        for row in zip(*self.columns):
+            yield dict(zip(self.headers, row))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, tuple, CSVParameters)):
+            return list(self) == list(other)
+
+        return NotImplemented
+
+    def __repr__(self) -> Text:
+        return f"<CSVParameters headers={self.headers} rows={self.rows_count}>"
+
+    def select(self, headers: List[Text]) -> "CSVParameters":
+        """ select columns by headers, rows are not loaded """
+        columns = []
+        for header in headers:
+            if header not in self.headers:
+                raise exceptions.ParamsError(
+                    f"parameter name {header} not found in csv headers {self.headers}"
+                )
+
+            columns.append(self.columns[self.headers.index(header)])
+
+        return CSVParameters(headers, columns)
+
+
+class CSVStream(object):
+    """ csv file content in stream mode, rows are read from file in each iteration,
+        used for very large data file which should not be loaded in memory.
+    """
+
+    def __init__(self, csv_file: Text, headers: List[Text] = None):
+        self.csv_file = csv_file
+        self.headers = headers
+
+    def __iter__(self):
+        with open(self.csv_file, encoding="utf-8") as csvfile:
+            reader = csv.DictReader(csvfile)
+            for row in reader:
+                if self.headers is None:
+                    yield row
+                else:
+                    yield {header: row[header] for header in self.headers}
+
+    def __repr__(self) -> Text:
+        return f"<CSVStream {self.csv_file}>"
+
+    def select(self, headers: List[Text]) -> "CSVStream":
+        """ select columns by headers, rows are not loaded """
+        with open(self.csv_file, encoding="utf-8") as csvfile:
+            csv_headers = csv.DictReader(csvfile).fieldnames or []
+
+        for header in headers:
+            if header not in csv_headers:
+                raise exceptions.ParamsError(
+                    f"parameter name {header} not found in csv headers {csv_headers}"
+                )
+
+        return CSVStream(self.csv_file, headers)
+
+
+def _load_csv_columns(csv_file: Text) -> CSVParameters:
+    with open(csv_file, encoding="utf-8") as csvfile:
+        reader = csv.reader(csvfile)
+        headers = next(reader, [])
+        headers_count = len(headers)
+        columns = [[] for _ in headers]
+        for row in reader:
+            if not row:
+                # skip blank line, the same as csv.DictReader
+                continue
+
+            # missing values are None, the same as csv.DictReader
+            row += [None] * (headers_count - len(row))
+            for column, value in zip(columns, row):
+                column.append(value)
+
+    return CSVParameters(headers, [tuple(column) for column in columns])
+
+
+def parse_stream_flag(stream: Union[bool, Text]) -> bool:
+    """ parse stream flag of parameterize, e.g. `true` in ${parameterize(a.csv, true)}
+        is passed as string, only true/false in any case is valid.
+    """
+    if isinstance(stream, bool):
+        return stream
+
+    if isinstance(stream, Text) and stream.strip().lower() in ["true", "false"]:
+        return stream.strip().lower() == "true"
+
+    raise exceptions.ParamsError(
+        f"invalid stream flag of csv file, expect true or false, got: {stream!r}"
+    )
+
+
+def load_csv_file(
+    csv_file: Text, stream: Union[bool, Text] = False
+) -> Union[CSVParameters, CSVStream]:
+    """ load csv file and check file content format,
+        loaded content is cached until csv file is modified.
 
     Args:
         csv_file (str): csv file path, csv file content is like below:
+        stream (bool): load csv file in stream mode, rows are read in each iteration,
+            true/false string is accepted. Notice that generated pytest files pass
+            parameters to pytest.mark.parametrize, which loads all rows in list,
+            thus stream mode only saves memory in direct run mode.
 
     Returns:
-        list: list of parameters, each parameter is in dict format
+        CSVParameters: list of parameters, each parameter is in dict format
+        CSVStream: iterable parameters, if in stream mode
 
     Examples:
         >>> cat csv_file
@@ -181,14 +320,21 @@ def load_csv_file(csv_file: Text) -> List[Dict]:
         # file path not exist
         raise exceptions.CSVNotFound(csv_file)
 
-    csv_content_list = []
+    if parse_stream_flag(stream):
+        return CSVStream(csv_file)
 
-    with open(csv_file, encoding="utf-8") as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            csv_content_list.append(row)
+    stat = os.stat(csv_file)
+    file_version = (stat.st_mtime_ns, stat.st_size)
+    try:
+        cached_version, csv_parameters = csv_files_cache[csv_file]
+        if cached_version == file_version:
+            return csv_parameters
+    except KeyError:
+        pass
 
-    return csv_content_list
+    csv_parameters = _load_csv_columns(csv_file)
+    csv_files_cache[csv_file] = (file_version, csv_parameters)
+    return csv_parameters
 
 
 def load_folder_files(folder_path: Text, recursive: bool = True) -> List:
@@ -262,6 +408,78 @@ def load_builtin_functions() -> Dict[Text, Callable]:
     return load_module_functions(builtin)
 
 
+def load_builtin_functions_table() -> Dict[Text, Any]:
+    """ load lookup table of functions not defined in debugtalk.py, resolved in order of
+        special functions, HttpRunner builtin functions and Python builtins.
+    """
+    global builtin_functions_table
+    if builtin_functions_table:
+        return builtin_functions_table
+
+    # extension for upload test
+    from httprunner.ext import uploader
+
+    functions_table = dict(vars(builtins))
+    functions_table.update(load_builtin_functions())
+    functions_table.update(
+        {
+            "parameterize": load_csv_file,
+            "P": load_csv_file,
+            "environ": utils.get_os_environ,
+            "ENV": utils.get_os_environ,
+            "multipart_encoder": uploader.multipart_encoder,
+            "multipart_content_type": uploader.multipart_content_type,
+        }
+    )
+    builtin_functions_table = functions_table
+    return builtin_functions_table
+
+
+def load_functions_table(functions_mapping: FunctionsMapping) -> Mapping[Text, Any]:
+    """ load function lookup table, functions in functions_mapping take precedence over
+        builtin functions table. Table of project functions is merged only once and
+        rebuilt if project functions mapping is replaced or functions are added, call
+        reset_functions_table() after replacing functions in place. Other functions
+        mapping is chained with builtin functions table.
+
+    Args:
+        functions_mapping: functions mapping, e.g. debugtalk.py functions
+
+    Returns:
+        mapping of function name and function, resolved with single lookup.
+
+    """
+    global project_functions_table, project_functions_source, project_functions_count
+    if not functions_mapping:
+        return load_builtin_functions_table()
+
+    if project_meta is None or functions_mapping is not project_meta.functions:
+        return ChainMap(functions_mapping, load_builtin_functions_table())
+
+    # checked in O(1), no matter how many functions are defined in debugtalk.py
+    if (
+        functions_mapping is not project_functions_source
+        or len(functions_mapping) != project_functions_count
+    ):
+        functions_table = dict(load_builtin_functions_table())
+        functions_table.update(functions_mapping)
+        project_functions_table = functions_table
+        project_functions_source = functions_mapping
+        project_functions_count = len(functions_mapping)
+
+    return project_functions_table
+
+
+def reset_functions_table() -> NoReturn:
+    """ reset function lookup tables, rebuilt on next lookup """
+    global builtin_functions_table, project_functions_table
+    global project_functions_source, project_functions_count
+    builtin_functions_table = {}
+    project_functions_table = {}
+    project_functions_source = None
+    project_functions_count = -1
+
+
 def locate_file(start_path: Text, file_name: Text) -> Text:
     """ locate filename and return absolute file path.
         searching will be recursive upward until system root dir.
@@ -400,6 +618,7 @@ def load_project_meta(test_path: Text, reload: bool = False) -> ProjectMeta:
         return project_meta
 
     project_meta = ProjectMeta()
+    reset_functions_table()
 
     if not test_path:
         return project_meta
@@ -1,9 +1,13 @@
+import hashlib
+import json
 import os
 import string
-import subprocess
 import sys
-from typing import Text, List, Tuple, Dict, Set, NoReturn
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Text, List, Tuple, Dict, Set, NoReturn, Union
 
+import black
 import jinja2
 from loguru import logger
 from sentry_sdk import capture_exception
@@ -34,6 +38,39 @@ pytest_files_made_cache_mapping: Dict[Text, Text] = {}
 """
 pytest_files_run_set: Set = set()
 
+""" source files (YAML/JSON/debugtalk.py/pyproject.toml) and referenced pytest files
+    of each made pytest file, both are transitive, used to validate make cache
+"""
+pytest_files_deps_mapping: Dict[Text, Set[Text]] = {}
+pytest_files_refs_mapping: Dict[Text, Set[Text]] = {}
+
+""" pytest files written in current making, the others are reused from make cache
+"""
+pytest_files_written_set: Set = set()
+
+""" persistent make cache, saved in project RootDir and keyed by source file path
+
+    {
+        "/abs/path/to/testcase.yml": {
+            "hash": "sha256 of source file content",
+            "deps": {"/abs/path/to/ref_testcase.yml": "sha256 of file content"},
+            "made": {"/abs/path/to/testcase_test.py": "Testcase"},
+            "run": ["/abs/path/to/testcase_test.py"]
+        }
+    }
+
+"""
+MAKE_CACHE_PATH = os.path.join(".hrun_cache", "make.json")
+make_cache_mapping: Dict[Text, Dict] = {}
+
+""" pytest files reused from make cache in current making
+"""
+pytest_files_reused_set: Set = set()
+
+# testcases are made in process pool without --workers only if there are more jobs,
+# since starting worker processes costs more than making a few testcases
+MAKE_POOL_MIN_JOBS = 50
+
 __TEMPLATE__ = jinja2.Template(
     """# NOTE: Generated By HttpRunner v{{ version }}
 # FROM: {{ testcase_path }}
@@ -166,28 +203,62 @@ def convert_testcase_path(testcase_abs_path: Text) -> Tuple[Text, Text]:
     return testcase_python_abs_path, name_in_title_case
 
 
-def format_pytest_with_black(*python_paths: Text) -> NoReturn:
-    logger.info("format pytest cases with black ...")
+@lru_cache(maxsize=None)
+def load_black_mode(pyproject_path: Union[Text, None]) -> black.FileMode:
+    """ load black mode from [tool.black] settings of pyproject.toml, including
+        line-length, target-version and skip-string-normalization.
+    """
+    if not pyproject_path:
+        return black.FileMode()
+
     try:
-        if is_support_multiprocessing() or len(python_paths) <= 1:
-            subprocess.run(["black", *python_paths])
-        else:
-            logger.warning(
-                "this system does not support multiprocessing well, format files one by one ..."
-            )
-            [subprocess.run(["black", path]) for path in python_paths]
-    except subprocess.CalledProcessError as ex:
+        config = black.parse_pyproject_toml(pyproject_path)
+        target_versions = {
+            black.TargetVersion[version.upper()]
+            for version in config.get("target_version", [])
+        }
+        return black.FileMode(
+            target_versions=target_versions,
+            line_length=config.get("line_length", black.DEFAULT_LINE_LENGTH),
+            string_normalization=not config.get("skip_string_normalization", False),
+        )
+    except Exception as ex:
         capture_exception(ex)
-        logger.error(ex)
-        sys.exit(1)
-    except FileNotFoundError:
-        err_msg = """
-missing dependency tool: black
-install black manually and try again:
-$ pip install black
-"""
-        logger.error(err_msg)
-        sys.exit(1)
+        logger.warning(f"failed to load black settings from {pyproject_path}: {ex}")
+        return black.FileMode()
+
+
+def find_black_pyproject(python_path: Text) -> Union[Text, None]:
+    """ find pyproject.toml with black settings of python file, the same as running
+        black on the file, return None if not found.
+    """
+    python_dir_path = os.path.dirname(os.path.abspath(python_path))
+    return black.find_pyproject_toml((python_dir_path,))
+
+
+def format_pytest_content(content: Text, mode: black.FileMode = None) -> Text:
+    """ format generated pytest content with black in process,
+        return content unformatted with warning if failed.
+    """
+    try:
+        return black.format_str(content, mode=mode or black.FileMode())
+    except Exception as ex:
+        capture_exception(ex)
+        logger.warning(f"failed to format pytest content with black: {ex}")
+        return content
+
+
+def format_pytest_with_black(*python_paths: Text) -> NoReturn:
+    """ format pytest files with black in process, kept for compatibility since
+        pytest files are formatted with format_pytest_content before written.
+    """
+    for python_path in python_paths:
+        with open(python_path, encoding="utf-8") as f:
+            content = f.read()
+
+        black_mode = load_black_mode(find_black_pyproject(python_path))
+        with open(python_path, "w", encoding="utf-8") as f:
+            f.write(format_pytest_content(content, black_mode))
 
 
 def make_config_chain_style(config: Dict) -> Text:
@@ -209,6 +280,15 @@ def make_config_chain_style(config: Dict) -> Text:
     if "weight" in config:
         config_chain_style += f'.locust_weight({config["weight"]})'
 
+    if "rate" in config:
+        config_chain_style += f'.locust_rate({config["rate"]})'
+
+    if "record" in config:
+        config_chain_style += f'.record("{config["record"]}")'
+
+    if "connection_pool" in config:
+        config_chain_style += f'.connection_pool(**{config["connection_pool"]})'
+
     return config_chain_style
 
 
@@ -253,6 +333,10 @@ def make_request_chain_style(request: Dict) -> Text:
         allow_redirects = request["allow_redirects"]
         request_chain_style += f".set_allow_redirects({allow_redirects})"
 
+    if "stream" in request:
+        stream = request["stream"]
+        request_chain_style += f".set_stream({stream})"
+
     if "upload" in request:
         upload = request["upload"]
         request_chain_style += f".upload(**{upload})"
@@ -337,6 +421,34 @@ def make_teststep_chain_style(teststep: Dict) -> Text:
     return f"Step({step_info})"
 
 
+def load_ref_testcase(teststep: Dict) -> Dict:
+    """load testcase referenced by teststep, api in v2 format is converted to v3 testcase"""
+    ref_testcase_path = __ensure_absolute(teststep["testcase"])
+    test_content = load_test_file(ref_testcase_path)
+
+    if not isinstance(test_content, Dict):
+        raise exceptions.TestCaseFormatError(f"Invalid teststep: {teststep}")
+
+    # api in v2 format, convert to v3 testcase
+    if "request" in test_content and "name" in test_content:
+        test_content = ensure_testcase_v3_api(test_content)
+
+    test_content.setdefault("config", {})["path"] = ref_testcase_path
+    return test_content
+
+
+def get_testcase_python_path(testcase: Dict, dir_path: Text = None) -> Text:
+    """get pytest file path to be made from testcase dict"""
+    testcase_abs_path = __ensure_absolute(testcase["config"]["path"])
+    testcase_python_abs_path, _ = convert_testcase_path(testcase_abs_path)
+    if dir_path:
+        testcase_python_abs_path = os.path.join(
+            dir_path, os.path.basename(testcase_python_abs_path)
+        )
+
+    return testcase_python_abs_path
+
+
 def make_testcase(testcase: Dict, dir_path: Text = None) -> Text:
     """convert valid testcase dict to pytest file path"""
     # ensure compatibility with testcase format v2
@@ -360,8 +472,14 @@ def make_testcase(testcase: Dict, dir_path: Text = None) -> Text:
     if testcase_python_abs_path in pytest_files_made_cache_mapping:
         return testcase_python_abs_path
 
+    deps = {testcase_abs_path}
+    refs = set()
+
     config = testcase["config"]
     config["path"] = convert_relative_project_root_dir(testcase_python_abs_path)
+    if isinstance(config.get("variables"), Text):
+        # variables generated by debugtalk.py functions
+        deps.add(load_project_meta(testcase_abs_path).debugtalk_path)
     config["variables"] = convert_variables(
         config.get("variables", {}), testcase_abs_path
     )
@@ -374,18 +492,11 @@ def make_testcase(testcase: Dict, dir_path: Text = None) -> Text:
             continue
 
         # make ref testcase pytest file
-        ref_testcase_path = __ensure_absolute(teststep["testcase"])
-        test_content = load_test_file(ref_testcase_path)
-
-        if not isinstance(test_content, Dict):
-            raise exceptions.TestCaseFormatError(f"Invalid teststep: {teststep}")
-
-        # api in v2 format, convert to v3 testcase
-        if "request" in test_content and "name" in test_content:
-            test_content = ensure_testcase_v3_api(test_content)
-
-        test_content.setdefault("config", {})["path"] = ref_testcase_path
+        test_content = load_ref_testcase(teststep)
         ref_testcase_python_abs_path = make_testcase(test_content)
+        deps.update(pytest_files_deps_mapping.get(ref_testcase_python_abs_path, set()))
+        refs.add(ref_testcase_python_abs_path)
+        refs.update(pytest_files_refs_mapping.get(ref_testcase_python_abs_path, set()))
 
         # override testcase export
         ref_testcase_export: List = test_content["config"].get("export", [])
@@ -426,7 +537,12 @@ def make_testcase(testcase: Dict, dir_path: Text = None) -> Text:
             make_teststep_chain_style(step) for step in teststeps
         ],
     }
-    content = __TEMPLATE__.render(data)
+    # formatted with black settings of project, which is a dependency of made cache
+    pyproject_path = find_black_pyproject(testcase_python_abs_path)
+    deps.add(pyproject_path)
+    content = format_pytest_content(
+        __TEMPLATE__.render(data), load_black_mode(pyproject_path)
+    )
 
     # ensure new file's directory exists
     dir_path = os.path.dirname(testcase_python_abs_path)
@@ -437,6 +553,9 @@ def make_testcase(testcase: Dict, dir_path: Text = None) -> Text:
         f.write(content)
 
     pytest_files_made_cache_mapping[testcase_python_abs_path] = testcase_cls_name
+    pytest_files_deps_mapping[testcase_python_abs_path] = deps
+    pytest_files_refs_mapping[testcase_python_abs_path] = refs
+    pytest_files_written_set.add(testcase_python_abs_path)
     __ensure_testcase_module(testcase_python_abs_path)
 
     logger.info(f"generated testcase: {testcase_python_abs_path}")
@@ -444,8 +563,48 @@ def make_testcase(testcase: Dict, dir_path: Text = None) -> Text:
     return testcase_python_abs_path
 
 
-def make_testsuite(testsuite: Dict) -> NoReturn:
-    """convert valid testsuite dict to pytest folder with testcases"""
+def prepare_testsuite_testcase(
+    testcase: Dict, testsuite_config: Dict, testsuite_variables: Dict
+) -> Dict:
+    """load testsuite referenced testcase, override its config with testsuite settings"""
+    # get referenced testcase content
+    testcase_file = testcase["testcase"]
+    testcase_path = __ensure_absolute(testcase_file)
+    testcase_dict = load_test_file(testcase_path)
+    testcase_dict.setdefault("config", {})
+    testcase_dict["config"]["path"] = testcase_path
+
+    # override testcase name
+    testcase_dict["config"]["name"] = testcase["name"]
+    # override base_url
+    base_url = testsuite_config.get("base_url") or testcase.get("base_url")
+    if base_url:
+        testcase_dict["config"]["base_url"] = base_url
+    # override verify
+    if "verify" in testsuite_config:
+        testcase_dict["config"]["verify"] = testsuite_config["verify"]
+    # override variables
+    # testsuite testcase variables > testsuite config variables
+    testcase_variables = convert_variables(testcase.get("variables", {}), testcase_path)
+    testcase_variables = merge_variables(testcase_variables, testsuite_variables)
+    # testsuite testcase variables > testcase config variables
+    testcase_dict["config"]["variables"] = convert_variables(
+        testcase_dict["config"].get("variables", {}), testcase_path
+    )
+    testcase_dict["config"]["variables"].update(testcase_variables)
+
+    # override weight
+    if "weight" in testcase:
+        testcase_dict["config"]["weight"] = testcase["weight"]
+    # override rate
+    if "rate" in testcase:
+        testcase_dict["config"]["rate"] = testcase["rate"]
+
+    return testcase_dict
+
+
+def prepare_testsuite(testsuite: Dict) -> List[Tuple[Dict, Text]]:
+    """prepare testsuite testcases to be made under folder named by testsuite file"""
     # validate testsuite format
     load_testsuite(testsuite)
 
@@ -455,157 +614,479 @@ def make_testsuite(testsuite: Dict) -> NoReturn:
         testsuite_config.get("variables", {}), testsuite_path
     )
 
-    logger.info(f"start to make testsuite: {testsuite_path}")
-
     # create directory with testsuite file name, put its testcases under this directory
     testsuite_path = ensure_file_abs_path_valid(testsuite_path)
     testsuite_dir, file_suffix = os.path.splitext(testsuite_path)
     # demo_testsuite.yml => demo_testsuite_yml
     testsuite_dir = f"{testsuite_dir}_{file_suffix.lstrip('.')}"
 
-    for testcase in testsuite["testcases"]:
-        # get referenced testcase content
-        testcase_file = testcase["testcase"]
-        testcase_path = __ensure_absolute(testcase_file)
-        testcase_dict = load_test_file(testcase_path)
-        testcase_dict.setdefault("config", {})
-        testcase_dict["config"]["path"] = testcase_path
-
-        # override testcase name
-        testcase_dict["config"]["name"] = testcase["name"]
-        # override base_url
-        base_url = testsuite_config.get("base_url") or testcase.get("base_url")
-        if base_url:
-            testcase_dict["config"]["base_url"] = base_url
-        # override verify
-        if "verify" in testsuite_config:
-            testcase_dict["config"]["verify"] = testsuite_config["verify"]
-        # override variables
-        # testsuite testcase variables > testsuite config variables
-        testcase_variables = convert_variables(
-            testcase.get("variables", {}), testcase_path
-        )
-        testcase_variables = merge_variables(testcase_variables, testsuite_variables)
-        # testsuite testcase variables > testcase config variables
-        testcase_dict["config"]["variables"] = convert_variables(
-            testcase_dict["config"].get("variables", {}), testcase_path
+    return [
+        (
+            prepare_testsuite_testcase(testcase, testsuite_config, testsuite_variables),
+            testsuite_dir,
         )
-        testcase_dict["config"]["variables"].update(testcase_variables)
+        for testcase in testsuite["testcases"]
+    ]
+
 
-        # override weight
-        if "weight" in testcase:
-            testcase_dict["config"]["weight"] = testcase["weight"]
+def make_testsuite(testsuite: Dict) -> List[Text]:
+    """convert valid testsuite dict to pytest folder with testcases"""
+    logger.info(f"start to make testsuite: {testsuite['config']['path']}")
 
+    testcase_pytest_paths = []
+    for testcase_dict, testsuite_dir in prepare_testsuite(testsuite):
         # make testcase
         testcase_pytest_path = make_testcase(testcase_dict, testsuite_dir)
         pytest_files_run_set.add(testcase_pytest_path)
+        testcase_pytest_paths.append(testcase_pytest_path)
+
+    return testcase_pytest_paths
+
+
+def get_file_hash(file_path: Text) -> Text:
+    """ get sha256 hash of file content, return empty string if file not exists
+    """
+    try:
+        with open(file_path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return ""
+
+
+def load_make_cache(project_root_dir: Text) -> Dict[Text, Dict]:
+    """ load make cache in project RootDir, made with other HttpRunner version is dropped
+    """
+    make_cache_path = os.path.join(project_root_dir, MAKE_CACHE_PATH)
+    try:
+        with open(make_cache_path, encoding="utf-8") as f:
+            make_cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(make_cache, Dict) or make_cache.get("version") != __version__:
+        return {}
+
+    return make_cache.get("files", {})
+
+
+def dump_make_cache(project_root_dir: Text) -> NoReturn:
+    make_cache_path = os.path.join(project_root_dir, MAKE_CACHE_PATH)
+    os.makedirs(os.path.dirname(make_cache_path), exist_ok=True)
+    with open(make_cache_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"version": __version__, "files": make_cache_mapping},
+            f,
+            indent=4,
+            ensure_ascii=False,
+        )
+
+
+def __reuse_made_files(test_file: Text) -> bool:
+    """ reuse pytest files made from test file if neither it nor its dependencies changed
+    """
+    made_cache = make_cache_mapping.get(test_file)
+    if not made_cache or made_cache["hash"] != get_file_hash(test_file):
+        return False
+
+    for dep_path, dep_hash in made_cache["deps"].items():
+        if get_file_hash(dep_path) != dep_hash:
+            return False
+
+    for pytest_file in made_cache["made"]:
+        if not os.path.isfile(pytest_file):
+            return False
 
+    logger.info(f"reuse pytest files made from: {test_file}")
+    pytest_files_run_set.update(made_cache["run"])
+    pytest_files_reused_set.update(made_cache["made"])
+    return True
 
-def __make(tests_path: Text) -> NoReturn:
-    """ make testcase(s) with testcase/testsuite/folder absolute path
-        generated pytest file path will be cached in pytest_files_made_cache_mapping
+
+def __update_make_cache(
+    test_file: Text, testcase_pytest_paths: List[Text], deps: Set[Text] = None
+) -> NoReturn:
+    """ save pytest files made from test file and their dependencies to make cache
+    """
+    deps = set(deps or [])
+    made_files = set(testcase_pytest_paths)
+    for pytest_file in testcase_pytest_paths:
+        deps.update(pytest_files_deps_mapping.get(pytest_file, set()))
+        made_files.update(pytest_files_refs_mapping.get(pytest_file, set()))
+
+    deps.discard(test_file)
+    deps.discard(None)
+    make_cache_mapping[test_file] = {
+        "hash": get_file_hash(test_file),
+        "deps": {dep_path: get_file_hash(dep_path) for dep_path in sorted(deps)},
+        "made": {
+            pytest_file: pytest_files_made_cache_mapping[pytest_file]
+            for pytest_file in sorted(made_files)
+        },
+        "run": testcase_pytest_paths,
+    }
+
+
+def load_test_content(test_file: Text) -> Union[Dict, None]:
+    """ load YAML/JSON testcase/testsuite file content for making,
+        return None with warning if file content is invalid.
 
     Args:
-        tests_path: should be in absolute path
+        test_file: should be in absolute path
+
+    """
+    try:
+        test_content = load_test_file(test_file)
+    except (exceptions.FileNotFound, exceptions.FileFormatError) as ex:
+        logger.warning(f"Invalid test file: {test_file}\n{type(ex).__name__}: {ex}")
+        return None
+
+    if not isinstance(test_content, Dict):
+        logger.warning(
+            f"Invalid test file: {test_file}\n"
+            f"reason: test content not in dict format."
+        )
+        return None
+
+    # api in v2 format, convert to v3 testcase
+    if "request" in test_content and "name" in test_content:
+        test_content = ensure_testcase_v3_api(test_content)
+
+    if "config" not in test_content:
+        logger.warning(
+            f"Invalid testcase/testsuite file: {test_file}\n"
+            f"reason: missing config part."
+        )
+        return None
+    elif not isinstance(test_content["config"], Dict):
+        logger.warning(
+            f"Invalid testcase/testsuite file: {test_file}\n"
+            f"reason: config should be dict type, got {test_content['config']}"
+        )
+        return None
+
+    # ensure path absolute
+    test_content.setdefault("config", {})["path"] = test_file
+    return test_content
 
+
+def __load_tests_path(tests_path: Text) -> List[Text]:
+    """ load YAML/JSON/pytest files with testcase/testsuite/folder absolute path
     """
     logger.info(f"make path: {tests_path}")
-    test_files = []
     if os.path.isdir(tests_path):
-        files_list = load_folder_files(tests_path)
-        test_files.extend(files_list)
+        return load_folder_files(tests_path)
     elif os.path.isfile(tests_path):
-        test_files.append(tests_path)
+        return [tests_path]
     else:
         raise exceptions.TestcaseNotFound(f"Invalid tests path: {tests_path}")
 
-    for test_file in test_files:
-        if test_file.lower().endswith("_test.py"):
-            pytest_files_run_set.add(test_file)
-            continue
 
-        try:
-            test_content = load_test_file(test_file)
-        except (exceptions.FileNotFound, exceptions.FileFormatError) as ex:
-            logger.warning(f"Invalid test file: {test_file}\n{type(ex).__name__}: {ex}")
-            continue
+def __prepare_make_jobs(test_file: Text) -> Union[List[Tuple[Dict, Text]], None]:
+    """ load testcase/testsuite file and prepare testcases to be made,
+        return None with warning if file content is invalid.
 
-        if not isinstance(test_content, Dict):
-            logger.warning(
-                f"Invalid test file: {test_file}\n"
-                f"reason: test content not in dict format."
-            )
-            continue
+    Returns:
+        list of (testcase dict, directory path to put pytest file in)
 
-        # api in v2 format, convert to v3 testcase
-        if "request" in test_content and "name" in test_content:
-            test_content = ensure_testcase_v3_api(test_content)
+    """
+    test_content = load_test_content(test_file)
+    if test_content is None:
+        return None
 
-        if "config" not in test_content:
-            logger.warning(
-                f"Invalid testcase/testsuite file: {test_file}\n"
-                f"reason: missing config part."
-            )
-            continue
-        elif not isinstance(test_content["config"], Dict):
+    # testcase
+    if "teststeps" in test_content:
+        return [(test_content, None)]
+
+    # testsuite
+    elif "testcases" in test_content:
+        logger.info(f"start to make testsuite: {test_file}")
+        try:
+            return prepare_testsuite(test_content)
+        except exceptions.TestSuiteFormatError as ex:
             logger.warning(
-                f"Invalid testcase/testsuite file: {test_file}\n"
-                f"reason: config should be dict type, got {test_content['config']}"
+                f"Invalid testsuite file: {test_file}\n{type(ex).__name__}: {ex}"
             )
-            continue
+            return None
 
-        # ensure path absolute
-        test_content.setdefault("config", {})["path"] = test_file
+    # invalid format
+    logger.warning(
+        f"Invalid test file: {test_file}\n"
+        f"reason: file content is neither testcase nor testsuite"
+    )
+    return None
 
-        # testcase
-        if "teststeps" in test_content:
-            try:
-                testcase_pytest_path = make_testcase(test_content)
-                pytest_files_run_set.add(testcase_pytest_path)
-            except exceptions.TestCaseFormatError as ex:
-                logger.warning(
-                    f"Invalid testcase file: {test_file}\n{type(ex).__name__}: {ex}"
-                )
+
+def __build_make_levels(
+    jobs: Dict[Text, Tuple[Dict, Text]]
+) -> Tuple[List[List[Text]], Dict[Text, List[Text]]]:
+    """ add referenced testcases to make jobs, and group jobs into levels by reference depth,
+        testcases in the same level are independent of each other.
+
+    Args:
+        jobs: pytest file path mapping to (testcase dict, directory path), referenced
+            testcases will be added
+
+    Returns:
+        tuple: pytest file paths grouped by levels, referenced pytest file paths of each job
+
+    """
+    refs_graph: Dict[Text, List[Text]] = {}
+    pending_paths = list(jobs.keys())
+    while pending_paths:
+        testcase_python_abs_path = pending_paths.pop(0)
+        testcase, _ = jobs[testcase_python_abs_path]
+        refs_graph[testcase_python_abs_path] = ref_paths = []
+
+        teststeps = testcase.get("teststeps")
+        for teststep in teststeps if isinstance(teststeps, List) else []:
+            if not isinstance(teststep, Dict) or not isinstance(
+                teststep.get("testcase"), Text
+            ):
                 continue
 
-        # testsuite
-        elif "testcases" in test_content:
             try:
-                make_testsuite(test_content)
-            except exceptions.TestSuiteFormatError as ex:
-                logger.warning(
-                    f"Invalid testsuite file: {test_file}\n{type(ex).__name__}: {ex}"
-                )
+                ref_testcase = load_ref_testcase(teststep)
+            except exceptions.TestCaseFormatError:
+                # reported when making the testcase
                 continue
 
-        # invalid format
-        else:
-            logger.warning(
-                f"Invalid test file: {test_file}\n"
-                f"reason: file content is neither testcase nor testsuite"
+            ref_testcase_python_abs_path = get_testcase_python_path(ref_testcase)
+            if ref_testcase_python_abs_path not in jobs:
+                jobs[ref_testcase_python_abs_path] = (ref_testcase, None)
+                pending_paths.append(ref_testcase_python_abs_path)
+
+            if ref_testcase_python_abs_path not in ref_paths:
+                ref_paths.append(ref_testcase_python_abs_path)
+
+    depth_mapping: Dict[Text, int] = {}
+
+    def get_depth(path: Text, visiting: Set[Text]) -> int:
+        if path in depth_mapping:
+            return depth_mapping[path]
+        if path in visiting:
+            raise exceptions.TestCaseFormatError(
+                f"circular testcase reference: {jobs[path][0]['config']['path']}"
             )
 
+        visiting.add(path)
+        depth = 1 + max(
+            [get_depth(ref_path, visiting) for ref_path in refs_graph[path]],
+            default=-1,
+        )
+        visiting.discard(path)
+        depth_mapping[path] = depth
+        return depth
+
+    levels: List[List[Text]] = []
+    for path in jobs:
+        depth = get_depth(path, set())
+        while len(levels) <= depth:
+            levels.append([])
+        levels[depth].append(path)
+
+    return levels, refs_graph
+
+
+def __make_testcase_job(
+    testcase: Dict, dir_path: Text, refs_made: Dict[Text, Tuple[Text, Set, Set]]
+) -> Union[Tuple[Text, Set, Set], None]:
+    """ make testcase in current or worker process, pytest files of referenced testcases
+        have been made and are passed in refs_made, thus they will not be made again.
+
+    Returns:
+        tuple: testcase class name, source files and referenced pytest files of made pytest file
+        None: testcase is invalid
+
+    """
+    for ref_path, (ref_cls_name, ref_deps, ref_refs) in refs_made.items():
+        pytest_files_made_cache_mapping[ref_path] = ref_cls_name
+        pytest_files_deps_mapping[ref_path] = ref_deps
+        pytest_files_refs_mapping[ref_path] = ref_refs
+
+    try:
+        testcase_pytest_path = make_testcase(testcase, dir_path)
+    except exceptions.TestCaseFormatError as ex:
+        logger.warning(
+            f"Invalid testcase file: {testcase['config'].get('path')}\n"
+            f"{type(ex).__name__}: {ex}"
+        )
+        return None
+
+    return (
+        pytest_files_made_cache_mapping[testcase_pytest_path],
+        pytest_files_deps_mapping[testcase_pytest_path],
+        pytest_files_refs_mapping[testcase_pytest_path],
+    )
+
+
+def __make_testcases(jobs: Dict[Text, Tuple[Dict, Text]], workers: int) -> Set[Text]:
+    """ make testcases level by level, testcases in each level are made in process pool,
+        each referenced testcase is made exactly once before testcases referencing it.
+
+    Returns:
+        set: pytest file paths failed to make
+
+    """
+    levels, refs_graph = __build_make_levels(jobs)
+
+    executor = None
+    if workers > 1 and len(jobs) > 1 and is_support_multiprocessing():
+        logger.info(f"make {len(jobs)} testcases with {workers} workers")
+        executor = ProcessPoolExecutor(max_workers=workers)
 
-def main_make(tests_paths: List[Text]) -> List[Text]:
+    failed_paths = set()
+    try:
+        for level in levels:
+            jobs_args = []
+            jobs_paths = []
+            for path in level:
+                failed_refs = failed_paths.intersection(refs_graph[path])
+                if failed_refs:
+                    # referenced testcase has been reported, and is not made again
+                    testcase_path = jobs[path][0]["config"].get("path")
+                    ref_testcase_paths = [
+                        jobs[ref_path][0]["config"].get("path")
+                        for ref_path in sorted(failed_refs)
+                    ]
+                    logger.warning(
+                        f"Invalid testcase file: {testcase_path}\n"
+                        f"reason: referenced testcase failed to make: "
+                        f"{ref_testcase_paths}"
+                    )
+                    failed_paths.add(path)
+                    continue
+
+                refs_made = {}
+                for ref_path in refs_graph[path]:
+                    if ref_path not in pytest_files_made_cache_mapping:
+                        continue
+                    for made_path in {ref_path} | pytest_files_refs_mapping[ref_path]:
+                        refs_made[made_path] = (
+                            pytest_files_made_cache_mapping[made_path],
+                            pytest_files_deps_mapping[made_path],
+                            pytest_files_refs_mapping[made_path],
+                        )
+
+                testcase, dir_path = jobs[path]
+                jobs_args.append((testcase, dir_path, refs_made))
+                jobs_paths.append(path)
+
+            if not jobs_args:
+                continue
+            elif executor:
+                results = executor.map(__make_testcase_job, *zip(*jobs_args))
+            else:
+                results = (__make_testcase_job(*job_args) for job_args in jobs_args)
+
+            for path, result in zip(jobs_paths, results):
+                if result is None:
+                    failed_paths.add(path)
+                    continue
+
+                cls_name, deps, refs = result
+                pytest_files_made_cache_mapping[path] = cls_name
+                pytest_files_deps_mapping[path] = deps
+                pytest_files_refs_mapping[path] = refs
+                pytest_files_written_set.add(path)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    return failed_paths
+
+
+def main_make(
+    tests_paths: List[Text], force: bool = False, workers: int = None
+) -> List[Text]:
+    """ make testcases, pytest files will be reused from make cache if neither
+        source files nor their dependencies changed, unless force is set true.
+        testcases are made in process pool with specified workers, default to make in
+        current process, or in process pool of cpu count if there are many testcases.
+    """
     if not tests_paths:
         return []
 
-    for tests_path in tests_paths:
-        tests_path = ensure_path_sep(tests_path)
-        if not os.path.isabs(tests_path):
-            tests_path = os.path.join(os.getcwd(), tests_path)
+    # counted in each making
+    pytest_files_written_set.clear()
+    pytest_files_reused_set.clear()
 
-        try:
-            __make(tests_path)
-        except exceptions.MyBaseError as ex:
-            logger.error(ex)
+    tests_paths = [ensure_path_sep(tests_path) for tests_path in tests_paths]
+    tests_paths = [
+        (
+            tests_path
+            if os.path.isabs(tests_path)
+            else os.path.join(os.getcwd(), tests_path)
+        )
+        for tests_path in tests_paths
+    ]
+
+    project_root_dir = None
+    if os.path.exists(tests_paths[0]):
+        project_root_dir = load_project_meta(tests_paths[0]).RootDir
+        make_cache_mapping.clear()
+        if not force:
+            make_cache_mapping.update(load_make_cache(project_root_dir))
+
+    # pytest file path => (testcase dict, directory path)
+    jobs: Dict[Text, Tuple[Dict, Text]] = {}
+    # test file path => pytest file paths made from it
+    test_files_jobs: Dict[Text, List[Text]] = {}
+    try:
+        for tests_path in tests_paths:
+            for test_file in __load_tests_path(tests_path):
+                if test_file.lower().endswith("_test.py"):
+                    pytest_files_run_set.add(test_file)
+                    continue
+
+                if test_file in test_files_jobs or __reuse_made_files(test_file):
+                    continue
+
+                make_jobs = __prepare_make_jobs(test_file)
+                if make_jobs is None:
+                    continue
+
+                test_files_jobs[test_file] = []
+                for testcase, dir_path in make_jobs:
+                    path = get_testcase_python_path(testcase, dir_path)
+                    jobs.setdefault(path, (testcase, dir_path))
+                    test_files_jobs[test_file].append(path)
+
+        if workers is None:
+            workers = (os.cpu_count() or 1) if len(jobs) >= MAKE_POOL_MIN_JOBS else 1
+        failed_paths = __make_testcases(jobs, workers)
+    except exceptions.MyBaseError as ex:
+        logger.error(ex)
+        sys.exit(1)
+
+    # invalid testcase in testsuite fails making, while invalid testcase file is skipped
+    for test_file, testcase_pytest_paths in test_files_jobs.items():
+        if failed_paths.intersection(testcase_pytest_paths) and any(
+            jobs[path][1] for path in testcase_pytest_paths
+        ):
+            logger.error(f"failed to make testcases of testsuite: {test_file}")
             sys.exit(1)
 
-    # format pytest files
-    pytest_files_format_list = pytest_files_made_cache_mapping.keys()
-    format_pytest_with_black(*pytest_files_format_list)
+    for test_file, testcase_pytest_paths in test_files_jobs.items():
+        if failed_paths.intersection(testcase_pytest_paths):
+            continue
+
+        pytest_files_run_set.update(testcase_pytest_paths)
+        extra_deps = set()
+        if any(jobs[path][1] for path in testcase_pytest_paths):
+            # testsuite variables may be generated by debugtalk.py functions
+            extra_deps.add(load_project_meta(test_file).debugtalk_path)
+        __update_make_cache(test_file, testcase_pytest_paths, extra_deps)
+
+    if project_root_dir:
+        dump_make_cache(project_root_dir)
+
+    reused_count = len(pytest_files_reused_set - pytest_files_written_set)
+    logger.info(
+        f"make cache: {reused_count} pytest files reused, "
+        f"{len(pytest_files_written_set)} regenerated"
+    )
 
-    return list(pytest_files_run_set)
+    return sorted(pytest_files_run_set)
 
 
 def init_make_parser(subparsers):
@@ -617,5 +1098,18 @@ def init_make_parser(subparsers):
     parser.add_argument(
         "testcase_path", nargs="*", help="Specify YAML/JSON testcase file/folder path"
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        default=False,
+        help="Ignore make cache and regenerate all pytest files.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of processes to make testcases in parallel, "
+        f"default to cpu count if there are at least {MAKE_POOL_MIN_JOBS} testcases.",
+    )
 
     return parser
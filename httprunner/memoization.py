@@ -0,0 +1,209 @@
+"""
+Memoize pure functions defined in debugtalk.py.
+
+Functions referenced in testcases, e.g. `${sign($data)}` or `${get_account()}` in parameters,
+are called again for each step and each parameter row. Pure and expensive functions can be
+marked as cacheable, then calls are memoized by arguments tuple:
+
+    from httprunner import memoize
+
+    @memoize
+    def get_account():
+        ...
+
+    @memoize(scope="testcase", maxsize=256)
+    def sign(data):
+        ...
+
+    @memoize(ttl=60)
+    def get_token(user):
+        ...
+
+    - session scope: cached in process, shared by all testcases, this is the default
+    - testcase scope: cached in each testcase run, called without cache out of testcase run,
+      e.g. in parameters
+    - ttl: cached entries expire after ttl seconds, in either scope
+    - maxsize: cached entries are evicted in LRU mode when exceeding maxsize
+    - copy: cached value is deep copied for each call by default, since returned dict or
+      list, e.g. headers, may be modified in run, set false if value is never modified
+
+Calls with unhashable arguments, e.g. dict or list, are not cached.
+Hits and misses of each function in testcase run are exposed in testcase summary.
+
+"""
+import functools
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar, Token
+from copy import deepcopy
+from enum import Enum
+from typing import Any, Callable, Dict, Text, Tuple, Union
+
+from httprunner.models import MemoizeStat
+
+# default max count of cached entries of each function
+MEMOIZE_MAXSIZE = 128
+
+
+class MemoizeScopeEnum(Text, Enum):
+    TESTCASE = "testcase"
+    SESSION = "session"
+
+
+class MemoizeCache(object):
+    """ size bounded cache in LRU mode, entries expire after ttl seconds if ttl set """
+
+    def __init__(self, maxsize: int, ttl: Union[float, None]):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key: (expire_at, value)
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: Any) -> Tuple[bool, Any]:
+        """ get cached value, return (found, value) """
+        with self.lock:
+            try:
+                expire_at, value = self.entries[key]
+            except KeyError:
+                return False, None
+
+            if expire_at is not None and expire_at <= time.monotonic():
+                del self.entries[key]
+                return False, None
+
+            self.entries.move_to_end(key)
+            return True, value
+
+    def set(self, key: Any, value: Any):
+        expire_at = None if self.ttl is None else time.monotonic() + self.ttl
+        with self.lock:
+            self.entries[key] = (expire_at, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class MemoizeTestCaseScope(object):
+    """ testcase scoped caches and hits/misses stats of memoized functions in testcase run """
+
+    def __init__(self):
+        self.caches: Dict[Callable, MemoizeCache] = {}
+        self.stats: Dict[Text, MemoizeStat] = {}
+
+    def count(self, func_name: Text, hit: bool):
+        stat = self.stats.get(func_name)
+        if stat is None:
+            stat = self.stats[func_name] = MemoizeStat()
+
+        if hit:
+            stat.hits += 1
+        else:
+            stat.misses += 1
+
+
+""" memoize scope of current testcase run, each testcase run has its own scope,
+    including testcases run concurrently in event loop
+"""
+testcase_scope: ContextVar = ContextVar("memoize_testcase_scope", default=None)
+
+
+def enter_testcase_scope() -> Token:
+    """ enter new memoize scope when testcase run starts """
+    return testcase_scope.set(MemoizeTestCaseScope())
+
+
+def exit_testcase_scope(token: Token) -> Dict[Text, MemoizeStat]:
+    """ exit memoize scope when testcase run ends, return hits/misses stats of testcase run """
+    scope = testcase_scope.get()
+    testcase_scope.reset(token)
+    return scope.stats
+
+
+def memoize(
+    func: Callable = None,
+    *,
+    scope: Text = MemoizeScopeEnum.SESSION,
+    ttl: Union[float, None] = None,
+    maxsize: int = MEMOIZE_MAXSIZE,
+    copy: bool = True,
+) -> Callable:
+    """ decorator to memoize pure function by arguments, used with or without arguments.
+
+    Args:
+        func: function to be memoized
+        scope: cache scope, session or testcase
+        ttl: cached entries expire after ttl seconds, never expire if not set
+        maxsize: max count of cached entries, evicted in LRU mode
+        copy: return deep copy of cached value, thus cached value is not modified
+
+    """
+    scope = MemoizeScopeEnum(scope)
+
+    def decorator(func: Callable) -> Callable:
+        session_cache = MemoizeCache(maxsize, ttl)
+        info = MemoizeStat()
+
+        def get_cache(current_scope: Union[MemoizeTestCaseScope, None]):
+            if scope == MemoizeScopeEnum.SESSION:
+                return session_cache
+            elif current_scope is None:
+                # out of testcase run
+                return None
+
+            cache = current_scope.caches.get(wrapper)
+            if cache is None:
+                cache = current_scope.caches[wrapper] = MemoizeCache(maxsize, ttl)
+
+            return cache
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            current_scope = testcase_scope.get()
+            cache = get_cache(current_scope)
+            key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+            try:
+                found, value = (False, None) if cache is None else cache.get(key)
+            except TypeError:
+                # unhashable arguments
+                cache = None
+                found, value = False, None
+
+            if found:
+                info.hits += 1
+            else:
+                info.misses += 1
+                value = func(*args, **kwargs)
+                if cache is not None:
+                    cache.set(key, value)
+
+            if current_scope is not None:
+                current_scope.count(func.__name__, found)
+
+            if copy and cache is not None:
+                # immutable values, e.g. str and int, are returned as they are
+                return deepcopy(value)
+
+            return value
+
+        def cache_info() -> MemoizeStat:
+            """ hits and misses in process """
+            return info.copy()
+
+        def cache_clear():
+            session_cache.clear()
+            info.hits = info.misses = 0
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    if func is None:
+        return decorator
+
+    return decorator(func)
@@ -31,6 +31,57 @@ class MethodEnum(Text, Enum):
     PATCH = "PATCH"
 
 
+class RecordLevelEnum(Text, Enum):
+    OFF = "off"  # do not record request & response
+    META = "meta"  # record request & response without body
+    FULL = "full"
+
+
+class TConnectionPool(BaseModel):
+    """connection pool of requests session"""
+
+    pool_connections: int = 10  # number of hosts to cache connection pools for
+    pool_maxsize: int = 10  # max connections kept in each host connection pool
+    pool_block: bool = False  # wait for free connection if pool is full
+    keep_alive: bool = True  # keep connection alive after response
+
+
+class LoadShapeEnum(Text, Enum):
+    RAMP = "ramp"  # ramp stages, e.g. warm up, hold and ramp down
+    CONSTANT_RATE = "constant_rate"  # constant arrival rate with users pool
+    SPIKE = "spike"  # baseline users with a sudden spike
+    STEP = "step"  # users stepped up in equal steps
+
+
+class TLoadStage(BaseModel):
+    """stage of locust load shape, users are spawned towards target in stage"""
+
+    duration: float  # seconds
+    users: int
+    spawn_rate: float = 1  # users started or stopped per second
+    rate: float = 0  # target testcase runs per second of all users, 0 is unpaced
+
+
+class TLoadShape(BaseModel):
+    """testsuite load shape for hrun locusts, translated into load stages"""
+
+    type: LoadShapeEnum = LoadShapeEnum.RAMP
+    # ramp
+    stages: List[TLoadStage] = []
+    # constant_rate, spike and step
+    duration: float = 0
+    users: int = 1
+    spawn_rate: float = 1
+    rate: float = 0
+    # spike
+    spike_users: int = 0
+    spike_at: float = 0
+    spike_duration: float = 0
+    # step
+    step_users: int = 0
+    step_duration: float = 0
+
+
 class TConfig(BaseModel):
     name: Name
     verify: Verify = False
@@ -43,6 +94,11 @@ class TConfig(BaseModel):
     export: Export = []
     path: Text = None
     weight: int = 1
+    rate: float = 0  # target runs per second in each locust process, 0 is unlimited
+    record: RecordLevelEnum = RecordLevelEnum.FULL
+    connection_pool: TConnectionPool = TConnectionPool()
+    # only in testsuite config for hrun locusts
+    load_shape: Union[TLoadShape, None] = None
 
 
 class TRequest(BaseModel):
@@ -58,13 +114,15 @@ class TRequest(BaseModel):
     timeout: float = 120
     allow_redirects: bool = True
     verify: Verify = False
+    stream: bool = False  # search response body in stream mode
     upload: Dict = {}  # used for upload files
 
 
 class TStep(BaseModel):
     name: Name
     request: Union[TRequest, None] = None
-    testcase: Union[Text, Callable, None] = None
+    # Text: testcase path, Callable: testcase class, TestCase: loaded testcase
+    testcase: Union[Text, Callable, "TestCase", None] = None
     variables: VariablesMapping = {}
     setup_hooks: Hooks = []
     teardown_hooks: Hooks = []
@@ -81,6 +139,9 @@ class TestCase(BaseModel):
     teststeps: List[TStep]
 
 
+TStep.update_forward_refs()
+
+
 class ProjectMeta(BaseModel):
     debugtalk_py: Text = ""  # debugtalk.py file content
     debugtalk_path: Text = ""  # debugtalk.py file path
@@ -107,9 +168,16 @@ class TestCaseInOut(BaseModel):
 
 
 class RequestStat(BaseModel):
-    content_size: float = 0
-    response_time_ms: float = 0
-    elapsed_ms: float = 0
+    content_size: float = 0  # response body bytes received
+    request_size: float = 0  # request bytes sent, including headers
+    response_time_ms: float = 0  # total time, including body transfer
+    elapsed_ms: float = 0  # time from request sent to response headers parsed
+    # timing breakdown, connecting phases are 0 if connection is reused
+    dns_ms: float = 0
+    connect_ms: float = 0
+    tls_ms: float = 0
+    ttfb_ms: float = 0
+    download_ms: float = 0
 
 
 class AddressData(BaseModel):
@@ -165,6 +233,16 @@ class StepData(BaseModel):
 StepData.update_forward_refs()
 
 
+class MemoizeStat(BaseModel):
+    hits: int = 0
+    misses: int = 0
+
+
+class ConnectionStat(BaseModel):
+    new_connections: int = 0
+    reused_connections: int = 0
+
+
 class TestCaseSummary(BaseModel):
     name: Text
     success: bool
@@ -173,6 +251,10 @@ class TestCaseSummary(BaseModel):
     in_out: TestCaseInOut = {}
     log: Text = ""
     step_datas: List[StepData] = []
+    # hits and misses of memoized functions, see httprunner.memoization
+    memoize_stats: Dict[Text, MemoizeStat] = {}
+    # connections created and reused by session in testcase run
+    connection_stat: ConnectionStat = ConnectionStat()
 
 
 class PlatformInfo(BaseModel):
@@ -1,8 +1,19 @@
 import ast
-import builtins
 import re
 import os
-from typing import Any, Set, Text, Callable, List, Dict, Union
+from functools import lru_cache
+from typing import (
+    Any,
+    Set,
+    Text,
+    Callable,
+    List,
+    Dict,
+    Union,
+    Tuple,
+    NoReturn,
+    FrozenSet,
+)
 
 from loguru import logger
 from sentry_sdk import capture_exception
@@ -19,6 +30,11 @@ variable_regex_compile = re.compile(r"\$\{(\w+)\}|\$(\w+)")
 # function notation, e.g. ${func1($var_1, $var_3)}
 function_regex_compile = re.compile(r"\$\{(\w+)\(([\$\w\.\-/\s=,]*)\)\}")
 
+# max count of compiled raw strings to be cached
+COMPILED_STRING_CACHE_SIZE = 4096
+# max count of sorted variables dependency graphs to be cached
+VARIABLES_GRAPH_CACHE_SIZE = 1024
+
 
 def parse_string_value(str_value: Text) -> Any:
     """ parse string to number if possible
@@ -154,11 +170,21 @@ def extract_variables(content: Any) -> Set:
         return variables
 
     elif isinstance(content, str):
-        return set(regex_findall_variables(content))
+        return set(extract_string_variables(content))
 
     return set()
 
 
+@lru_cache(maxsize=COMPILED_STRING_CACHE_SIZE)
+def extract_string_variables(content: Text) -> FrozenSet[Text]:
+    """ extract all variables in string content, results are cached in LRU mode.
+    """
+    if "$" not in content:
+        return frozenset()
+
+    return frozenset(regex_findall_variables(content))
+
+
 def parse_function_params(params: Text) -> Dict:
     """ parse function params to args and kwargs.
 
@@ -238,6 +264,7 @@ def get_mapping_function(
 ) -> Callable:
     """ get function from functions_mapping,
         if not found, then try to check if builtin function.
+        resolved with prebuilt lookup table, see loader.load_functions_table
 
     Args:
         function_name (str): function name
@@ -250,35 +277,278 @@ def get_mapping_function(
         exceptions.FunctionNotFound: function is neither defined in debugtalk.py nor builtin.
 
     """
-    if function_name in functions_mapping:
-        return functions_mapping[function_name]
+    functions_table = loader.load_functions_table(functions_mapping)
+    try:
+        return functions_table[function_name]
+    except KeyError:
+        pass
 
-    elif function_name in ["parameterize", "P"]:
-        return loader.load_csv_file
+    raise exceptions.FunctionNotFound(f"{function_name} is not found.")
 
-    elif function_name in ["environ", "ENV"]:
-        return utils.get_os_environ
 
-    elif function_name in ["multipart_encoder", "multipart_content_type"]:
-        # extension for upload test
-        from httprunner.ext import uploader
+class CompiledString(object):
+    """ compiled form of a raw string content, which can be rendered repeatedly
+        with different variables and functions mapping.
 
-        return getattr(uploader, function_name)
+    Raw string is scanned only once, and split into a list of nodes:
 
-    try:
-        # check if HttpRunner builtin functions
-        built_in_functions = loader.load_builtin_functions()
-        return built_in_functions[function_name]
-    except KeyError:
-        pass
+        ("literal", "abc")                                  plain text, $$ already unescaped
+        ("variable", "var_name")                            $var or ${var}
+        ("function", ("func_name", "raw params", args, kwargs))   ${func($a, b=1)}
 
-    try:
-        # check if Python builtin functions
-        return getattr(builtins, function_name)
-    except AttributeError:
-        pass
+    function args and kwargs are pre-parsed with parse_function_params,
+    and compiled with compile_data.
 
-    raise exceptions.FunctionNotFound(f"{function_name} is not found.")
+    """
+
+    __slots__ = ("raw_string", "nodes", "is_single_node")
+
+    def __init__(self, raw_string: Text):
+        self.raw_string = raw_string
+        self.nodes: List[Tuple[Text, Any]] = []
+        self.is_single_node = False
+        self.__compile()
+
+    def __append_literal(self, literal: Text) -> NoReturn:
+        if not literal:
+            return
+
+        if self.nodes and self.nodes[-1][0] == "literal":
+            self.nodes[-1] = ("literal", self.nodes[-1][1] + literal)
+        else:
+            self.nodes.append(("literal", literal))
+
+    def __compile(self) -> NoReturn:
+        raw_string = self.raw_string
+        try:
+            match_start_position = raw_string.index("$", 0)
+            self.__append_literal(raw_string[0:match_start_position])
+        except ValueError:
+            self.__append_literal(raw_string)
+            return
+
+        while match_start_position < len(raw_string):
+
+            # Notice: notation priority
+            # $$ > ${func($a, $b)} > $var
+
+            # search $$
+            dollar_match = dolloar_regex_compile.match(raw_string, match_start_position)
+            if dollar_match:
+                match_start_position = dollar_match.end()
+                self.__append_literal("$")
+                continue
+
+            # search function like ${func($a, $b)}
+            func_match = function_regex_compile.match(raw_string, match_start_position)
+            if func_match:
+                func_name = func_match.group(1)
+                func_params_str = func_match.group(2)
+                function_meta = parse_function_params(func_params_str)
+                args = [compile_data(arg) for arg in function_meta["args"]]
+                kwargs = compile_data(function_meta["kwargs"])
+                self.nodes.append(
+                    ("function", (func_name, func_params_str, args, kwargs))
+                )
+                match_start_position = func_match.end()
+                continue
+
+            # search variable like ${var} or $var
+            var_match = variable_regex_compile.match(raw_string, match_start_position)
+            if var_match:
+                var_name = var_match.group(1) or var_match.group(2)
+                self.nodes.append(("variable", var_name))
+                match_start_position = var_match.end()
+                continue
+
+            curr_position = match_start_position
+            try:
+                # find next $ location
+                match_start_position = raw_string.index("$", curr_position + 1)
+                remain_string = raw_string[curr_position:match_start_position]
+            except ValueError:
+                remain_string = raw_string[curr_position:]
+                # break while loop
+                match_start_position = len(raw_string)
+
+            self.__append_literal(remain_string)
+
+        # raw_string is a function or a variable, e.g. "${add_one(3)}" or "$var",
+        # its eval value will be returned directly without converting to string
+        self.is_single_node = len(self.nodes) == 1 and self.nodes[0][0] != "literal"
+
+    @staticmethod
+    def __eval_function(
+        node_value: Tuple,
+        variables_mapping: VariablesMapping,
+        functions_mapping: FunctionsMapping,
+    ) -> Any:
+        func_name, _, args, kwargs = node_value
+        func = get_mapping_function(func_name, functions_mapping)
+
+        parsed_args = [arg.render(variables_mapping, functions_mapping) for arg in args]
+        parsed_kwargs = kwargs.render(variables_mapping, functions_mapping)
+
+        try:
+            return func(*parsed_args, **parsed_kwargs)
+        except Exception as ex:
+            logger.error(
+                f"call function error:\n"
+                f"func_name: {func_name}\n"
+                f"args: {parsed_args}\n"
+                f"kwargs: {parsed_kwargs}\n"
+                f"{type(ex).__name__}: {ex}"
+            )
+            raise
+
+    def __eval_node(
+        self,
+        node: Tuple[Text, Any],
+        variables_mapping: VariablesMapping,
+        functions_mapping: FunctionsMapping,
+    ) -> Any:
+        node_type, node_value = node
+        if node_type == "literal":
+            return node_value
+        elif node_type == "variable":
+            return get_mapping_variable(node_value, variables_mapping)
+        else:
+            return self.__eval_function(
+                node_value, variables_mapping, functions_mapping
+            )
+
+    def render(
+        self, variables_mapping: VariablesMapping, functions_mapping: FunctionsMapping,
+    ) -> Any:
+        """ substitute variables and functions with their evaluated values.
+        """
+        if self.is_single_node:
+            return self.__eval_node(self.nodes[0], variables_mapping, functions_mapping)
+
+        # raw_string contains one or many variables/functions, e.g. "abc${var}def"
+        return "".join(
+            [
+                str(self.__eval_node(node, variables_mapping, functions_mapping))
+                for node in self.nodes
+            ]
+        )
+
+
+@lru_cache(maxsize=COMPILED_STRING_CACHE_SIZE)
+def compile_string(raw_string: Text) -> CompiledString:
+    """ compile raw string content, compiled results are cached in LRU mode with raw string as key.
+    """
+    return CompiledString(raw_string)
+
+
+def copy_static_data(data: Any) -> Any:
+    """ copy list/dict containers recursively, leaf values are kept as they are.
+    """
+    if isinstance(data, list):
+        return [copy_static_data(item) for item in data]
+    elif isinstance(data, dict):
+        return {key: copy_static_data(value) for key, value in data.items()}
+
+    return data
+
+
+class CompiledData(object):
+    """ compiled form of raw data, which can be rendered repeatedly like parse_data.
+
+    Static contents, which contain neither variables nor functions, are parsed at compile time,
+    only string contents with $ notation are rendered with variables and functions mapping.
+
+    """
+
+    __slots__ = ("node_type", "value")
+
+    # static content, parsed already
+    STATIC = "static"
+    # string content with variables or functions, value is CompiledString
+    STRING = "string"
+    # list content, value is list of CompiledData
+    LIST = "list"
+    # dict content, value is list of (CompiledData key, CompiledData value) pairs
+    DICT = "dict"
+
+    def __init__(self, node_type: Text, value: Any):
+        self.node_type = node_type
+        self.value = value
+
+    @property
+    def is_static(self) -> bool:
+        return self.node_type == CompiledData.STATIC
+
+    def render(
+        self,
+        variables_mapping: VariablesMapping = None,
+        functions_mapping: FunctionsMapping = None,
+    ) -> Any:
+        """ render compiled data, result is the same as parse_data with raw data.
+            rendered containers are newly created each time, thus they can be modified safely.
+        """
+        if self.node_type == CompiledData.STATIC:
+            return copy_static_data(self.value)
+
+        variables_mapping = variables_mapping or {}
+        functions_mapping = functions_mapping or {}
+
+        if self.node_type == CompiledData.STRING:
+            return self.value.render(variables_mapping, functions_mapping)
+
+        elif self.node_type == CompiledData.LIST:
+            return [
+                item.render(variables_mapping, functions_mapping) for item in self.value
+            ]
+
+        else:
+            rendered_data = {}
+            for key, value in self.value:
+                rendered_key = key.render(variables_mapping, functions_mapping)
+                rendered_value = value.render(variables_mapping, functions_mapping)
+                rendered_data[rendered_key] = rendered_value
+
+            return rendered_data
+
+
+def compile_data(raw_data: Any) -> CompiledData:
+    """ compile raw data recursively, string contents are compiled with compile_string.
+
+    Examples:
+        >>> compiled_data = compile_data({"url": "/api/$uid", "method": "GET"})
+        >>> compiled_data.render({"uid": 1000})
+            {"url": "/api/1000", "method": "GET"}
+
+    """
+    if isinstance(raw_data, str):
+        # only strip whitespaces and tabs, the same as parse_data
+        raw_data = raw_data.strip(" \t")
+        if "$" in raw_data:
+            return CompiledData(CompiledData.STRING, compile_string(raw_data))
+
+        return CompiledData(CompiledData.STATIC, raw_data)
+
+    elif isinstance(raw_data, (list, set, tuple)):
+        items = [compile_data(item) for item in raw_data]
+        if all(item.is_static for item in items):
+            return CompiledData(CompiledData.STATIC, [item.value for item in items])
+
+        return CompiledData(CompiledData.LIST, items)
+
+    elif isinstance(raw_data, dict):
+        pairs = [
+            (compile_data(key), compile_data(value)) for key, value in raw_data.items()
+        ]
+        if all(key.is_static and value.is_static for key, value in pairs):
+            return CompiledData(
+                CompiledData.STATIC, {key.value: value.value for key, value in pairs}
+            )
+
+        return CompiledData(CompiledData.DICT, pairs)
+
+    else:
+        # other types, e.g. None, int, float, bool
+        return CompiledData(CompiledData.STATIC, raw_data)
 
 
 def parse_string(
@@ -304,88 +574,11 @@ def parse_string(
             "abc4def"
 
     """
-    try:
-        match_start_position = raw_string.index("$", 0)
-        parsed_string = raw_string[0:match_start_position]
-    except ValueError:
-        parsed_string = raw_string
-        return parsed_string
-
-    while match_start_position < len(raw_string):
-
-        # Notice: notation priority
-        # $$ > ${func($a, $b)} > $var
+    if "$" not in raw_string:
+        return raw_string
 
-        # search $$
-        dollar_match = dolloar_regex_compile.match(raw_string, match_start_position)
-        if dollar_match:
-            match_start_position = dollar_match.end()
-            parsed_string += "$"
-            continue
-
-        # search function like ${func($a, $b)}
-        func_match = function_regex_compile.match(raw_string, match_start_position)
-        if func_match:
-            func_name = func_match.group(1)
-            func = get_mapping_function(func_name, functions_mapping)
-
-            func_params_str = func_match.group(2)
-            function_meta = parse_function_params(func_params_str)
-            args = function_meta["args"]
-            kwargs = function_meta["kwargs"]
-            parsed_args = parse_data(args, variables_mapping, functions_mapping)
-            parsed_kwargs = parse_data(kwargs, variables_mapping, functions_mapping)
-
-            try:
-                func_eval_value = func(*parsed_args, **parsed_kwargs)
-            except Exception as ex:
-                logger.error(
-                    f"call function error:\n"
-                    f"func_name: {func_name}\n"
-                    f"args: {parsed_args}\n"
-                    f"kwargs: {parsed_kwargs}\n"
-                    f"{type(ex).__name__}: {ex}"
-                )
-                raise
-
-            func_raw_str = "${" + func_name + f"({func_params_str})" + "}"
-            if func_raw_str == raw_string:
-                # raw_string is a function, e.g. "${add_one(3)}", return its eval value directly
-                return func_eval_value
-
-            # raw_string contains one or many functions, e.g. "abc${add_one(3)}def"
-            parsed_string += str(func_eval_value)
-            match_start_position = func_match.end()
-            continue
-
-        # search variable like ${var} or $var
-        var_match = variable_regex_compile.match(raw_string, match_start_position)
-        if var_match:
-            var_name = var_match.group(1) or var_match.group(2)
-            var_value = get_mapping_variable(var_name, variables_mapping)
-
-            if f"${var_name}" == raw_string or "${" + var_name + "}" == raw_string:
-                # raw_string is a variable, $var or ${var}, return its value directly
-                return var_value
-
-            # raw_string contains one or many variables, e.g. "abc${var}def"
-            parsed_string += str(var_value)
-            match_start_position = var_match.end()
-            continue
-
-        curr_position = match_start_position
-        try:
-            # find next $ location
-            match_start_position = raw_string.index("$", curr_position + 1)
-            remain_string = raw_string[curr_position:match_start_position]
-        except ValueError:
-            remain_string = raw_string[curr_position:]
-            # break while loop
-            match_start_position = len(raw_string)
-
-        parsed_string += remain_string
-
-    return parsed_string
+    compiled_string = compile_string(raw_string)
+    return compiled_string.render(variables_mapping, functions_mapping)
 
 
 def parse_data(
@@ -423,47 +616,130 @@ def parse_data(
         return raw_data
 
 
-def parse_variables_mapping(
-    variables_mapping: VariablesMapping, functions_mapping: FunctionsMapping = None
-) -> VariablesMapping:
+def get_variables_dependencies(content: Any) -> FrozenSet[Text]:
+    """ get names of variables referenced in content, same as extract_variables,
+        while string contents are looked up from LRU cache.
+    """
+    if isinstance(content, str):
+        return extract_string_variables(content)
 
-    parsed_variables: VariablesMapping = {}
+    elif isinstance(content, (list, set, tuple, dict)):
+        return frozenset(extract_variables(content))
 
-    while len(parsed_variables) != len(variables_mapping):
-        for var_name in variables_mapping:
+    return frozenset()
 
-            if var_name in parsed_variables:
-                continue
 
-            var_value = variables_mapping[var_name]
-            variables = extract_variables(var_value)
+@lru_cache(maxsize=VARIABLES_GRAPH_CACHE_SIZE)
+def sort_variables_graph(
+    variables_graph: Tuple[Tuple[Text, FrozenSet[Text]], ...]
+) -> Tuple[Text, ...]:
+    """ sort variables dependency graph topologically, variables order in mapping is kept if possible.
+        sorted result is cached in LRU mode with the graph (mapping shape) as key.
 
-            # check if reference variable itself
-            if var_name in variables:
-                # e.g.
-                # variables_mapping = {"token": "abc$token"}
-                # variables_mapping = {"key": ["$key", 2]}
-                raise exceptions.VariableNotFound(var_name)
+    Args:
+        variables_graph: variable names and the variable names each depends on, e.g.
+            (("varA", frozenset({"varB"})), ("varB", frozenset()))
 
-            # check if reference variable not in variables_mapping
-            not_defined_variables = [
-                v_name for v_name in variables if v_name not in variables_mapping
-            ]
-            if not_defined_variables:
-                # e.g. {"varA": "123$varB", "varB": "456$varC"}
-                # e.g. {"varC": "${sum_two($a, $b)}"}
-                raise exceptions.VariableNotFound(not_defined_variables)
+    Returns:
+        variable names in evaluation order, e.g. ("varB", "varA")
 
-            try:
-                parsed_value = parse_data(
-                    var_value, parsed_variables, functions_mapping
-                )
-            except exceptions.VariableNotFound:
+    Raises:
+        exceptions.VariableNotFound: variable references itself, references undefined variables,
+            or variables reference each other circularly.
+
+    """
+    dependencies_mapping = dict(variables_graph)
+
+    for var_name, dependencies in variables_graph:
+        # check if reference variable itself
+        if var_name in dependencies:
+            # e.g.
+            # variables_mapping = {"token": "abc$token"}
+            # variables_mapping = {"key": ["$key", 2]}
+            raise exceptions.VariableNotFound(var_name)
+
+        # check if reference variable not in variables_mapping
+        not_defined_variables = [
+            v_name for v_name in dependencies if v_name not in dependencies_mapping
+        ]
+        if not_defined_variables:
+            # e.g. {"varA": "123$varB", "varB": "456$varC"}
+            # e.g. {"varC": "${sum_two($a, $b)}"}
+            raise exceptions.VariableNotFound(not_defined_variables)
+
+    # variable name => position in mapping
+    positions = {var_name: index for index, (var_name, _) in enumerate(variables_graph)}
+    sorted_variables: List[Text] = []
+    # 1: visiting, 2: visited
+    visit_status: Dict[Text, int] = {}
+
+    for root_var_name, _ in variables_graph:
+        if root_var_name in visit_status:
+            continue
+
+        # iterative depth-first search, path holds (variable name, its pending dependencies)
+        visit_status[root_var_name] = 1
+        path = [
+            (
+                root_var_name,
+                sorted(dependencies_mapping[root_var_name], key=positions.get),
+            )
+        ]
+        while path:
+            var_name, pending_dependencies = path[-1]
+            if not pending_dependencies:
+                path.pop()
+                visit_status[var_name] = 2
+                sorted_variables.append(var_name)
+                continue
+
+            dependency = pending_dependencies.pop(0)
+            status = visit_status.get(dependency)
+            if status == 2:
                 continue
+            elif status == 1:
+                # e.g. {"varA": "$varB", "varB": "$varC", "varC": "$varA"}
+                path_names = [name for name, _ in path]
+                cycle_path = path_names[path_names.index(dependency) :] + [dependency]
+                raise exceptions.VariableNotFound(
+                    f"circular reference in variables: {' -> '.join(cycle_path)}"
+                )
 
-            parsed_variables[var_name] = parsed_value
+            visit_status[dependency] = 1
+            path.append(
+                (
+                    dependency,
+                    sorted(dependencies_mapping[dependency], key=positions.get),
+                )
+            )
 
-    return parsed_variables
+    return tuple(sorted_variables)
+
+
+def parse_variables_mapping(
+    variables_mapping: VariablesMapping, functions_mapping: FunctionsMapping = None
+) -> VariablesMapping:
+    """ parse variables mapping, each variable is evaluated exactly once in dependency order.
+
+    Examples:
+        >>> variables_mapping = {"varA": "$varB", "varB": "${sum_two(1, 2)}"}
+        >>> parse_variables_mapping(variables_mapping, {"sum_two": lambda a, b: a + b})
+            {"varA": 3, "varB": 3}
+
+    """
+    variables_graph = tuple(
+        (var_name, get_variables_dependencies(var_value))
+        for var_name, var_value in variables_mapping.items()
+    )
+
+    parsed_variables: VariablesMapping = {}
+    for var_name in sort_variables_graph(variables_graph):
+        parsed_variables[var_name] = parse_data(
+            variables_mapping[var_name], parsed_variables, functions_mapping
+        )
+
+    # keep variables order in mapping
+    return {var_name: parsed_variables[var_name] for var_name in variables_mapping}
 
 
 def parse_parameters(parameters: Dict,) -> List[Dict]:
@@ -487,6 +763,37 @@ def parse_parameters(parameters: Dict,) -> List[Dict]:
         }
         >>> parse_parameters(parameters)
 
+    """
+    return list(parse_parameters_lazy(parameters))
+
+
+def parse_parameters_lazy(
+    parameters: Dict,
+) -> Union[utils.CartesianProduct, utils.StreamCartesianProduct]:
+    """ parse parameters and generate lazy cartesian product.
+
+    Args:
+        parameters (Dict) parameters: parameter name and value mapping
+            parameter value may be in three types:
+                (1) data list, e.g. ["iOS/10.1", "iOS/10.2", "iOS/10.3"]
+                (2) call built-in parameterize function, "${parameterize(account.csv)}"
+                (3) call custom function in debugtalk.py, "${gen_app_version()}"
+
+    Returns:
+        CartesianProduct: lazy cartesian product, combinations are merged on demand,
+            which supports len(), index, slice, sample(n) and pairwise()
+        StreamCartesianProduct: iterable cartesian product, if any csv file is
+            loaded in stream mode, e.g. "${parameterize(account.csv, true)}"
+
+    Examples:
+        >>> parameters = {
+            "user_agent": ["iOS/10.1", "iOS/10.2", "iOS/10.3"],
+            "username-password": "${parameterize(account.csv)}",
+            "app_version": "${gen_app_version()}",
+        }
+        >>> parse_parameters_lazy(parameters)
+        >>> parse_parameters_lazy(parameters).pairwise()
+
     """
     parsed_parameters_list: List[List[Dict]] = []
 
@@ -519,6 +826,16 @@ def parse_parameters(parameters: Dict,) -> List[Dict]:
             parsed_parameter_content: List = parse_data(
                 parameter_content, {}, functions_mapping
             )
+            if isinstance(
+                parsed_parameter_content, (loader.CSVParameters, loader.CSVStream)
+            ):
+                # {"username-password": "${parameterize(account.csv)}"}
+                # get subset by parameter name, select columns without loading rows
+                parsed_parameters_list.append(
+                    parsed_parameter_content.select(parameter_name_list)
+                )
+                continue
+
             if not isinstance(parsed_parameter_content, List):
                 raise exceptions.ParamsError(
                     f"parameters content should be in List type, got {parsed_parameter_content} for {parameter_content}"
@@ -570,4 +887,8 @@ def parse_parameters(parameters: Dict,) -> List[Dict]:
 
         parsed_parameters_list.append(parameter_content_list)
 
-    return utils.gen_cartesian_product(*parsed_parameters_list)
+    if any(isinstance(p, loader.CSVStream) for p in parsed_parameters_list):
+        # csv file in stream mode, combinations are only generated in iteration
+        return utils.StreamCartesianProduct(*parsed_parameters_list)
+
+    return utils.CartesianProduct(*parsed_parameters_list)
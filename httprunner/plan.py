@@ -0,0 +1,66 @@
+"""
+Compiled execution plan of testcase.
+
+Testcase steps are analysed once, and the plan can be executed repeatedly by HttpRunner:
+
+    - request fields are compiled with parser.compile_data, static fields are parsed ahead,
+      only templated fields are rendered in each run
+    - validators are compiled ahead with comparators resolved, see response.CompiledValidator
+    - step variables are snapshotted, thus runs never modify teststeps
+
+"""
+from typing import List, Text, Union
+
+from httprunner.exceptions import ParamsError
+from httprunner.models import TStep, Validators, VariablesMapping
+from httprunner.parser import CompiledData, compile_data
+from httprunner.response import CompiledValidator, compile_validators
+
+
+class StepPlan(object):
+    """ compiled teststep, request or referenced testcase """
+
+    def __init__(self, step: TStep):
+        self.step = step
+        self.name = step.name
+        self.variables: VariablesMapping = dict(step.variables)
+        self.request: Union[CompiledData, None] = None
+        self.validators: Union[
+            List[CompiledValidator], Validators
+        ] = self.__compile_validators(step.validators)
+
+        # upload step is prepared at runtime, see prepare_upload_step
+        if step.request and not step.request.upload:
+            request_dict = step.request.dict()
+            request_dict.pop("upload", None)
+            self.request = compile_data(request_dict)
+
+    @staticmethod
+    def __compile_validators(
+        validators: Validators,
+    ) -> Union[List[CompiledValidator], Validators]:
+        try:
+            return compile_validators(validators)
+        except ParamsError:
+            # keep raw validators, invalid validator will be reported when validating
+            return validators
+
+    def get_static_request_fields(self) -> List[Text]:
+        """ get names of request fields which contain neither variables nor functions """
+        if self.request is None:
+            return []
+        elif self.request.is_static:
+            return list(self.request.value.keys())
+
+        return [key.value for key, value in self.request.value if value.is_static]
+
+
+class TestCasePlan(object):
+    """ compiled teststeps of testcase, config is excluded because it may differ in each run,
+        e.g. parameters and variables from parent testcase.
+    """
+
+    def __init__(self, teststeps: List[TStep]):
+        # plan is reused only for the teststeps it is compiled from
+        self.teststeps = teststeps
+        self.steps: List[StepPlan] = [StepPlan(step) for step in teststeps]
@@ -1,14 +1,91 @@
-from typing import Dict, Text, Any, NoReturn
+import copy
+from functools import lru_cache
+from typing import Dict, Text, Any, NoReturn, List, Tuple, Union
 
 import jmespath
 import requests
 from jmespath.exceptions import JMESPathError
+from jmespath.parser import ParsedResult
 from loguru import logger
 
 from httprunner import exceptions
-from httprunner.exceptions import ValidationFailure, ParamsError
+from httprunner.exceptions import ValidationFailure, ParamsError, FunctionNotFound
 from httprunner.models import VariablesMapping, Validators, FunctionsMapping
-from httprunner.parser import parse_data, parse_string_value, get_mapping_function
+from httprunner.parser import compile_data, parse_string_value, get_mapping_function
+from httprunner.utils import load_response_json, is_response_streamed
+
+
+# max count of compiled jmespath expressions to be cached
+JMESPATH_CACHE_SIZE = 4096
+
+# response fields, jmespath expression starting with these fields is searched in response
+RESPONSE_META_FIELDS = ("status_code", "headers", "cookies", "body")
+
+
+class FieldPathExpression(object):
+    """ compiled jmespath expression only composed of fields and indexes,
+        e.g. body.data.items[0].id, searched by walking the path directly.
+    """
+
+    def __init__(self, expression: Text, path: List[Tuple[bool, Any]]):
+        self.expression = expression
+        # list of (is_index, field name or index)
+        self.path = path
+
+    def search(self, value: Any) -> Any:
+        for is_index, key in self.path:
+            if is_index:
+                # same as jmespath, index is only applied to list
+                if not isinstance(value, list):
+                    return None
+                try:
+                    value = value[key]
+                except IndexError:
+                    return None
+            else:
+                try:
+                    value = value.get(key)
+                except AttributeError:
+                    return None
+
+            if value is None:
+                return None
+
+        return value
+
+
+def _flatten_field_path(node: Dict) -> Union[List[Tuple[bool, Any]], None]:
+    """ flatten jmespath ast to field path, return None if ast is not plain field path
+    """
+    node_type = node["type"]
+    if node_type == "field":
+        return [(False, node["value"])]
+    elif node_type == "index":
+        return [(True, node["value"])]
+    elif node_type not in ["subexpression", "index_expression"]:
+        return None
+
+    path = []
+    for child in node["children"]:
+        child_path = _flatten_field_path(child)
+        if child_path is None:
+            return None
+        path.extend(child_path)
+
+    return path
+
+
+@lru_cache(maxsize=JMESPATH_CACHE_SIZE)
+def compile_jmespath(expr: Text) -> Union[FieldPathExpression, ParsedResult]:
+    """ compile jmespath expression, compiled results are cached in LRU mode
+        and shared by all responses in process.
+    """
+    parsed_result = jmespath.compile(expr)
+    path = _flatten_field_path(parsed_result.parsed)
+    if path is None:
+        return parsed_result
+
+    return FieldPathExpression(expr, path)
 
 
 def get_uniform_comparator(comparator: Text):
@@ -59,6 +136,7 @@ def uniform_validator(validator):
 
             format1: this is kept for compatibility with the previous versions.
                 {"check": "status_code", "comparator": "eq", "expect": 201}
+                {"check": "status_code", "assert": "eq", "expect": 201}
                 {"check": "$resp_body_success", "comparator": "eq", "expect": True}
             format2: recommended new version, {assert: [check_item, expected_value]}
                 {'eq': ['status_code', 201]}
@@ -78,11 +156,11 @@ def uniform_validator(validator):
         raise ParamsError(f"invalid validator: {validator}")
 
     if "check" in validator and "expect" in validator:
-        # format1
+        # format1, comparator key is `assert` in v2 and unified validators
         check_item = validator["check"]
         expect_value = validator["expect"]
         message = validator.get("message", "")
-        comparator = validator.get("comparator", "eq")
+        comparator = validator.get("comparator", validator.get("assert", "eq"))
 
     elif len(validator) == 1:
         # format2
@@ -114,25 +192,108 @@ def uniform_validator(validator):
     }
 
 
+class CompiledValidator(object):
+    """ validator compiled once per teststep, comparator is resolved ahead, check item,
+        expect value and message are compiled ahead and only dynamic parts are evaluated.
+    """
+
+    __slots__ = (
+        "check",
+        "expect",
+        "assert_method",
+        "assert_func",
+        "compiled_check",
+        "compiled_expect",
+        "compiled_message",
+    )
+
+    def __init__(self, validator: Dict):
+        u_validator = uniform_validator(validator)
+        self.check = u_validator["check"]
+        self.expect = u_validator["expect"]
+        self.assert_method = u_validator["assert"]
+
+        try:
+            # builtin comparator
+            self.assert_func = get_mapping_function(self.assert_method, {})
+        except FunctionNotFound:
+            # custom comparator defined in debugtalk.py, resolved when validating
+            self.assert_func = None
+
+        # check item with variables or functions is evaluated in each validation
+        self.compiled_check = None
+        if isinstance(self.check, Text) and "$" in self.check:
+            self.compiled_check = compile_data(self.check)
+
+        self.compiled_expect = compile_data(self.expect)
+        self.compiled_message = compile_data(u_validator["message"])
+
+    def get_assert_func(self, functions_mapping: FunctionsMapping):
+        """ comparator defined in debugtalk.py takes precedence over builtin comparator
+        """
+        if self.assert_method in functions_mapping:
+            return functions_mapping[self.assert_method]
+        elif self.assert_func is not None:
+            return self.assert_func
+
+        return get_mapping_function(self.assert_method, functions_mapping)
+
+
+def compile_validators(
+    validators: Union[Validators, List[CompiledValidator]]
+) -> List[CompiledValidator]:
+    """ compile validators, compiled validators are kept as they are """
+    return [
+        v if isinstance(v, CompiledValidator) else CompiledValidator(v)
+        for v in validators
+    ]
+
+
 class ResponseObject(object):
-    def __init__(self, resp_obj: requests.Response):
+    def __init__(self, resp_obj: requests.Response, copy_body: bool = False):
         """ initialize with a requests.Response object
 
         Args:
             resp_obj (instance): requests.Response instance
+            copy_body (bool): copy decoded json body, which may be modified by hooks,
+                thus decoded body shared with request & response recording is kept
 
         """
         self.resp_obj = resp_obj
+        self.copy_body = copy_body
         self.validation_results: Dict = {}
+        # response meta searched by jmespath, built once on first search
+        self.resp_obj_meta: Dict = None
+        # body field values searched from response body stream, see httprunner.ext.stream
+        self.stream_values: Dict[Text, Any] = {}
 
     def __getattr__(self, key):
         if key in ["json", "content", "body"]:
+            if is_response_streamed(self.resp_obj):
+                err_msg = getattr(self.resp_obj, "hrun_stream_error", None) or (
+                    f"response body has been consumed in stream mode, "
+                    f"only body field paths in extract and validate are searched: {key}"
+                )
+                logger.error(err_msg)
+                raise exceptions.ParamsError(err_msg)
+
             try:
-                value = self.resp_obj.json()
+                value = load_response_json(self.resp_obj)
             except ValueError:
                 value = self.resp_obj.content
+            else:
+                if self.copy_body:
+                    # copied once, modifications in hooks are searched in body
+                    value = copy.deepcopy(value)
+                    self.__dict__.update(json=value, content=value, body=value)
         elif key == "cookies":
-            value = self.resp_obj.cookies.get_dict()
+            cookies = self.resp_obj.cookies
+            if hasattr(cookies, "get_dict"):
+                # requests.cookies.RequestsCookieJar
+                value = cookies.get_dict()
+            else:
+                # mapping cookies, e.g. httpx.Cookies
+                value = dict(cookies)
         else:
             try:
                 value = getattr(self.resp_obj, key)
@@ -145,22 +306,30 @@ class ResponseObject(object):
         return value
 
     def _search_jmespath(self, expr: Text) -> Any:
-        resp_obj_meta = {
-            "status_code": self.status_code,
-            "headers": self.headers,
-            "cookies": self.cookies,
-            "body": self.body,
-        }
-        if not expr.startswith(tuple(resp_obj_meta.keys())):
+        if not expr.startswith(RESPONSE_META_FIELDS):
             return expr
-        
+
+        if expr in self.stream_values:
+            return self.stream_values[expr]
+
+        if self.resp_obj_meta is None:
+            self.resp_obj_meta = {
+                "status_code": self.status_code,
+                "headers": self.headers,
+                "cookies": self.cookies,
+            }
+
+        if "body" in expr and "body" not in self.resp_obj_meta:
+            # body is loaded only if searched
+            self.resp_obj_meta["body"] = self.body
+
         try:
-            check_value = jmespath.search(expr, resp_obj_meta)
+            check_value = compile_jmespath(expr).search(self.resp_obj_meta)
         except JMESPathError as ex:
             logger.error(
                 f"failed to search with jmespath\n"
                 f"expression: {expr}\n"
-                f"data: {resp_obj_meta}\n"
+                f"data: {self.resp_obj_meta}\n"
                 f"exception: {ex}"
             )
             raise
@@ -181,7 +350,7 @@ class ResponseObject(object):
 
     def validate(
         self,
-        validators: Validators,
+        validators: Union[Validators, List[CompiledValidator]],
         variables_mapping: VariablesMapping = None,
         functions_mapping: FunctionsMapping = None,
     ) -> NoReturn:
@@ -195,20 +364,16 @@ class ResponseObject(object):
 
         validate_pass = True
         failures = []
+        self.validation_results["validate_extractor"] = []
 
-        for v in validators:
-
-            if "validate_extractor" not in self.validation_results:
-                self.validation_results["validate_extractor"] = []
-
-            u_validator = uniform_validator(v)
+        for validator in compile_validators(validators):
 
             # check item
-            check_item = u_validator["check"]
-            if "$" in check_item:
+            check_item = validator.check
+            if validator.compiled_check is not None:
                 # check_item is variable or function
-                check_item = parse_data(
-                    check_item, variables_mapping, functions_mapping
+                check_item = validator.compiled_check.render(
+                    variables_mapping, functions_mapping
                 )
                 check_item = parse_string_value(check_item)
 
@@ -219,41 +384,43 @@ class ResponseObject(object):
                 check_value = check_item
 
             # comparator
-            assert_method = u_validator["assert"]
-            assert_func = get_mapping_function(assert_method, functions_mapping)
+            assert_method = validator.assert_method
+            assert_func = validator.get_assert_func(functions_mapping)
 
-            # expect item
-            expect_item = u_validator["expect"]
             # parse expected value with config/teststep/extracted variables
-            expect_value = parse_data(expect_item, variables_mapping, functions_mapping)
+            expect_value = validator.compiled_expect.render(
+                variables_mapping, functions_mapping
+            )
 
-            # message
-            message = u_validator["message"]
             # parse message with config/teststep/extracted variables
-            message = parse_data(message, variables_mapping, functions_mapping)
-
-            validate_msg = f"assert {check_item} {assert_method} {expect_value}({type(expect_value).__name__})"
+            message = validator.compiled_message.render(
+                variables_mapping, functions_mapping
+            )
 
             validator_dict = {
                 "comparator": assert_method,
                 "check": check_item,
                 "check_value": check_value,
-                "expect": expect_item,
+                "expect": validator.expect,
                 "expect_value": expect_value,
                 "message": message,
             }
 
             try:
                 assert_func(check_value, expect_value, message)
-                validate_msg += "\t==> pass"
-                logger.info(validate_msg)
+                # log message is built only if info log enabled
+                logger.opt(lazy=True).info(
+                    "{}",
+                    lambda: f"assert {check_item} {assert_method} {expect_value}"
+                    f"({type(expect_value).__name__})\t==> pass",
+                )
                 validator_dict["check_result"] = "pass"
             except AssertionError as ex:
                 validate_pass = False
                 validator_dict["check_result"] = "fail"
-                validate_msg += "\t==> fail"
-                validate_msg += (
-                    f"\n"
+                validate_msg = (
+                    f"assert {check_item} {assert_method} {expect_value}"
+                    f"({type(expect_value).__name__})\t==> fail\n"
                     f"check_item: {check_item}\n"
                     f"check_value: {check_value}({type(check_value).__name__})\n"
                     f"assert_method: {assert_method}\n"
@@ -1,8 +1,9 @@
 import os
 import time
 import uuid
+import weakref
 from datetime import datetime
-from typing import List, Dict, Text, NoReturn
+from typing import List, Dict, Text, NoReturn, Generator, Tuple, Any, Callable
 
 try:
     import allure
@@ -16,9 +17,12 @@ from loguru import logger
 from httprunner import utils, exceptions
 from httprunner.client import HttpSession
 from httprunner.exceptions import ValidationFailure, ParamsError
+from httprunner.ext.stream import search_step_stream
 from httprunner.ext.uploader import prepare_upload_step
 from httprunner.loader import load_project_meta, load_testcase_file
+from httprunner.memoization import enter_testcase_scope, exit_testcase_scope
 from httprunner.parser import build_url, parse_data, parse_variables_mapping
+from httprunner.plan import TestCasePlan, StepPlan
 from httprunner.response import ResponseObject
 from httprunner.testcase import Config, Step
 from httprunner.utils import merge_variables
@@ -33,8 +37,26 @@ from httprunner.models import (
     ProjectMeta,
     TestCase,
     Hooks,
+    SessionData,
+    MemoizeStat,
+    ConnectionStat,
 )
 
+""" compiled plans of testcase classes, teststeps of each class are compiled only once
+"""
+testcase_plans_cache: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+""" testcase run is performed as generator, which yields (method, url, kwargs) of each
+    request and receives the response, thus it can be driven by sync or awaitable session
+"""
+RunGenerator = Generator[Tuple[Text, Text, Dict], Any, "HttpRunner"]
+
+""" listener of request steps, called once per request step after it is validated with
+    keyword arguments request_type, name, response_time, response_length and exception,
+    e.g. reporting request events to locust
+"""
+RequestListener = Callable[..., Any]
+
 
 class HttpRunner(object):
     config: Config
@@ -47,8 +69,19 @@ class HttpRunner(object):
     __case_id: Text = ""
     __export: List[Text] = []
     __step_datas: List[StepData] = []
+    # session data of steps and responses, not recorded yet, initialized in each run
+    __unrecorded_req_resps: List[Tuple[SessionData, Any]] = None
     __session: HttpSession = None
     __session_variables: VariablesMapping = {}
+    # compiled plan
+    __plan: TestCasePlan = None
+    # hits and misses of memoized functions in testcase run, initialized in each run
+    __memoize_stats: Dict[Text, MemoizeStat] = None
+    # connections created and reused by session in testcase run, initialized in each run
+    __connection_stat: ConnectionStat = None
+    # request steps listener, named by step name or url template
+    __request_listener: RequestListener = None
+    __request_name_by_url: bool = False
     # time
     __start_at: float = 0
     __duration: float = 0
@@ -88,6 +121,19 @@ class HttpRunner(object):
         self.__export = export
         return self
 
+    def with_request_listener(
+        self, listener: RequestListener, name_by_url: bool = False
+    ) -> "HttpRunner":
+        """ report each request step to listener, named by step name or url template """
+        self.__request_listener = listener
+        self.__request_name_by_url = name_by_url
+        return self
+
+    def with_plan(self, plan: TestCasePlan) -> "HttpRunner":
+        """ reuse compiled plan, only used for the teststeps it is compiled from """
+        self.__plan = plan
+        return self
+
     def __call_hooks(
         self, hooks: Hooks, step_variables: VariablesMapping, hook_msg: Text,
     ) -> NoReturn:
@@ -134,26 +180,39 @@ class HttpRunner(object):
             else:
                 logger.error(f"Invalid hook format: {hook}")
 
-    def __run_step_request(self, step: TStep) -> StepData:
+    def __run_step_request(
+        self, step_plan: StepPlan, step_variables: VariablesMapping
+    ) -> Generator[Tuple[Text, Text, Dict], Any, StepData]:
         """run teststep: request"""
+        step = step_plan.step
         step_data = StepData(name=step.name)
 
         # parse
-        prepare_upload_step(step, self.__project_meta.functions)
-        request_dict = step.request.dict()
-        request_dict.pop("upload", None)
-        parsed_request_dict = parse_data(
-            request_dict, step.variables, self.__project_meta.functions
-        )
+        if step_plan.request:
+            parsed_request_dict = step_plan.request.render(
+                step_variables, self.__project_meta.functions
+            )
+        else:
+            # upload step, prepare with a copy to keep teststep unchanged
+            step = step.copy(deep=True)
+            step.variables = step_variables
+            prepare_upload_step(step, self.__project_meta.functions)
+            step_variables = step.variables
+            request_dict = step.request.dict()
+            request_dict.pop("upload", None)
+            parsed_request_dict = parse_data(
+                request_dict, step_variables, self.__project_meta.functions
+            )
+
         parsed_request_dict["headers"].setdefault(
             "HRUN-Request-ID",
             f"HRUN-{self.__case_id}-{str(int(time.time() * 1000))[-6:]}",
         )
-        step.variables["request"] = parsed_request_dict
+        step_variables["request"] = parsed_request_dict
 
         # setup hooks
         if step.setup_hooks:
-            self.__call_hooks(step.setup_hooks, step.variables, "setup request")
+            self.__call_hooks(step.setup_hooks, step_variables, "setup request")
 
         # prepare arguments
         method = parsed_request_dict.pop("method")
@@ -162,94 +221,169 @@ class HttpRunner(object):
         parsed_request_dict["verify"] = self.__config.verify
         parsed_request_dict["json"] = parsed_request_dict.pop("req_json", {})
 
-        # request
-        resp = self.__session.request(method, url, **parsed_request_dict)
-        resp_obj = ResponseObject(resp)
-        step.variables["response"] = resp_obj
-
-        # teardown hooks
-        if step.teardown_hooks:
-            self.__call_hooks(step.teardown_hooks, step.variables, "teardown request")
-
-        def log_req_resp_details():
-            err_msg = "\n{} DETAILED REQUEST & RESPONSE {}\n".format("*" * 32, "*" * 32)
-
-            # log request
-            err_msg += "====== request details ======\n"
-            err_msg += f"url: {url}\n"
-            err_msg += f"method: {method}\n"
-            headers = parsed_request_dict.pop("headers", {})
-            err_msg += f"headers: {headers}\n"
-            for k, v in parsed_request_dict.items():
-                v = utils.omit_long_data(v)
-                err_msg += f"{k}: {repr(v)}\n"
-
-            err_msg += "\n"
-
-            # log response
-            err_msg += "====== response details ======\n"
-            err_msg += f"status_code: {resp.status_code}\n"
-            err_msg += f"headers: {resp.headers}\n"
-            err_msg += f"body: {repr(resp.text)}\n"
-            logger.error(err_msg)
-
-        # extract
-        extractors = step.extract
-        extract_mapping = resp_obj.extract(extractors)
-        step_data.export_vars = extract_mapping
-
-        variables_mapping = step.variables
-        variables_mapping.update(extract_mapping)
-
-        # validate
-        validators = step.validators
-        session_success = False
+        # request, sent by session which drives the run
+        sent_at = time.perf_counter()
+        resp = yield method, url, parsed_request_dict
+        response_time_ms = (time.perf_counter() - sent_at) * 1000
         try:
-            resp_obj.validate(
-                validators, variables_mapping, self.__project_meta.functions
-            )
-            session_success = True
-        except ValidationFailure:
+            # response body modified in teardown hooks is not recorded
+            resp_obj = ResponseObject(resp, copy_body=bool(step.teardown_hooks))
+            step_variables["response"] = resp_obj
+
+            # teardown hooks
+            if step.teardown_hooks:
+                self.__call_hooks(
+                    step.teardown_hooks, step_variables, "teardown request"
+                )
+
+            def log_req_resp_details():
+                err_msg = "\n{} DETAILED REQUEST & RESPONSE {}\n".format(
+                    "*" * 32, "*" * 32
+                )
+
+                # log request
+                err_msg += "====== request details ======\n"
+                err_msg += f"url: {url}\n"
+                err_msg += f"method: {method}\n"
+                headers = parsed_request_dict.pop("headers", {})
+                err_msg += f"headers: {headers}\n"
+                for k, v in parsed_request_dict.items():
+                    v = utils.omit_long_data(v)
+                    err_msg += f"{k}: {repr(v)}\n"
+
+                err_msg += "\n"
+
+                # log response
+                err_msg += "====== response details ======\n"
+                err_msg += f"status_code: {resp.status_code}\n"
+                err_msg += f"headers: {resp.headers}\n"
+                if utils.is_response_streamed(resp):
+                    err_msg += "body: response body stream (OMITTED)\n"
+                else:
+                    err_msg += f"body: {repr(resp.text)}\n"
+                logger.error(err_msg)
+
+            # search body field paths from response body stream ahead in stream mode
+            if step.request.stream:
+                search_step_stream(resp_obj, step.extract, step_plan.validators)
+
+            # extract
+            extractors = step.extract
+            extract_mapping = resp_obj.extract(extractors)
+            step_data.export_vars = extract_mapping
+
+            variables_mapping = step_variables
+            variables_mapping.update(extract_mapping)
+
+            # validate
+            validators = step_plan.validators
             session_success = False
-            log_req_resp_details()
-            # log testcase duration before raise ValidationFailure
-            self.__duration = time.time() - self.__start_at
+            try:
+                resp_obj.validate(
+                    validators, variables_mapping, self.__project_meta.functions
+                )
+                session_success = True
+            except ValidationFailure:
+                session_success = False
+                log_req_resp_details()
+                # failed step is always recorded for report
+                if hasattr(self.__session, "record_req_resps"):
+                    self.__session.record_req_resps(self.__session.data, resp)
+                # log testcase duration before raise ValidationFailure
+                self.__duration = time.time() - self.__start_at
+                raise
+            finally:
+                self.success = session_success
+                step_data.success = session_success
+
+                if hasattr(self.__session, "data"):
+                    # httprunner.client.HttpSession, not locust.clients.HttpSession
+                    # save request & response meta data
+                    self.__session.data.success = session_success
+                    self.__session.data.validators = resp_obj.validation_results
+
+                    # save step data, request & response are recorded when needed
+                    step_data.data = self.__session.data
+                    self.__unrecorded_req_resps.append((self.__session.data, resp))
+        except Exception as ex:
+            # failed extraction, validation or hooks are failures of current step
+            self.__report_request(step, method, resp, response_time_ms, ex)
             raise
-        finally:
-            self.success = session_success
-            step_data.success = session_success
 
-            if hasattr(self.__session, "data"):
-                # httprunner.client.HttpSession, not locust.clients.HttpSession
-                # save request & response meta data
-                self.__session.data.success = session_success
-                self.__session.data.validators = resp_obj.validation_results
+        self.__report_request(
+            step, method, resp, response_time_ms, getattr(resp, "error", None)
+        )
+        return step_data
 
-                # save step data
-                step_data.data = self.__session.data
+    def __report_request(
+        self,
+        step: TStep,
+        method: Text,
+        resp: Any,
+        response_time_ms: float,
+        exception: Exception = None,
+    ) -> NoReturn:
+        """ report request step to listener, with stat of HttpSession if available """
+        if self.__request_listener is None:
+            return
 
-        return step_data
+        if hasattr(self.__session, "data"):
+            response_time_ms = self.__session.data.stat.response_time_ms
+            response_length = self.__session.data.stat.content_size
+        elif utils.is_response_streamed(resp):
+            response_length = int(resp.headers.get("content-length") or 0)
+        else:
+            response_length = len(resp.content or b"")
+
+        # templated url is used as name, thus stats are not split by variables
+        name = step.request.url if self.__request_name_by_url else step.name
+        self.__request_listener(
+            request_type=method.upper(),
+            name=name or step.request.url,
+            response_time=response_time_ms,
+            response_length=response_length,
+            exception=exception,
+        )
 
-    def __run_step_testcase(self, step: TStep) -> StepData:
+    def __run_step_testcase(
+        self, step_plan: StepPlan, step_variables: VariablesMapping
+    ) -> Generator[Tuple[Text, Text, Dict], Any, StepData]:
         """run teststep: referenced testcase"""
+        step = step_plan.step
         step_data = StepData(name=step.name)
-        step_variables = step.variables
         step_export = step.export
 
         # setup hooks
         if step.setup_hooks:
             self.__call_hooks(step.setup_hooks, step_variables, "setup testcase")
 
-        if hasattr(step.testcase, "config") and hasattr(step.testcase, "teststeps"):
+        if isinstance(step.testcase, TestCase):
+            # testcase loaded in memory, e.g. referenced testcase in direct run mode
+            case_runner = (
+                HttpRunner()
+                .with_session(self.__session)
+                .with_case_id(self.__case_id)
+                .with_variables(step_variables)
+                .with_export(step_export)
+                .with_request_listener(
+                    self.__request_listener, self.__request_name_by_url
+                )
+            )
+            case_result = yield from case_runner.__iter_testcase(step.testcase)
+
+        elif hasattr(step.testcase, "config") and hasattr(step.testcase, "teststeps"):
             testcase_cls = step.testcase
-            case_result = (
+            case_runner = (
                 testcase_cls()
                 .with_session(self.__session)
                 .with_case_id(self.__case_id)
                 .with_variables(step_variables)
                 .with_export(step_export)
-                .run()
+                .with_request_listener(
+                    self.__request_listener, self.__request_name_by_url
+                )
             )
+            case_result = yield from case_runner.__iter_run()
 
         elif isinstance(step.testcase, Text):
             if os.path.isabs(step.testcase):
@@ -259,14 +393,17 @@ class HttpRunner(object):
                     self.__project_meta.RootDir, step.testcase
                 )
 
-            case_result = (
+            case_runner = (
                 HttpRunner()
                 .with_session(self.__session)
                 .with_case_id(self.__case_id)
                 .with_variables(step_variables)
                 .with_export(step_export)
-                .run_path(ref_testcase_path)
+                .with_request_listener(
+                    self.__request_listener, self.__request_name_by_url
+                )
             )
+            case_result = yield from case_runner.__iter_path(ref_testcase_path)
 
         else:
             raise exceptions.ParamsError(
@@ -275,9 +412,11 @@ class HttpRunner(object):
 
         # teardown hooks
         if step.teardown_hooks:
-            self.__call_hooks(step.teardown_hooks, step.variables, "teardown testcase")
+            self.__call_hooks(step.teardown_hooks, step_variables, "teardown testcase")
 
-        step_data.data = case_result.get_step_datas()  # list of step data
+        # list of step data, request & response of referenced testcase are recorded lazily
+        step_data.data = case_result.__step_datas
+        self.__unrecorded_req_resps.extend(case_result.__unrecorded_req_resps)
         step_data.export_vars = case_result.get_export_variables()
         step_data.success = case_result.success
         self.success = case_result.success
@@ -287,14 +426,17 @@ class HttpRunner(object):
 
         return step_data
 
-    def __run_step(self, step: TStep) -> Dict:
+    def __run_step(
+        self, step_plan: StepPlan, step_variables: VariablesMapping
+    ) -> Generator[Tuple[Text, Text, Dict], Any, Dict]:
         """run teststep, teststep maybe a request or referenced testcase"""
+        step = step_plan.step
         logger.info(f"run step begin: {step.name} >>>>>>")
 
         if step.request:
-            step_data = self.__run_step_request(step)
+            step_data = yield from self.__run_step_request(step_plan, step_variables)
         elif step.testcase:
-            step_data = self.__run_step_testcase(step)
+            step_data = yield from self.__run_step_testcase(step_plan, step_variables)
         else:
             raise ParamsError(
                 f"teststep is neither a request nor a referenced testcase: {step.dict()}"
@@ -316,16 +458,39 @@ class HttpRunner(object):
             config.base_url, config.variables, self.__project_meta.functions
         )
 
-    def run_testcase(self, testcase: TestCase) -> "HttpRunner":
-        """run specified testcase
+    def __get_class_plan(self) -> TestCasePlan:
+        """get compiled plan of current testcase class, compile on first run"""
+        testcase_cls = self.__class__
+        plan = testcase_plans_cache.get(testcase_cls)
+        if plan is None:
+            plan = TestCasePlan(self.__teststeps)
+            testcase_plans_cache[testcase_cls] = plan
 
-        Examples:
-            >>> testcase_obj = TestCase(config=TConfig(...), teststeps=[TStep(...)])
-            >>> HttpRunner().with_project_meta(project_meta).run_testcase(testcase_obj)
+        return plan
 
-        """
-        self.__config = testcase.config
-        self.__teststeps = testcase.teststeps
+    def __iter_plan(self, config: TConfig, plan: TestCasePlan) -> RunGenerator:
+        """ run plan in its own memoize scope, see httprunner.memoization """
+        memoize_token = enter_testcase_scope()
+        connection_stat = self.__get_connection_stat()
+        try:
+            return (yield from self.__iter_plan_steps(config, plan))
+        finally:
+            self.__memoize_stats = exit_testcase_scope(memoize_token)
+            connection_stat_end = self.__get_connection_stat()
+            self.__connection_stat = ConnectionStat(
+                new_connections=connection_stat_end.new_connections
+                - connection_stat.new_connections,
+                reused_connections=connection_stat_end.reused_connections
+                - connection_stat.reused_connections,
+            )
+
+    def __get_connection_stat(self) -> ConnectionStat:
+        """ get copy of session connection stat, which is only counted by HttpSession """
+        connection_stat = getattr(self.__session, "connection_stat", None)
+        return connection_stat.copy() if connection_stat else ConnectionStat()
+
+    def __iter_plan_steps(self, config: TConfig, plan: TestCasePlan) -> RunGenerator:
+        self.__config = config
 
         # prepare
         self.__project_meta = self.__project_meta or load_project_meta(
@@ -334,29 +499,36 @@ class HttpRunner(object):
         self.__parse_config(self.__config)
         self.__start_at = time.time()
         self.__step_datas: List[StepData] = []
-        self.__session = self.__session or HttpSession()
+        self.__unrecorded_req_resps = []
+        self.__memoize_stats = {}
+        self.__connection_stat = ConnectionStat()
+        self.__session = self.__session or HttpSession(
+            record_level=config.record, connection_pool=config.connection_pool
+        )
         # save extracted variables of teststeps
         extracted_variables: VariablesMapping = {}
 
         # run teststeps
-        for step in self.__teststeps:
+        for step_plan in plan.steps:
             # override variables
             # step variables > extracted variables from previous steps
-            step.variables = merge_variables(step.variables, extracted_variables)
+            step_variables = merge_variables(step_plan.variables, extracted_variables)
             # step variables > testcase config variables
-            step.variables = merge_variables(step.variables, self.__config.variables)
+            step_variables = merge_variables(step_variables, self.__config.variables)
 
             # parse variables
-            step.variables = parse_variables_mapping(
-                step.variables, self.__project_meta.functions
+            step_variables = parse_variables_mapping(
+                step_variables, self.__project_meta.functions
             )
 
             # run step
             if USE_ALLURE:
-                with allure.step(f"step: {step.name}"):
-                    extract_mapping = self.__run_step(step)
+                with allure.step(f"step: {step_plan.name}"):
+                    extract_mapping = yield from self.__run_step(
+                        step_plan, step_variables
+                    )
             else:
-                extract_mapping = self.__run_step(step)
+                extract_mapping = yield from self.__run_step(step_plan, step_variables)
 
             # save extracted variables to session variables
             extracted_variables.update(extract_mapping)
@@ -365,12 +537,79 @@ class HttpRunner(object):
         self.__duration = time.time() - self.__start_at
         return self
 
-    def run_path(self, path: Text) -> "HttpRunner":
+    def __iter_testcase(self, testcase: TestCase) -> RunGenerator:
+        self.__teststeps = testcase.teststeps
+        if self.__plan is None or self.__plan.teststeps is not testcase.teststeps:
+            self.__plan = TestCasePlan(testcase.teststeps)
+
+        # config is parsed in run, copy to keep testcase unchanged
+        return self.__iter_plan(testcase.config.copy(deep=True), self.__plan)
+
+    def __iter_path(self, path: Text) -> RunGenerator:
         if not os.path.isfile(path):
             raise exceptions.ParamsError(f"Invalid testcase path: {path}")
 
         testcase_obj = load_testcase_file(path)
-        return self.run_testcase(testcase_obj)
+        return self.__iter_testcase(testcase_obj)
+
+    def __iter_run(self) -> RunGenerator:
+        self.__init_tests__()
+        return self.__iter_plan(self.__config, self.__get_class_plan())
+
+    def __send_requests(self, run_gen: RunGenerator) -> "HttpRunner":
+        """ drive testcase run, send each request with session and return the runner """
+        try:
+            method, url, kwargs = next(run_gen)
+            while True:
+                resp = self.__session.request(method, url, **kwargs)
+                method, url, kwargs = run_gen.send(resp)
+        except StopIteration as ex:
+            return ex.value
+        finally:
+            # exit run scope even if sending request raises
+            run_gen.close()
+
+    async def __send_requests_async(self, run_gen: RunGenerator) -> "HttpRunner":
+        """ drive testcase run, await each request with awaitable session """
+        try:
+            method, url, kwargs = next(run_gen)
+            while True:
+                resp = await self.__session.request(method, url, **kwargs)
+                method, url, kwargs = run_gen.send(resp)
+        except StopIteration as ex:
+            return ex.value
+        finally:
+            # exit run scope even if sending request raises
+            run_gen.close()
+
+    def run_testcase(self, testcase: TestCase) -> "HttpRunner":
+        """run specified testcase, teststeps are compiled once if the same testcase is run repeatedly
+
+        Examples:
+            >>> testcase_obj = TestCase(config=TConfig(...), teststeps=[TStep(...)])
+            >>> HttpRunner().with_project_meta(project_meta).run_testcase(testcase_obj)
+
+        """
+        return self.__send_requests(self.__iter_testcase(testcase))
+
+    async def run_testcase_async(self, testcase: TestCase) -> "HttpRunner":
+        """run specified testcase in event loop, requests are awaited with awaitable session,
+            e.g. httprunner.ext.aio.AsyncHttpSession
+
+        Examples:
+            >>> session = AsyncHttpSession()
+            >>> await HttpRunner().with_session(session).run_testcase_async(testcase_obj)
+
+        """
+        if self.__session is None:
+            raise exceptions.ParamsError(
+                "awaitable session should be specified by with_session()"
+            )
+
+        return await self.__send_requests_async(self.__iter_testcase(testcase))
+
+    def run_path(self, path: Text) -> "HttpRunner":
+        return self.__send_requests(self.__iter_path(path))
 
     def run(self) -> "HttpRunner":
         """ run current testcase
@@ -379,11 +618,18 @@ class HttpRunner(object):
             >>> TestCaseRequestWithFunctions().run()
 
         """
-        self.__init_tests__()
-        testcase_obj = TestCase(config=self.__config, teststeps=self.__teststeps)
-        return self.run_testcase(testcase_obj)
+        return self.__send_requests(self.__iter_run())
+
+    def __record_req_resps(self) -> NoReturn:
+        """ record request & response of steps with session, only when report needs them """
+        if hasattr(self.__session, "record_req_resps"):
+            for session_data, resp in self.__unrecorded_req_resps or []:
+                self.__session.record_req_resps(session_data, resp)
+
+        self.__unrecorded_req_resps = []
 
     def get_step_datas(self) -> List[StepData]:
+        self.__record_req_resps()
         return self.__step_datas
 
     def get_export_variables(self) -> Dict:
@@ -418,7 +664,9 @@ class HttpRunner(object):
                 export_vars=self.get_export_variables(),
             ),
             log=self.__log_path,
-            step_datas=self.__step_datas,
+            step_datas=self.get_step_datas(),
+            memoize_stats=self.__memoize_stats or {},
+            connection_stat=self.__connection_stat or ConnectionStat(),
         )
 
     def test_start(self, param: Dict = None) -> "HttpRunner":
@@ -452,8 +700,8 @@ class HttpRunner(object):
         )
 
         try:
-            return self.run_testcase(
-                TestCase(config=self.__config, teststeps=self.__teststeps)
+            return self.__send_requests(
+                self.__iter_plan(self.__config, self.__get_class_plan())
             )
         finally:
             logger.remove(log_handler)
@@ -7,6 +7,8 @@ from httprunner.models import (
     TRequest,
     MethodEnum,
     TestCase,
+    RecordLevelEnum,
+    TConnectionPool,
 )
 
 
@@ -18,6 +20,9 @@ class Config(object):
         self.__verify = False
         self.__export = []
         self.__weight = 1
+        self.__rate = 0
+        self.__record = RecordLevelEnum.FULL
+        self.__connection_pool = TConnectionPool()
 
         caller_frame = inspect.stack()[1]
         self.__path = caller_frame.filename
@@ -34,6 +39,10 @@ class Config(object):
     def weight(self) -> int:
         return self.__weight
 
+    @property
+    def rate(self) -> float:
+        return self.__rate
+
     def variables(self, **variables) -> "Config":
         self.__variables.update(variables)
         return self
@@ -54,6 +63,29 @@ class Config(object):
         self.__weight = weight
         return self
 
+    def locust_rate(self, rate: float) -> "Config":
+        self.__rate = rate
+        return self
+
+    def record(self, record_level: Text) -> "Config":
+        self.__record = RecordLevelEnum(record_level)
+        return self
+
+    def connection_pool(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+    ) -> "Config":
+        self.__connection_pool = TConnectionPool(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            keep_alive=keep_alive,
+        )
+        return self
+
     def perform(self) -> TConfig:
         return TConfig(
             name=self.__name,
@@ -63,6 +95,9 @@ class Config(object):
             export=list(set(self.__export)),
             path=self.__path,
             weight=self.__weight,
+            rate=self.__rate,
+            record=self.__record,
+            connection_pool=self.__connection_pool,
         )
 
 
@@ -277,6 +312,10 @@ class RequestWithOptionalArgs(object):
         self.__step_context.request.allow_redirects = allow_redirects
         return self
 
+    def set_stream(self, stream: bool) -> "RequestWithOptionalArgs":
+        self.__step_context.request.stream = stream
+        return self
+
     def upload(self, **file_info) -> "RequestWithOptionalArgs":
         self.__step_context.request.upload.update(file_info)
         return self
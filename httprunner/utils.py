@@ -3,10 +3,12 @@ import copy
 import json
 import os.path
 import platform
+import random
 import uuid
+from collections.abc import Sequence
 from multiprocessing import Queue
 import itertools
-from typing import Dict, List, Any, Union, Text
+from typing import Dict, List, Any, Union, Text, Iterable, Tuple
 
 import sentry_sdk
 from loguru import logger
@@ -15,6 +17,32 @@ from httprunner import __version__
 from httprunner import exceptions
 from httprunner.models import VariablesMapping
 
+try:
+    # fast json backend, pip install orjson
+    import orjson
+
+    if isinstance(orjson.loads(b"18446744073709551616"), float):
+        # integers larger than 64 bits are decoded as float in old versions of orjson
+        orjson = None
+except ModuleNotFoundError:
+    orjson = None
+except ValueError:
+    # integers larger than 64 bits are rejected, decoded by json in json_loads
+    pass
+
+
+def json_loads(content: Union[bytes, Text]) -> Any:
+    """ decode json with orjson if installed, fallback to json if orjson fails,
+        e.g. integers larger than 64 bits.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass
+
+    return json.loads(content)
+
 
 def init_sentry_sdk():
     sentry_sdk.init(
@@ -159,6 +187,45 @@ def omit_long_data(body, omit_len=512):
     return omitted_body + appendix_str
 
 
+def load_response_json(resp_obj) -> Any:
+    """ decode response body in json only once, decoded body or decoding error is cached
+        in response object, shared by client recorder, extractor and validators.
+
+    Args:
+        resp_obj: requests.Response or httpx.Response object
+
+    Raises:
+        ValueError: response body is not in json format
+
+    """
+    try:
+        json_body, json_error = resp_obj.hrun_json_cache
+    except AttributeError:
+        try:
+            encoding = (resp_obj.encoding or "utf-8").lower().replace("-", "")
+            if encoding == "utf8":
+                json_body, json_error = json_loads(resp_obj.content), None
+            else:
+                json_body, json_error = json_loads(resp_obj.text), None
+        except (ValueError, TypeError) as ex:
+            # TypeError: content is None, e.g. response of connection error
+            json_body, json_error = None, ValueError(ex)
+
+        resp_obj.hrun_json_cache = (json_body, json_error)
+
+    if json_error is not None:
+        raise json_error
+
+    return json_body
+
+
+def is_response_streamed(resp_obj) -> bool:
+    """ check if response body has been consumed in stream mode without materialized,
+        see httprunner.ext.stream
+    """
+    return getattr(resp_obj, "hrun_body_streamed", False)
+
+
 def get_platform():
     return {
         "httprunner_version": __version__,
@@ -260,3 +327,198 @@ def gen_cartesian_product(*args: List[Dict]) -> List[Dict]:
         product_list.append(product_item_dict)
 
     return product_list
+
+
+class CartesianProduct(Sequence):
+    """ lazy cartesian product of parameters lists, combinations are merged on demand,
+        in the same order as gen_cartesian_product.
+
+    Examples:
+
+        >>> arg1 = [{"a": 1}, {"a": 2}]
+        >>> arg2 = [{"x": 111, "y": 112}, {"x": 121, "y": 122}]
+        >>> product = CartesianProduct(arg1, arg2)
+        >>> len(product)
+            4
+        >>> product[1]
+            {'a': 1, 'x': 121, 'y': 122}
+        >>> list(product[0:4:2])  # shard by slicing
+            [{'a': 1, 'x': 111, 'y': 112}, {'a': 2, 'x': 111, 'y': 112}]
+        >>> product.sample(2, seed=1)  # random N combinations
+        >>> product.pairwise()  # combinations covering all pairs of parameters values
+
+    """
+
+    def __init__(self, *args: List[Dict], indices: Sequence = None):
+        self.parameters_list = args
+        self.sizes = [len(arg) for arg in args]
+
+        # count of combinations in full cartesian product
+        self.total = 1 if args else 0
+        for size in self.sizes:
+            self.total *= size
+
+        if indices is None:
+            indices = range(self.total)
+
+        # combination indices in full cartesian product
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict, "CartesianProduct"]:
+        if isinstance(index, slice):
+            return self.__view(self.indices[index])
+
+        return self.__merge(self.indices[index])
+
+    def __iter__(self):
+        for product_index in self.indices:
+            yield self.__merge(product_index)
+
+    def __eq__(self, other: Any) -> bool:
+        """ equal to sequence of the same combinations, e.g. gen_cartesian_product list
+        """
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+
+        return len(self) == len(other) and all(
+            item == other_item for item, other_item in zip(self, other)
+        )
+
+    def __repr__(self) -> Text:
+        return f"<CartesianProduct sizes={self.sizes} len={len(self)}>"
+
+    def __view(self, indices: Sequence) -> "CartesianProduct":
+        return CartesianProduct(*self.parameters_list, indices=indices)
+
+    def __merge(self, product_index: int) -> Dict:
+        # mixed radix, the last parameters list changes fastest like itertools.product
+        positions = []
+        for size in reversed(self.sizes):
+            product_index, position = divmod(product_index, size)
+            positions.append(position)
+
+        product_item_dict = {}
+        for parameters, position in zip(self.parameters_list, reversed(positions)):
+            product_item_dict.update(parameters[position])
+
+        return product_item_dict
+
+    def __index_of(self, positions: List[int]) -> int:
+        product_index = 0
+        for size, position in zip(self.sizes, positions):
+            product_index = product_index * size + position
+
+        return product_index
+
+    def shard(self, shard_index: int, shard_count: int) -> "CartesianProduct":
+        """ get combinations of one shard, distributed in round robin """
+        return self[shard_index::shard_count]
+
+    def sample(self, count: int, seed: Any = None) -> "CartesianProduct":
+        """ sample N combinations randomly without expanding, kept in product order """
+        count = min(count, len(self))
+        indices = random.Random(seed).sample(self.indices, count)
+        return self.__view(sorted(indices))
+
+    def pairwise(self) -> "CartesianProduct":
+        """ get combinations covering all pairs of values of any two parameters lists,
+            generated in IPOG strategy from the full cartesian product.
+
+        Notes:
+            at least the product of the two largest parameters lists sizes is kept, e.g.
+            1,000,000 combinations for two csv files of 1,000 rows. Generation costs
+            O(R * V * P) for R combinations kept, V values and P parameters lists, thus
+            pairwise of large parameters lists takes seconds, sample(n) is cheaper.
+
+        """
+        sizes = self.sizes
+        if len(sizes) < 3 or self.total == 0:
+            # all combinations are needed
+            return self.__view(range(self.total))
+
+        rows = [[a, b] for a in range(sizes[0]) for b in range(sizes[1])]
+        for column in range(2, len(sizes)):
+            uncovered = {
+                (prev_column, prev_value, value)
+                for prev_column in range(column)
+                for prev_value in range(sizes[prev_column])
+                for value in range(sizes[column])
+            }
+
+            # horizontal growth, extend each row with the value covering most pairs
+            for row in rows:
+                best_value, best_pairs = 0, []
+                for value in range(sizes[column]):
+                    pairs = [
+                        (prev_column, prev_value, value)
+                        for prev_column, prev_value in enumerate(row)
+                        if prev_value is not None
+                        and (prev_column, prev_value, value) in uncovered
+                    ]
+                    if len(pairs) > len(best_pairs):
+                        best_value, best_pairs = value, pairs
+
+                row.append(best_value)
+                uncovered.difference_update(best_pairs)
+
+            # vertical growth, add rows for pairs still uncovered, new rows are indexed
+            # by (column not cared, value), thus each pair is placed in O(1)
+            new_rows = []
+            free_rows: Dict[Tuple[int, int], List[List]] = {}
+            for prev_column, prev_value, value in sorted(uncovered):
+                candidates = free_rows.get((prev_column, value))
+                if candidates:
+                    candidates.pop(0)[prev_column] = prev_value
+                    continue
+
+                row = [None] * column + [value]
+                row[prev_column] = prev_value
+                new_rows.append(row)
+                for free_column in range(column):
+                    if free_column != prev_column:
+                        free_rows.setdefault((free_column, value), []).append(row)
+
+            rows.extend(new_rows)
+
+        # values not cared are filled with the first value
+        indices = {self.__index_of([value or 0 for value in row]) for row in rows}
+        return self.__view(sorted(indices))
+
+
+class StreamCartesianProduct(object):
+    """ cartesian product of re-iterable parameters, e.g. csv file in stream mode,
+        combinations are generated in iteration without loading sources in memory,
+        in the same order as CartesianProduct.
+
+    Notes:
+        inner sources are iterated again for each combination of outer sources,
+        thus put parameters in stream mode first to read the large file only once.
+        pytest.mark.parametrize in generated pytest files expands all combinations
+        in list, only direct run mode (`hrun --direct`) iterates them lazily.
+
+    """
+
+    def __init__(self, *args: Iterable[Dict]):
+        self.parameters_list = args
+
+    def __iter__(self):
+        if not self.parameters_list:
+            return
+
+        yield from self.__iter_product(0, {})
+
+    def __repr__(self) -> Text:
+        return f"<StreamCartesianProduct parameters={self.parameters_list}>"
+
+    def __iter_product(self, depth: int, merged: Dict):
+        is_last = depth == len(self.parameters_list) - 1
+        for parameters in self.parameters_list[depth]:
+            product_item_dict = dict(merged)
+            product_item_dict.update(parameters)
+            if is_last:
+                yield product_item_dict
+            else:
+                yield from self.__iter_product(depth + 1, product_item_dict)
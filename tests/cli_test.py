@@ -2,10 +2,11 @@ import io
 import os
 import sys
 import unittest
+from unittest import mock
 
 import pytest
 
-from httprunner.cli import main
+from httprunner.cli import main, main_run
 
 
 class TestCli(unittest.TestCase):
@@ -50,3 +51,19 @@ class TestCli(unittest.TestCase):
             self.assertEqual(exit_code, 0)
         finally:
             os.chdir(cwd)
+
+    def test_run_force_args(self):
+        testcase_path = os.path.join("examples", "postman_echo", "request_methods")
+        with mock.patch("httprunner.cli.main_make") as main_make, mock.patch(
+            "httprunner.cli.pytest.main"
+        ) as pytest_main:
+            main_make.return_value = ["request_methods/hardcode_test.py"]
+
+            # --force of pytest plugins is forwarded to pytest
+            main_run(["--force", testcase_path])
+            main_make.assert_called_with([testcase_path], force=False)
+            self.assertIn("--force", pytest_main.call_args[0][0])
+
+            main_run(["--make-force", testcase_path])
+            main_make.assert_called_with([testcase_path], force=True)
+            self.assertNotIn("--make-force", pytest_main.call_args[0][0])
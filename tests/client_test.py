@@ -0,0 +1,148 @@
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from httprunner import HttpRunner
+from httprunner.client import HttpSession
+from httprunner.models import ConnectionStat, TConnectionPool, TestCase
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    # keep connection alive
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        content = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path == "/slow":
+            time.sleep(1.01)
+        body = json.dumps({"path": self.path, "json": json.loads(content)})
+        body = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpSession(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_record_full(self):
+        session = HttpSession()
+        resp = session.request("POST", f"{self.base_url}/post", json={"a": 1})
+        self.assertEqual(resp.status_code, 200)
+
+        req_resps = session.record_req_resps(session.data, resp)
+        self.assertEqual(len(req_resps), 1)
+        self.assertEqual(req_resps[0].request.body, {"a": 1})
+        self.assertEqual(
+            req_resps[0].response.body, {"path": "/post", "json": {"a": 1}}
+        )
+        # recorded only once
+        self.assertIs(session.record_req_resps(session.data, resp), req_resps)
+
+    def test_record_meta(self):
+        session = HttpSession(record_level="meta")
+        resp = session.request("POST", f"{self.base_url}/post", json={"a": 1})
+        req_resps = session.record_req_resps(session.data, resp)
+        self.assertEqual(req_resps[0].request.method, "POST")
+        self.assertIsNone(req_resps[0].request.body)
+        self.assertEqual(req_resps[0].response.status_code, 200)
+        self.assertEqual(req_resps[0].response.body, "")
+
+    def test_record_off(self):
+        session = HttpSession(record_level="off")
+        resp = session.request("POST", f"{self.base_url}/post", json={"a": 1})
+        self.assertEqual(session.record_req_resps(session.data, resp), [])
+        self.assertGreater(session.data.stat.response_time_ms, 0)
+
+    def test_request_stat(self):
+        session = HttpSession()
+        resp = session.request("POST", f"{self.base_url}/post", json={"a": 1})
+        stat = session.data.stat
+        self.assertEqual(stat.content_size, len(resp.content))
+        self.assertGreater(stat.request_size, len(resp.request.body))
+        self.assertGreater(stat.connect_ms, 0)
+        self.assertGreater(stat.ttfb_ms, 0)
+        self.assertEqual(stat.tls_ms, 0)
+        self.assertGreaterEqual(
+            stat.response_time_ms, stat.dns_ms + stat.connect_ms + stat.ttfb_ms
+        )
+
+        # whole seconds are kept in elapsed time
+        session.request("POST", f"{self.base_url}/slow", json={"a": 1})
+        self.assertGreater(session.data.stat.elapsed_ms, 1000)
+        self.assertGreater(session.data.stat.ttfb_ms, 1000)
+
+    def test_connection_pool(self):
+        session = HttpSession()
+        for _ in range(3):
+            session.request("POST", f"{self.base_url}/post", json={"a": 1})
+        self.assertEqual(
+            session.connection_stat,
+            ConnectionStat(new_connections=1, reused_connections=2),
+        )
+
+        session = HttpSession(
+            connection_pool=TConnectionPool(pool_maxsize=2, keep_alive=False)
+        )
+        self.assertEqual(session.get_adapter(self.base_url)._pool_maxsize, 2)
+        for _ in range(2):
+            session.request("POST", f"{self.base_url}/post", json={"a": 1})
+        self.assertEqual(
+            session.connection_stat,
+            ConnectionStat(new_connections=2, reused_connections=0),
+        )
+
+    def test_runner_record_for_summary(self):
+        testcase = TestCase.parse_obj(
+            {
+                "config": {"name": "record", "base_url": self.base_url},
+                "teststeps": [
+                    {
+                        "name": "post",
+                        "request": {
+                            "method": "POST",
+                            "url": "/post",
+                            "json": {"a": 1},
+                        },
+                        "validate": [{"eq": ["status_code", 200]}],
+                    }
+                ],
+            }
+        )
+        for record_level, response_body in [
+            ("full", {"path": "/post", "json": {"a": 1}}),
+            ("meta", ""),
+        ]:
+            testcase.config.record = record_level
+            runner = HttpRunner().with_variables({}).run_testcase(testcase)
+            step_data = runner.get_summary().step_datas[0]
+            self.assertTrue(step_data.success)
+            self.assertEqual(step_data.data.req_resps[0].response.body, response_body)
+
+        testcase.config.record = "off"
+        runner = HttpRunner().with_variables({}).run_testcase(testcase)
+        self.assertEqual(runner.get_summary().step_datas[0].data.req_resps, [])
+
+        # connections are counted in each run
+        testcase = testcase.copy(update={"teststeps": testcase.teststeps * 2})
+        runner.run_testcase(testcase)
+        self.assertEqual(
+            runner.get_summary().connection_stat,
+            ConnectionStat(new_connections=0, reused_connections=2),
+        )
@@ -0,0 +1,228 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from httprunner import direct, exceptions, loader
+from httprunner.cli import main_run, parse_workers_arg
+from httprunner.models import TestCase
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps({"path": self.path}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDirect(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(("127.0.0.1", 0), EchoHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        loader.project_meta = None
+        direct.ref_testcases_cache.clear()
+        self.tests_dir = tempfile.mkdtemp()
+        self.ref_path = self.dump(
+            "ref.json",
+            {
+                "config": {
+                    "name": "ref",
+                    "variables": {"base_url": self.base_url, "uid": 0},
+                    "export": ["ref_path"],
+                },
+                "teststeps": [
+                    {
+                        "name": "get ref",
+                        "request": {"method": "GET", "url": "$base_url/ref/$uid"},
+                        "extract": {"ref_path": "body.path"},
+                        "validate": [{"eq": ["status_code", 200]}],
+                    }
+                ],
+            },
+        )
+        self.testcase_path = self.dump(
+            "testcase.json",
+            {
+                "config": {
+                    "name": "direct run",
+                    "base_url": self.base_url,
+                    "variables": {"base_url": self.base_url},
+                    "parameters": {"uid": [1, 2]},
+                },
+                "teststeps": [
+                    {"name": "call ref", "testcase": self.ref_path},
+                    {
+                        "name": "get user",
+                        "request": {"method": "GET", "url": "/users/$uid"},
+                        "validate": [
+                            {"eq": ["body.path", "/users/$uid"]},
+                            {"eq": ["$ref_path", "/ref/$uid"]},
+                        ],
+                    },
+                ],
+            },
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tests_dir)
+
+    def dump(self, file_name, content):
+        path = os.path.join(self.tests_dir, file_name)
+        with open(path, "w") as f:
+            json.dump(content, f)
+        return path
+
+    def test_load_tests(self):
+        testsuite_path = self.dump(
+            "testsuite.json",
+            {
+                "config": {"name": "suite", "variables": {"uid": 3}},
+                "testcases": [
+                    {"name": "case 1", "testcase": self.testcase_path},
+                    {"name": "case 2", "testcase": self.testcase_path},
+                ],
+            },
+        )
+        testcases = direct.load_tests(testsuite_path)
+        self.assertEqual([t.config.name for t in testcases], ["case 1", "case 2"])
+        self.assertEqual(testcases[0].config.variables["uid"], 3)
+
+        # referenced testcase is loaded in memory once
+        ref_testcase = testcases[0].teststeps[0].testcase
+        self.assertIsInstance(ref_testcase, TestCase)
+        self.assertIs(
+            testcases[1].teststeps[0].testcase.teststeps, ref_testcase.teststeps
+        )
+        self.assertEqual(testcases[0].teststeps[0].export, ["ref_path"])
+
+    def test_main_run_direct(self):
+        exit_code = main_run(["--direct", self.tests_dir])
+        self.assertEqual(exit_code, 0)
+        # no file is generated
+        self.assertEqual(
+            sorted(os.listdir(self.tests_dir)), ["ref.json", "testcase.json"]
+        )
+
+        summary = direct.run_tests([self.testcase_path])
+        self.assertTrue(summary.success)
+        self.assertEqual(summary.stat.total, 2)
+        step_datas = summary.testcases[1].step_datas
+        self.assertEqual(step_datas[0].export_vars, {"ref_path": "/ref/2"})
+
+    def test_main_run_direct_failed(self):
+        testcase_path = self.dump(
+            "failed.json",
+            {
+                "config": {"name": "failed", "base_url": self.base_url},
+                "teststeps": [
+                    {
+                        "name": "get user",
+                        "request": {"method": "GET", "url": "/users/1"},
+                        "validate": [{"eq": ["status_code", 201]}],
+                    },
+                ],
+            },
+        )
+        exit_code = main_run(["--direct", testcase_path])
+        self.assertEqual(exit_code, 1)
+
+        summary = direct.run_tests([testcase_path])
+        self.assertFalse(summary.success)
+        self.assertEqual(summary.stat.fail, 1)
+        self.assertEqual(summary.testcases[0].name, "failed")
+
+    def test_run_tests_with_workers(self):
+        testsuite_path = self.dump(
+            "testsuite.json",
+            {
+                "config": {"name": "suite"},
+                "testcases": [
+                    {"name": f"case {i}", "testcase": self.testcase_path}
+                    for i in range(3)
+                ],
+            },
+        )
+        summary = direct.run_tests([testsuite_path], workers=2)
+        self.assertTrue(summary.success)
+        self.assertEqual(summary.stat.total, 6)
+
+        # summaries are merged in the same order as sequential run
+        sequential_summary = direct.run_tests([testsuite_path])
+        self.assertEqual(
+            [
+                (t.name, t.step_datas[0].export_vars)
+                for t in sequential_summary.testcases
+            ],
+            [(t.name, t.step_datas[0].export_vars) for t in summary.testcases],
+        )
+
+    def test_main_run_workers_save_tests(self):
+        with open(os.path.join(self.tests_dir, "debugtalk.py"), "w") as f:
+            f.write("")
+
+        exit_code = main_run(
+            ["--direct", "--workers", "2", "--save-tests", self.testcase_path]
+        )
+        self.assertEqual(exit_code, 0)
+
+        # summaries of workers are merged into one report
+        summary_path = os.path.join(self.tests_dir, "logs", "testcase.summary.json")
+        with open(summary_path, encoding="utf-8") as f:
+            summary = json.load(f)
+        self.assertTrue(summary["success"])
+        self.assertEqual(summary["stat"]["total"], 2)
+        self.assertEqual(len(summary["testcases"]), 2)
+
+    def test_load_tests_pytest_file(self):
+        # pytest file generated from YAML/JSON testcase is skipped
+        generated_path = os.path.join(self.tests_dir, "testcase_test.py")
+        with open(generated_path, "w") as f:
+            f.write("# NOTE: Generated By HttpRunner v3.1.6\n")
+        testcases = direct.load_tests(self.tests_dir)
+        self.assertEqual(
+            sorted(t.config.name for t in testcases), ["direct run", "ref"]
+        )
+
+        # other pytest files are not supported
+        with self.assertRaises(exceptions.ParamsError):
+            direct.load_tests(generated_path)
+
+        pytest_path = os.path.join(self.tests_dir, "custom_test.py")
+        with open(pytest_path, "w") as f:
+            f.write("def test_custom():\n    pass\n")
+        with self.assertRaises(exceptions.ParamsError):
+            direct.load_tests(self.tests_dir)
+        with self.assertRaises(SystemExit):
+            main_run(["--direct", "--workers", "2", self.tests_dir])
+
+    def test_parse_workers_arg(self):
+        self.assertEqual(
+            parse_workers_arg(["--workers", "4", "tests", "-s"]), (4, ["tests", "-s"])
+        )
+        self.assertEqual(parse_workers_arg(["--workers=2", "tests"]), (2, ["tests"]))
+        self.assertEqual(parse_workers_arg(["tests"]), (None, ["tests"]))
+        with self.assertRaises(SystemExit):
+            parse_workers_arg(["--workers", "0", "tests"])
+
+    def test_main_run_workers_without_direct(self):
+        # pytest mode does not silently switch to direct mode
+        with self.assertRaises(SystemExit):
+            main_run(["--workers", "2", "examples/postman_echo/request_methods"])
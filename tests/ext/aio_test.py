@@ -0,0 +1,171 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+from httprunner import loader
+from httprunner.ext.aio import AIO_READY, AsyncHttpRunner, AsyncHttpSession
+from httprunner.models import ProjectMeta
+from httprunner.plan import TestCasePlan
+from httprunner.runner import HttpRunner
+
+if AIO_READY:
+    import httpx
+
+
+@unittest.skipUnless(AIO_READY, "httpx is not installed")
+class TestAsyncHttpRunner(unittest.TestCase):
+    def setUp(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        async def handler(request):
+            if request.url.path == "/error":
+                raise RuntimeError("transport error")
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            return httpx.Response(
+                200,
+                json={"url": str(request.url), "body": request.content.decode()},
+                headers={"Set-Cookie": "token=abc; Path=/"},
+            )
+
+        self.transport = httpx.MockTransport(handler)
+        self.project_meta = ProjectMeta(functions={"sum_two": lambda a, b: a + b})
+        self.testcase = loader.load_testcase(
+            {
+                "config": {
+                    "name": "echo",
+                    "base_url": "http://echo.local",
+                    "variables": {"uid": 100},
+                },
+                "teststeps": [
+                    {
+                        "name": "post user",
+                        "variables": {"num": "${sum_two($uid, 1)}"},
+                        "request": {
+                            "method": "POST",
+                            "url": "/users/$uid",
+                            "json": {"num": "$num"},
+                        },
+                        "extract": {"url": "body.url"},
+                        "validate": [
+                            {"eq": ["status_code", 200]},
+                            {"eq": ["cookies.token", "abc"]},
+                        ],
+                    },
+                    {
+                        "name": "echo url",
+                        "request": {
+                            "method": "GET",
+                            "url": "/echo?from=$url",
+                            "params": {"uid": "$uid"},
+                        },
+                        "validate": [
+                            {
+                                "eq": [
+                                    "body.url",
+                                    "http://echo.local/echo?from="
+                                    "http://echo.local/users/100&uid=100",
+                                ]
+                            }
+                        ],
+                    },
+                ],
+            }
+        )
+
+    def test_run_testcases(self):
+        runner = AsyncHttpRunner(
+            concurrency=5, project_meta=self.project_meta, transport=self.transport
+        )
+        results = runner.run([self.testcase] * 20)
+
+        self.assertEqual(len(results), 20)
+        self.assertLessEqual(self.max_in_flight, 5)
+        for result in results:
+            self.assertTrue(result.success)
+            step_datas = result.get_step_datas()
+            self.assertEqual(len(step_datas), 2)
+            self.assertEqual(
+                step_datas[0].export_vars, {"url": "http://echo.local/users/100"}
+            )
+            req_resp = step_datas[0].data.req_resps[0]
+            self.assertEqual(req_resp.request.method, "POST")
+            self.assertEqual(req_resp.request.body, {"num": 101})
+            self.assertEqual(req_resp.response.status_code, 200)
+            self.assertEqual(
+                step_datas[1].data.req_resps[0].request.cookies, {"token": "abc"}
+            )
+
+        # testcase is not modified by runs
+        self.assertEqual(self.testcase.config.variables, {"uid": 100})
+        self.assertEqual(
+            self.testcase.teststeps[0].variables, {"num": "${sum_two($uid, 1)}"}
+        )
+
+    def test_run_testcases_compile_plan_once(self):
+        runner = AsyncHttpRunner(
+            project_meta=self.project_meta, transport=self.transport
+        )
+        with mock.patch(
+            "httprunner.ext.aio.TestCasePlan", wraps=TestCasePlan
+        ) as plan_cls:
+            results = runner.run([self.testcase] * 5)
+            self.assertTrue(all(result.success for result in results))
+            plan_cls.assert_called_once_with(self.testcase.teststeps)
+
+            # plans are not kept by runner after the run
+            results = runner.run([self.testcase] * 5)
+            self.assertEqual(plan_cls.call_count, 2)
+
+    def test_run_testcase_validation_failure(self):
+        self.testcase.teststeps[1].validators = [{"eq": ["status_code", 201]}]
+        runner = AsyncHttpRunner(
+            project_meta=self.project_meta, transport=self.transport
+        )
+        result = asyncio.run(runner.run_testcase(self.testcase))
+        self.assertFalse(result.success)
+        step_datas = result.get_step_datas()
+        self.assertEqual(len(step_datas), 1)
+        self.assertEqual(
+            step_datas[0].data.validators["validate_extractor"][0]["check_result"],
+            "pass",
+        )
+
+    def test_run_testcases_with_error(self):
+        error_testcase = loader.load_testcase(
+            {
+                "config": {"name": "error", "base_url": "http://echo.local"},
+                "teststeps": [
+                    {"name": "error", "request": {"method": "GET", "url": "/error"}}
+                ],
+            }
+        )
+        runner = AsyncHttpRunner(
+            project_meta=self.project_meta, transport=self.transport
+        )
+        # error of one testcase does not fail other testcases
+        results = runner.run([self.testcase, error_testcase, self.testcase])
+        self.assertEqual([result.success for result in results], [True, False, True])
+
+    def test_run_testcase_async_with_session(self):
+        async def run():
+            session = AsyncHttpSession(transport=self.transport)
+            return (
+                await HttpRunner()
+                .with_project_meta(self.project_meta)
+                .with_session(session)
+                .run_testcase_async(self.testcase)
+            )
+
+        result = asyncio.run(run())
+        self.assertTrue(result.success)
+        self.assertEqual(
+            json.loads(
+                result.get_step_datas()[0].data.req_resps[0].response.body["body"]
+            ),
+            {"num": 101},
+        )
@@ -0,0 +1,392 @@
+import collections
+import copy
+import importlib.util
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import types
+import unittest
+
+from httprunner import exceptions, loader
+from httprunner.exceptions import ParamsError, ValidationFailure
+from httprunner.ext import locust
+from httprunner.ext.locust.fasthttp import FastHttpRunnerSession
+from httprunner.ext.locust.scheduler import LocustScheduler, build_alias_table
+from httprunner.ext.locust.shape import LoadProfile, Pacer, build_load_stages
+from httprunner.models import ProjectMeta, TLoadShape, TLoadStage
+from httprunner.runner import HttpRunner
+
+TESTCASE_CONTENT = """
+from httprunner import HttpRunner, Config, Step, RunRequest
+from tests.ext import locust_test
+
+locust_test.LOADED_MODULES.append(__name__)
+
+
+class TestCaseDemo(HttpRunner):
+
+    config = Config("demo").locust_weight({weight})
+
+    teststeps = [Step(RunRequest("get").get("/get"))]
+"""
+
+LOADED_MODULES = []
+
+
+class TestLocust(unittest.TestCase):
+    def setUp(self):
+        self.tests_dir = tempfile.mkdtemp()
+        LOADED_MODULES.clear()
+        locust.locust_testcases = None
+        locust.locust_scheduler = None
+        locust.pytest_files = [
+            self.dump("demo1_test.py", weight=2),
+            self.dump("demo2_test.py", weight=3),
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.tests_dir)
+        locust.locust_testcases = None
+        locust.locust_scheduler = None
+        locust.pytest_files = []
+
+    def dump(self, file_name, weight):
+        path = os.path.join(self.tests_dir, file_name)
+        with open(path, "w") as f:
+            f.write(TESTCASE_CONTENT.format(weight=weight))
+        return path
+
+    def test_load_locust_testcases_once(self):
+        testcases = locust.load_locust_testcases()
+        self.assertEqual(len(testcases), 2)
+        self.assertIs(locust.load_locust_testcases(), testcases)
+
+        locust_tests = locust.prepare_locust_tests()
+        self.assertEqual(len(locust_tests), 5)
+        self.assertEqual(locust.prepare_locust_tests(), locust_tests)
+        # pytest files are imported only once
+        self.assertEqual(len(LOADED_MODULES), 2)
+
+    def test_get_locust_scheduler(self):
+        scheduler = locust.get_locust_scheduler()
+        self.assertIs(locust.get_locust_scheduler(), scheduler)
+        testcases = locust.load_locust_testcases()
+        self.assertIn(scheduler.select(), testcases)
+        self.assertEqual(scheduler.items, testcases)
+
+
+class EventHook(object):
+    def __init__(self):
+        self.fired = []
+
+    def fire(self, **kwargs):
+        self.fired.append(kwargs)
+
+
+class TestLocustEvents(unittest.TestCase):
+    def test_fire_request_event(self):
+        events = types.SimpleNamespace(request=EventHook())
+        exception = ValidationFailure("assert failed")
+        locust.fire_request_event(events, "GET", "get user", 12.5, 100, exception)
+        fired = events.request.fired[0]
+        self.assertEqual(fired["name"], "get user")
+        self.assertEqual(fired["response_time"], 12.5)
+        self.assertEqual(fired["response_length"], 100)
+        self.assertIs(fired["exception"], exception)
+
+    def test_fire_request_event_deprecated_hooks(self):
+        # locust < 1.5, success and failure are fired separately
+        events = types.SimpleNamespace(
+            request_success=EventHook(), request_failure=EventHook()
+        )
+        locust.fire_request_event(events, "GET", "get user", 12.5, 100)
+        locust.fire_request_event(
+            events, "GET", "get user", 10, 0, ValidationFailure("assert failed")
+        )
+        self.assertEqual(len(events.request_success.fired), 1)
+        self.assertEqual(len(events.request_failure.fired), 1)
+        self.assertNotIn("exception", events.request_success.fired[0])
+
+
+class FastResponse(object):
+    def __init__(self, status_code, headers, content, error=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.error = error
+
+
+class FakeFastHttpSession(object):
+    """ echo request in response body, like FastHttpSession without network io """
+
+    def __init__(self):
+        self.requests = []
+
+    def request(self, method, path, name=None, data=None, headers=None, **kwargs):
+        self.requests.append((method, path, data, headers, kwargs))
+        if path.endswith("/error"):
+            return FastResponse(0, {}, None, error=ConnectionError("refused"))
+
+        body = {"url": path, "data": data.decode("utf-8") if data else None}
+        headers = {"Content-Type": "application/json", "Set-Cookie": "token=abc"}
+        return FastResponse(200, headers, json.dumps(body).encode("utf-8"))
+
+
+class TestFastHttpRunnerSession(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeFastHttpSession()
+        self.session = FastHttpRunnerSession(self.client, record_level="full")
+
+    def test_request(self):
+        resp = self.session.request(
+            "POST",
+            "http://echo.local/post",
+            params={"a": 1},
+            json={"b": 2},
+            verify=False,
+            timeout=10,
+        )
+        method, path, data, headers, kwargs = self.client.requests[0]
+        self.assertEqual(path, "http://echo.local/post?a=1")
+        self.assertEqual(json.loads(data), {"b": 2})
+        self.assertEqual(headers["Content-Type"], "application/json")
+        # request event is fired by HttpRunner per teststep, not by FastHttpSession
+        self.assertTrue(kwargs["catch_response"])
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["url"], "http://echo.local/post?a=1")
+        self.assertEqual(resp.cookies.get_dict(), {"token": "abc"})
+        self.assertEqual(self.session.data.stat.content_size, len(resp.content))
+
+        req_resps = self.session.record_req_resps(self.session.data, resp)
+        self.assertEqual(req_resps[0].request.body, {"b": 2})
+        self.assertEqual(req_resps[0].response.cookies, {"token": "abc"})
+
+    def test_request_error(self):
+        resp = self.session.request("GET", "http://echo.local/error")
+        self.assertEqual(resp.status_code, 0)
+        self.assertIsInstance(resp.error, ConnectionError)
+        self.assertEqual(resp.content, b"")
+
+    def test_run_testcase(self):
+        testcase = loader.load_testcase(
+            {
+                "config": {"name": "echo", "base_url": "http://echo.local"},
+                "teststeps": [
+                    {
+                        "name": "post form",
+                        "request": {
+                            "method": "POST",
+                            "url": "/post",
+                            "data": {"uid": 100},
+                        },
+                        "extract": {"data": "body.data"},
+                        "validate": [
+                            {"eq": ["status_code", 200]},
+                            {"eq": ["cookies.token", "abc"]},
+                        ],
+                    }
+                ],
+            }
+        )
+        events = []
+        runner = (
+            HttpRunner()
+            .with_project_meta(ProjectMeta())
+            .with_session(self.session)
+            .with_variables({})
+            .with_request_listener(lambda **kwargs: events.append(kwargs))
+        )
+        runner.run_testcase(testcase)
+        step_data = runner.get_step_datas()[0]
+        self.assertTrue(runner.success)
+        self.assertEqual(step_data.export_vars, {"data": "uid=100"})
+        self.assertEqual(step_data.data.req_resps[0].request.body, "uid=100")
+        self.assertEqual(events[0]["name"], "post form")
+        self.assertEqual(
+            events[0]["response_length"], self.session.data.stat.content_size
+        )
+
+
+class TestLocustScheduler(unittest.TestCase):
+    def test_build_alias_table(self):
+        probabilities, aliases = build_alias_table([1, 2, 5])
+        # probability of each index, sum of its own part and aliased parts
+        for index, weight in enumerate([1, 2, 5]):
+            prob = probabilities[index]
+            prob += sum(
+                1 - p
+                for i, (p, a) in enumerate(zip(probabilities, aliases))
+                if a == index and i != index
+            )
+            self.assertAlmostEqual(prob / 3, weight / 8)
+
+    def test_select_random(self):
+        scheduler = LocustScheduler(["a", "b", "c"], weights=[1, 3, 6], seed=1)
+        counter = collections.Counter(scheduler.select() for _ in range(10000))
+        self.assertAlmostEqual(counter["a"] / 10000, 0.1, delta=0.02)
+        self.assertAlmostEqual(counter["b"] / 10000, 0.3, delta=0.02)
+        self.assertAlmostEqual(counter["c"] / 10000, 0.6, delta=0.02)
+
+    def test_select_round_robin(self):
+        scheduler = LocustScheduler(
+            ["a", "b", "c"], weights=[1, 300, 200], round_robin=True
+        )
+        selected = [scheduler.select() for _ in range(501)]
+        # exactly as weights in each cycle
+        self.assertEqual(collections.Counter(selected), {"a": 1, "b": 300, "c": 200})
+        # interleaved, instead of selecting b 300 times in a row
+        self.assertLess(max(len(list(g)) for _, g in itertools.groupby(selected)), 5)
+
+    def test_select_rate_target(self):
+        scheduler = LocustScheduler(
+            ["a", "b", "paced"], weights=[1, 1, 1], rates=[0, 0, 2]
+        )
+        start = scheduler.due_heap[0][0]
+        self.assertEqual(scheduler.select(now=start), "paced")
+        self.assertIn(scheduler.select(now=start + 0.1), ["a", "b"])
+        self.assertEqual(scheduler.select(now=start + 0.5), "paced")
+        self.assertIn(scheduler.select(now=start + 0.6), ["a", "b"])
+
+        scheduler = LocustScheduler(["paced"], weights=[1], rates=[1])
+        start = scheduler.due_heap[0][0]
+        self.assertEqual(scheduler.select(now=start), "paced")
+        self.assertIsNone(scheduler.select(now=start + 0.4))
+        self.assertAlmostEqual(scheduler.seconds_until_due(now=start + 0.4), 0.6)
+
+    def test_is_rate_driven(self):
+        scheduler = LocustScheduler(["paced"], weights=[1], rates=[1])
+        self.assertTrue(scheduler.is_rate_driven())
+
+        scheduler = LocustScheduler(["a", "paced"], weights=[1, 1], rates=[0, 1])
+        self.assertFalse(scheduler.is_rate_driven())
+
+        scheduler = LocustScheduler(["a", "b"], weights=[1, 1])
+        self.assertFalse(scheduler.is_rate_driven())
+
+
+TESTSUITE_CONTENT = {
+    "config": {
+        "name": "demo testsuite",
+        "load_shape": {
+            "type": "step",
+            "duration": 150,
+            "users": 10,
+            "step_users": 10,
+            "step_duration": 60,
+            "rate": 5,
+        },
+    },
+    "testcases": [{"name": "demo", "testcase": "demo_testcase.yml"}],
+}
+
+
+class TestLoadShape(unittest.TestCase):
+    def test_build_ramp_stages(self):
+        load_shape = TLoadShape(
+            stages=[
+                {"duration": 60, "users": 100, "spawn_rate": 10},
+                {"duration": 300, "users": 100, "rate": 50},
+            ]
+        )
+        stages = build_load_stages(load_shape)
+        self.assertEqual([stage.users for stage in stages], [100, 100])
+
+        with self.assertRaises(ParamsError):
+            build_load_stages(TLoadShape(type="ramp"))
+
+    def test_build_constant_rate_stages(self):
+        load_shape = TLoadShape(type="constant_rate", duration=60, users=20, rate=40)
+        stages = build_load_stages(load_shape)
+        self.assertEqual(len(stages), 1)
+        self.assertEqual((stages[0].users, stages[0].rate), (20, 40))
+
+        with self.assertRaises(ParamsError):
+            build_load_stages(TLoadShape(type="constant_rate", duration=60))
+
+    def test_build_spike_stages(self):
+        load_shape = TLoadShape(
+            type="spike",
+            duration=300,
+            users=10,
+            rate=5,
+            spike_users=100,
+            spike_at=120,
+            spike_duration=30,
+        )
+        stages = build_load_stages(load_shape)
+        self.assertEqual([stage.duration for stage in stages], [120, 30, 150])
+        self.assertEqual([stage.users for stage in stages], [10, 100, 10])
+        # spike users are started in one second, and paced in the same interval
+        self.assertEqual(stages[1].spawn_rate, 90)
+        self.assertEqual(stages[1].rate, 50)
+
+    def test_build_step_stages(self):
+        load_shape = TLoadShape(
+            type="step", duration=150, users=10, step_users=10, step_duration=60
+        )
+        stages = build_load_stages(load_shape)
+        self.assertEqual([stage.duration for stage in stages], [60, 60, 30])
+        self.assertEqual([stage.users for stage in stages], [10, 20, 30])
+
+    def test_load_profile(self):
+        profile = LoadProfile(
+            [
+                TLoadStage(duration=60, users=10, spawn_rate=2),
+                TLoadStage(duration=60, users=20, spawn_rate=2, rate=40),
+            ]
+        )
+        self.assertEqual(profile.tick(run_time=0), (10, 2))
+        self.assertEqual(profile.tick(run_time=90), (20, 2))
+        self.assertIsNone(profile.tick(run_time=120))
+
+        self.assertEqual(profile.get_pacing_interval(run_time=30), 0)
+        # 20 users run 40 testcases per second, each user runs every 0.5 seconds
+        self.assertEqual(profile.get_pacing_interval(run_time=90), 0.5)
+
+    def test_pacer(self):
+        pacer = Pacer()
+        start = pacer.next_start_at
+        self.assertAlmostEqual(pacer.wait_time(0.5, now=start + 0.2), 0.3)
+        # slow run is not caught up with burst
+        self.assertEqual(pacer.wait_time(0.5, now=start + 1.8), 0)
+        self.assertAlmostEqual(pacer.wait_time(0.5, now=start + 2.1), 0.2)
+
+    def test_load_locust_load_profile(self):
+        tests_dir = tempfile.mkdtemp()
+        try:
+            testsuite_path = os.path.join(tests_dir, "demo_testsuite.json")
+            with open(testsuite_path, "w") as f:
+                json.dump(TESTSUITE_CONTENT, f)
+
+            profile = locust.load_locust_load_profile(testsuite_path)
+            self.assertEqual(len(profile.stages), 3)
+            self.assertEqual(profile.get_pacing_interval(run_time=0), 2)
+
+            testsuite = copy.deepcopy(TESTSUITE_CONTENT)
+            testsuite["config"]["load_shape"]["type"] = "wave"
+            with open(testsuite_path, "w") as f:
+                json.dump(testsuite, f)
+            with self.assertRaises(exceptions.TestSuiteFormatError):
+                locust.load_locust_load_profile(testsuite_path)
+
+            self.assertIsNone(locust.load_locust_load_profile(tests_dir))
+        finally:
+            shutil.rmtree(tests_dir)
+
+
+@unittest.skipUnless(importlib.util.find_spec("locust"), "locust is not installed")
+class TestLocustfile(unittest.TestCase):
+    def test_import_locustfile(self):
+        self.addCleanup(setattr, locust, "locust_load_profile", None)
+        locustfile = importlib.import_module("httprunner.ext.locust.locustfile")
+        self.assertFalse(hasattr(locustfile, "HttpRunnerLoadShape"))
+
+        # load shape is defined only if declared in testsuite
+        locust.locust_load_profile = LoadProfile(
+            [TLoadStage(duration=10, users=2, spawn_rate=1)]
+        )
+        locustfile = importlib.reload(locustfile)
+        self.assertEqual(locustfile.HttpRunnerLoadShape().tick(), (2, 1))
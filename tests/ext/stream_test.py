@@ -0,0 +1,181 @@
+import io
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
+
+import jmespath
+import requests
+
+from httprunner import HttpRunner
+from httprunner.exceptions import ParamsError
+from httprunner.ext.stream import (
+    STREAM_READY,
+    ensure_stream_ready,
+    get_stream_paths,
+    search_response_stream,
+)
+from httprunner.models import TestCase
+from httprunner.response import ResponseObject
+
+BODY = {
+    "total": 3,
+    "orders": [
+        {"id": 1, "price": 1.5, "tags": ["a"]},
+        {"id": 2, "price": 2.5, "tags": []},
+        {"id": 3, "price": None, "tags": ["b", "c"]},
+    ],
+    "meta": {"page": {"size": 3}, "name": "orders"},
+    "padding": "x" * 1024,
+}
+
+
+class CountingRaw(io.BytesIO):
+    def __init__(self, content: bytes):
+        super(CountingRaw, self).__init__(content)
+        self.read_size = 0
+
+    def read(self, size=-1):
+        data = super(CountingRaw, self).read(size)
+        self.read_size += len(data)
+        return data
+
+
+def make_response(body) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.encoding = "utf-8"
+    resp.raw = CountingRaw(json.dumps(body).encode("utf-8"))
+    return resp
+
+
+@unittest.skipUnless(STREAM_READY, "ijson is not installed")
+class TestStream(unittest.TestCase):
+    def test_get_stream_paths(self):
+        self.assertEqual(
+            get_stream_paths(["status_code", "body.orders[0].id", "abc", 200]), None,
+        )
+        self.assertEqual(
+            get_stream_paths(["status_code", "headers.x", "body.orders[0].id", "abc"]),
+            {"body.orders[0].id": ((False, "orders"), (True, 0), (False, "id"))},
+        )
+        for expr in ["body", "body.orders[-1]", "body.orders[*].id", "$uid"]:
+            self.assertIsNone(get_stream_paths(["body.total", expr]))
+
+    def test_search_response_stream(self):
+        exprs = [
+            "body.total",
+            "body.orders[1].price",
+            "body.orders[2].tags[1]",
+            "body.orders[2].tags[5]",
+            "body.orders[0]",
+            "body.orders[0].tags",
+            "body.orders.id",
+            "body.meta.page.size",
+            "body.meta.name.x",
+            "body.meta.name[0]",
+            "body.missing.x",
+        ]
+        resp_obj = ResponseObject(make_response(BODY))
+        search_response_stream(resp_obj, exprs)
+        self.assertTrue(resp_obj.resp_obj.hrun_body_streamed)
+        for expr in exprs:
+            self.assertEqual(
+                resp_obj._search_jmespath(expr), jmespath.search(expr, {"body": BODY})
+            )
+
+        self.assertEqual(resp_obj._search_jmespath("status_code"), 200)
+        with self.assertRaises(ParamsError):
+            resp_obj._search_jmespath("body.padding")
+
+    def test_search_stops_once_found(self):
+        body = {"total": 3, "padding": "x" * 1024 * 1024}
+        resp_obj = ResponseObject(make_response(body))
+        search_response_stream(resp_obj, ["body.total"])
+        self.assertEqual(resp_obj.stream_values, {"body.total": 3})
+        self.assertLess(resp_obj.resp_obj.raw.read_size, 1024 * 1024)
+
+    def test_search_not_in_stream(self):
+        resp_obj = ResponseObject(make_response(BODY))
+        search_response_stream(resp_obj, ["body.total", "body.orders[-1].id"])
+        self.assertEqual(resp_obj.stream_values, {})
+        self.assertEqual(resp_obj._search_jmespath("body.orders[-1].id"), 3)
+
+        # response has been read
+        resp = make_response(BODY)
+        self.assertEqual(resp.content, json.dumps(BODY).encode("utf-8"))
+        resp_obj = ResponseObject(resp)
+        search_response_stream(resp_obj, ["body.total"])
+        self.assertEqual(resp_obj.stream_values, {})
+        self.assertEqual(resp_obj._search_jmespath("body.total"), 3)
+
+    def test_search_invalid_json(self):
+        resp = make_response(BODY)
+        resp.raw = CountingRaw(b'{"total": 3, "orders": [')
+        resp_obj = ResponseObject(resp)
+        search_response_stream(resp_obj, ["body.orders[0]", "body.total"])
+        self.assertEqual(resp_obj.stream_values, {})
+        self.assertEqual(resp_obj._search_jmespath("status_code"), 200)
+        with self.assertRaisesRegex(ParamsError, "failed to parse response body"):
+            resp_obj._search_jmespath("body.total")
+
+
+class TestStreamReady(unittest.TestCase):
+    def test_ensure_stream_ready(self):
+        with mock.patch("httprunner.ext.stream.STREAM_READY", False):
+            with self.assertRaises(ModuleNotFoundError):
+                ensure_stream_ready()
+
+
+class ExportHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps(BODY).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@unittest.skipUnless(STREAM_READY, "ijson is not installed")
+class TestStreamRunner(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(("127.0.0.1", 0), ExportHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_run_step_in_stream_mode(self):
+        testcase = TestCase.parse_obj(
+            {
+                "config": {"name": "stream", "base_url": self.base_url},
+                "teststeps": [
+                    {
+                        "name": "export orders",
+                        "request": {"method": "GET", "url": "/export", "stream": True},
+                        "extract": {"first_id": "body.orders[0].id"},
+                        "validate": [
+                            {"eq": ["status_code", 200]},
+                            {"eq": ["body.total", 3]},
+                            {"eq": ["body.meta.page.size", 3]},
+                        ],
+                    }
+                ],
+            }
+        )
+        runner = HttpRunner().with_variables({}).run_testcase(testcase)
+        step_data = runner.get_summary().step_datas[0]
+        self.assertTrue(step_data.success)
+        self.assertEqual(step_data.export_vars, {"first_id": 1})
+        self.assertEqual(
+            step_data.data.req_resps[0].response.body, "response body stream (OMITTED)",
+        )
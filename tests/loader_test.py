@@ -69,6 +69,64 @@ class TestLoader(unittest.TestCase):
             ],
         )
 
+    def test_load_csv_file_cached(self):
+        csv_file_path = os.path.join(os.getcwd(), "tmp_cached.csv")
+        with open(csv_file_path, "w") as f:
+            f.write("username,password\ntest1,111111\n\ntest2\n")
+
+        try:
+            csv_content = loader.load_csv_file(csv_file_path)
+            self.assertEqual(
+                csv_content,
+                [
+                    {"username": "test1", "password": "111111"},
+                    {"username": "test2", "password": None},
+                ],
+            )
+            self.assertIs(loader.load_csv_file(csv_file_path), csv_content)
+            self.assertEqual(csv_content[-1], {"username": "test2", "password": None})
+            self.assertEqual(
+                csv_content.select(["password"]),
+                [{"password": "111111"}, {"password": None}],
+            )
+            with self.assertRaises(exceptions.ParamsError):
+                csv_content.select(["age"])
+
+            # reloaded once csv file is modified
+            with open(csv_file_path, "a") as f:
+                f.write("test3,333333\n")
+            csv_content = loader.load_csv_file(csv_file_path)
+            self.assertEqual(len(csv_content), 3)
+            self.assertEqual(
+                csv_content[2], {"username": "test3", "password": "333333"}
+            )
+        finally:
+            os.remove(csv_file_path)
+
+    def test_load_csv_file_stream(self):
+        csv_file_path = os.path.join(os.getcwd(), "examples/httpbin/account.csv")
+        csv_stream = loader.load_csv_file(csv_file_path, stream=True)
+        self.assertIsInstance(csv_stream, loader.CSVStream)
+        self.assertEqual(list(csv_stream), loader.load_csv_file(csv_file_path))
+        # re-iterable
+        self.assertEqual(
+            list(csv_stream.select(["username"])),
+            [{"username": "test1"}, {"username": "test2"}, {"username": "test3"}],
+        )
+
+        # stream flag from ${parameterize(account.csv, true)} is passed as string
+        for flag in ["true", "TRUE", " True "]:
+            self.assertIsInstance(
+                loader.load_csv_file(csv_file_path, stream=flag), loader.CSVStream
+            )
+        for flag in ["false", "False", False]:
+            self.assertIsInstance(
+                loader.load_csv_file(csv_file_path, stream=flag), loader.CSVParameters
+            )
+        for flag in ["yes", "1", 1, None]:
+            with self.assertRaises(exceptions.ParamsError):
+                loader.load_csv_file(csv_file_path, stream=flag)
+
     def test_load_folder_files(self):
         folder = os.path.join(os.getcwd(), "examples")
         file1 = os.path.join(os.getcwd(), "examples", "test_utils.py")
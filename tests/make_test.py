@@ -1,7 +1,10 @@
+import json
 import os
+import tempfile
 import unittest
+from unittest import mock
 
-from httprunner import loader
+from httprunner import loader, make
 from httprunner.make import (
     main_make,
     convert_testcase_path,
@@ -9,7 +12,15 @@ from httprunner.make import (
     make_config_chain_style,
     make_teststep_chain_style,
     pytest_files_run_set,
+    pytest_files_deps_mapping,
+    pytest_files_refs_mapping,
+    pytest_files_written_set,
+    pytest_files_reused_set,
     ensure_file_abs_path_valid,
+    format_pytest_content,
+    format_pytest_with_black,
+    find_black_pyproject,
+    load_black_mode,
 )
 
 
@@ -17,6 +28,10 @@ class TestMake(unittest.TestCase):
     def setUp(self) -> None:
         pytest_files_made_cache_mapping.clear()
         pytest_files_run_set.clear()
+        pytest_files_deps_mapping.clear()
+        pytest_files_refs_mapping.clear()
+        pytest_files_written_set.clear()
+        pytest_files_reused_set.clear()
         loader.project_meta = None
 
     def test_make_testcase(self):
@@ -189,6 +204,19 @@ from request_methods.request_with_functions_test import (
             """Config("request methods testcase: validate with functions").variables(**{'foo1': 'bar1', 'foo2': 22}).base_url("https://postman_echo.com").verify(False)""",
         )
 
+    def test_make_config_chain_style_options(self):
+        config = {
+            "name": "connection pool",
+            "variables": {},
+            "connection_pool": {"pool_maxsize": 100, "keep_alive": False},
+            "weight": 3,
+            "rate": 0.5,
+        }
+        self.assertEqual(
+            make_config_chain_style(config),
+            """Config("connection pool").locust_weight(3).locust_rate(0.5).connection_pool(**{'pool_maxsize': 100, 'keep_alive': False})""",
+        )
+
     def test_make_teststep_chain_style(self):
         step = {
             "name": "get with params",
@@ -246,3 +274,244 @@ from request_methods.request_with_functions_test import (
             teststep_chain_style,
             """Step(RunRequest("get with params").with_variables(**{'foo1': 'bar1', 'foo2': 123, 'sum_v': '${sum_two(1, 2)}', 'myjson': {'name': 'user', 'password': '123456'}}).get("/get").with_params(**{'foo1': '$foo1', 'foo2': '$foo2', 'sum_v': '$sum_v'}).with_headers(**{'User-Agent': 'HttpRunner/${get_httprunner_version()}'}).with_json("$myjson").extract().with_jmespath('body.args.foo1', 'session_foo1').with_jmespath('body.args.foo2', 'session_foo2').validate().assert_equal("status_code", 200).assert_equal("body.args.sum_v", "3"))""",
         )
+
+    def test_make_with_cache(self):
+        # do not leave project meta of temporary project to other tests
+        self.addCleanup(setattr, loader, "project_meta", None)
+        with tempfile.TemporaryDirectory() as project_dir:
+            with open(os.path.join(project_dir, "debugtalk.py"), "w") as f:
+                f.write("")
+
+            ref_path = os.path.join(project_dir, "ref.json")
+            with open(ref_path, "w") as f:
+                json.dump(
+                    {
+                        "config": {"name": "ref"},
+                        "teststeps": [
+                            {"name": "get", "request": {"method": "GET", "url": "/"}}
+                        ],
+                    },
+                    f,
+                )
+
+            case_path = os.path.join(project_dir, "case.json")
+            with open(case_path, "w") as f:
+                json.dump(
+                    {
+                        "config": {"name": "case"},
+                        "teststeps": [{"name": "ref", "testcase": "ref.json"}],
+                    },
+                    f,
+                )
+
+            case_pytest_path = os.path.join(project_dir, "case_test.py")
+            ref_pytest_path = os.path.join(project_dir, "ref_test.py")
+
+            self.assertEqual(main_make([case_path]), [case_pytest_path])
+            self.assertEqual(
+                pytest_files_written_set, {case_pytest_path, ref_pytest_path}
+            )
+            self.assertTrue(
+                os.path.isfile(os.path.join(project_dir, ".hrun_cache", "make.json"))
+            )
+
+            # unchanged, reuse made pytest files
+            self.setUp()
+            self.assertEqual(main_make([case_path]), [case_pytest_path])
+            self.assertEqual(pytest_files_written_set, set())
+            self.assertEqual(
+                pytest_files_reused_set, {case_pytest_path, ref_pytest_path}
+            )
+
+            # referenced testcase changed, remake
+            with open(ref_path, "a") as f:
+                f.write("\n")
+            self.setUp()
+            main_make([case_path])
+            self.assertEqual(
+                pytest_files_written_set, {case_pytest_path, ref_pytest_path}
+            )
+
+            # written and reused files are counted in each making
+            self.assertEqual(main_make([case_path]), [case_pytest_path])
+            self.assertEqual(pytest_files_written_set, set())
+            self.assertEqual(
+                pytest_files_reused_set, {case_pytest_path, ref_pytest_path}
+            )
+
+            # force remake
+            self.setUp()
+            main_make([case_path], force=True)
+            self.assertEqual(
+                pytest_files_written_set, {case_pytest_path, ref_pytest_path}
+            )
+
+    def test_make_in_parallel(self):
+        self.addCleanup(setattr, loader, "project_meta", None)
+        with tempfile.TemporaryDirectory() as project_dir:
+            with open(os.path.join(project_dir, "debugtalk.py"), "w") as f:
+                f.write("")
+
+            tests_content = {
+                "ref.json": {
+                    "config": {"name": "ref"},
+                    "teststeps": [
+                        {"name": "get", "request": {"method": "GET", "url": "/"}}
+                    ],
+                },
+                "case1.json": {
+                    "config": {"name": "case1"},
+                    "teststeps": [{"name": "ref", "testcase": "ref.json"}],
+                },
+                "case2.json": {
+                    "config": {"name": "case2"},
+                    "teststeps": [{"name": "ref", "testcase": "ref.json"}],
+                },
+            }
+            for file_name, test_content in tests_content.items():
+                with open(os.path.join(project_dir, file_name), "w") as f:
+                    json.dump(test_content, f)
+
+            def make_and_read(workers):
+                self.setUp()
+                testcase_python_list = main_make(
+                    [project_dir], force=True, workers=workers
+                )
+                pytest_files_content = {}
+                for path in pytest_files_written_set:
+                    with open(path, encoding="utf-8") as f:
+                        pytest_files_content[path] = f.read()
+                return testcase_python_list, pytest_files_content
+
+            sequential_made = make_and_read(1)
+            parallel_made = make_and_read(2)
+            self.assertEqual(len(sequential_made[0]), 3)
+            self.assertEqual(len(sequential_made[1]), 3)
+            self.assertEqual(sequential_made, parallel_made)
+
+    def test_format_pytest_content(self):
+        self.assertEqual(
+            format_pytest_content("x = {  'a':37,'b':42,\n'c':927}\n"),
+            'x = {"a": 37, "b": 42, "c": 927}\n',
+        )
+        # invalid content is kept unformatted
+        self.assertEqual(format_pytest_content("x = {"), "x = {")
+
+    def test_format_pytest_with_black(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            python_path = os.path.join(temp_dir, "demo_test.py")
+            with open(python_path, "w", encoding="utf-8") as f:
+                f.write("x = {  'a':37,'b':42,\n'c':927}\n")
+
+            format_pytest_with_black(python_path)
+            with open(python_path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), 'x = {"a": 37, "b": 42, "c": 927}\n')
+
+    def test_format_pytest_with_black_settings(self):
+        content = "x = {'a': 37, 'b': 42, 'c': 927}\n"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            python_path = os.path.join(temp_dir, "demo_test.py")
+            with open(python_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            with open(os.path.join(temp_dir, "pyproject.toml"), "w") as f:
+                f.write(
+                    "[tool.black]\n"
+                    "line-length = 30\n"
+                    "skip-string-normalization = true\n"
+                    "target-version = ['py36']\n"
+                )
+
+            black_mode = load_black_mode(find_black_pyproject(python_path))
+            self.assertEqual(black_mode.line_length, 30)
+            self.assertFalse(black_mode.string_normalization)
+
+            format_pytest_with_black(python_path)
+            with open(python_path, encoding="utf-8") as f:
+                self.assertEqual(
+                    f.read(), "x = {\n    'a': 37,\n    'b': 42,\n    'c': 927,\n}\n"
+                )
+
+        # default black mode without pyproject.toml
+        self.assertEqual(
+            format_pytest_content(content, load_black_mode(None)),
+            'x = {"a": 37, "b": 42, "c": 927}\n',
+        )
+
+    def test_make_invalid_testcases(self):
+        self.addCleanup(setattr, loader, "project_meta", None)
+        with tempfile.TemporaryDirectory() as project_dir:
+            with open(os.path.join(project_dir, "debugtalk.py"), "w") as f:
+                f.write("")
+
+            tests_content = {
+                "bad.json": {
+                    "config": {"name": "bad"},
+                    "teststeps": [{"name": "neither request nor testcase"}],
+                },
+                "case1.json": {
+                    "config": {"name": "case1"},
+                    "teststeps": [{"name": "ref", "testcase": "bad.json"}],
+                },
+                "case2.json": {
+                    "config": {"name": "case2"},
+                    "teststeps": [{"name": "ref", "testcase": "bad.json"}],
+                },
+                "suite.json": {
+                    "config": {"name": "suite"},
+                    "testcases": [{"name": "bad case", "testcase": "bad.json"}],
+                },
+            }
+            for file_name, test_content in tests_content.items():
+                with open(os.path.join(project_dir, file_name), "w") as f:
+                    json.dump(test_content, f)
+
+            # invalid testcases are skipped, failed referenced testcase is made once
+            bad_path = os.path.join(project_dir, "bad.json")
+            with mock.patch.object(
+                make, "make_testcase", wraps=make.make_testcase
+            ) as make_testcase:
+                self.assertEqual(
+                    main_make(
+                        [
+                            os.path.join(project_dir, "case1.json"),
+                            os.path.join(project_dir, "case2.json"),
+                        ]
+                    ),
+                    [],
+                )
+            made_paths = [
+                call[0][0]["config"]["path"] for call in make_testcase.call_args_list
+            ]
+            self.assertEqual(made_paths.count(bad_path), 1)
+
+            # invalid testcase in testsuite fails making
+            self.setUp()
+            with self.assertRaises(SystemExit):
+                main_make([os.path.join(project_dir, "suite.json")])
+
+    def test_make_in_current_process_by_default(self):
+        self.addCleanup(setattr, loader, "project_meta", None)
+        with tempfile.TemporaryDirectory() as project_dir:
+            with open(os.path.join(project_dir, "debugtalk.py"), "w") as f:
+                f.write("")
+
+            for name in ["case1", "case2", "case3"]:
+                with open(os.path.join(project_dir, f"{name}.json"), "w") as f:
+                    json.dump(
+                        {
+                            "config": {"name": name},
+                            "teststeps": [
+                                {
+                                    "name": "get",
+                                    "request": {"method": "GET", "url": "/"},
+                                }
+                            ],
+                        },
+                        f,
+                    )
+
+            # process pool is not started for a few testcases without --workers
+            with mock.patch.object(make, "ProcessPoolExecutor") as executor:
+                with mock.patch.object(make.os, "cpu_count", return_value=8):
+                    self.assertEqual(len(main_make([project_dir])), 3)
+            executor.assert_not_called()
@@ -0,0 +1,98 @@
+import time
+import unittest
+
+from httprunner import HttpRunner, memoize
+from httprunner.memoization import enter_testcase_scope, exit_testcase_scope
+from httprunner.models import ProjectMeta, TestCase
+
+
+class TestMemoize(unittest.TestCase):
+    def setUp(self) -> None:
+        self.calls = []
+
+    def record_call(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        return len(self.calls)
+
+    def test_memoize_session_scope(self):
+        get_num = memoize(self.record_call)
+        self.assertEqual(get_num(1), 1)
+        self.assertEqual(get_num(1), 1)
+        self.assertEqual(get_num(2), 2)
+        self.assertEqual(get_num(1, a=1, b=2), 3)
+        self.assertEqual(get_num(1, b=2, a=1), 3)
+        self.assertEqual(len(self.calls), 3)
+        self.assertEqual(get_num.cache_info().hits, 2)
+        self.assertEqual(get_num.cache_info().misses, 3)
+
+        # unhashable arguments are not cached
+        self.assertEqual(get_num([1]), 4)
+        self.assertEqual(get_num([1]), 5)
+
+        get_num.cache_clear()
+        self.assertEqual(get_num(1), 6)
+        self.assertEqual(get_num.cache_info().misses, 1)
+
+    def test_memoize_testcase_scope(self):
+        get_num = memoize(scope="testcase")(self.record_call)
+
+        # out of testcase run
+        self.assertEqual(get_num(1), 1)
+        self.assertEqual(get_num(1), 2)
+
+        for _ in range(2):
+            token = enter_testcase_scope()
+            self.assertEqual(get_num(1), get_num(1))
+            stats = exit_testcase_scope(token)
+            self.assertEqual(stats["record_call"].hits, 1)
+            self.assertEqual(stats["record_call"].misses, 1)
+
+        self.assertEqual(len(self.calls), 4)
+
+    def test_memoize_ttl_and_maxsize(self):
+        get_num = memoize(ttl=0.05, maxsize=2)(self.record_call)
+        self.assertEqual(get_num(1), 1)
+        self.assertEqual(get_num(1), 1)
+        time.sleep(0.06)
+        self.assertEqual(get_num(1), 2)
+
+        get_num(2)
+        get_num(3)
+        # least recently used entry is evicted
+        self.assertEqual(get_num(3), 4)
+        self.assertEqual(get_num(1), 5)
+
+    def test_memoize_copy(self):
+        @memoize
+        def get_headers():
+            return {"User-Agent": "HttpRunner"}
+
+        # returned headers are modified in run, e.g. request id is added
+        headers = get_headers()
+        headers.setdefault("HRUN-Request-ID", "HRUN-1")
+        self.assertEqual(get_headers(), {"User-Agent": "HttpRunner"})
+        self.assertEqual(get_headers.cache_info().hits, 1)
+
+        get_headers_shared = memoize(copy=False)(get_headers.__wrapped__)
+        self.assertIs(get_headers_shared(), get_headers_shared())
+
+    def test_memoize_stats_in_summary(self):
+        get_num = memoize(self.record_call)
+        testcase = TestCase.parse_obj(
+            {
+                "config": {
+                    "name": "memoize",
+                    "variables": {"a": "${get_num(1)}", "b": "${get_num(1)}"},
+                },
+                "teststeps": [],
+            }
+        )
+        project_meta = ProjectMeta(functions={"get_num": get_num})
+
+        for expect_hits in [1, 2]:
+            runner = HttpRunner().with_project_meta(project_meta).with_variables({})
+            summary = runner.run_testcase(testcase).get_summary()
+            self.assertEqual(summary.in_out.config_vars, {"a": 1, "b": 1})
+            self.assertEqual(summary.memoize_stats["record_call"].hits, expect_hits)
+
+        self.assertEqual(len(self.calls), 1)
@@ -1,10 +1,12 @@
 import os
 import time
+import timeit
 import unittest
 
-from httprunner import parser
+from httprunner import loader, parser, utils
 from httprunner.exceptions import VariableNotFound, FunctionNotFound
 from httprunner.loader import load_project_meta
+from httprunner.models import ProjectMeta
 
 
 class TestParserBasic(unittest.TestCase):
@@ -20,6 +22,52 @@ class TestParserBasic(unittest.TestCase):
         with self.assertRaises(VariableNotFound):
             parser.parse_variables_mapping(variables)
 
+    def test_parse_variables_mapping_circular_reference(self):
+        variables = {"varA": "$varB", "varB": "${sum_two($varC, 1)}", "varC": "$varA"}
+        with self.assertRaises(VariableNotFound) as cm:
+            parser.parse_variables_mapping(variables, {"sum_two": lambda a, b: a + b})
+
+        self.assertIn("varA -> varB -> varC -> varA", str(cm.exception))
+
+        with self.assertRaises(VariableNotFound):
+            parser.parse_variables_mapping({"token": "abc$token"})
+
+    def test_parse_variables_mapping_evaluate_once(self):
+        calls = []
+
+        def get_value(name):
+            calls.append(name)
+            return name
+
+        variables = {
+            "var_1": "$var_2-$var_3",
+            "var_2": "${get_value(b)}/$var_3",
+            "var_3": "${get_value(c)}",
+            "var_4": 4,
+        }
+        parsed_variables = parser.parse_variables_mapping(
+            variables, {"get_value": get_value}
+        )
+        self.assertEqual(calls, ["c", "b"])
+        self.assertEqual(
+            parsed_variables,
+            {"var_1": "b/c-c", "var_2": "b/c", "var_3": "c", "var_4": 4},
+        )
+        # variables order in mapping is kept
+        self.assertEqual(list(parsed_variables.keys()), list(variables.keys()))
+
+    def test_parse_variables_mapping_graph_cache(self):
+        parser.sort_variables_graph.cache_clear()
+        for index in range(3):
+            parsed_variables = parser.parse_variables_mapping(
+                {"varA": "$varB/1", "varB": index}
+            )
+            self.assertEqual(parsed_variables["varA"], f"{index}/1")
+
+        cache_info = parser.sort_variables_graph.cache_info()
+        self.assertEqual(cache_info.misses, 1)
+        self.assertEqual(cache_info.hits, 2)
+
     def test_parse_string_value(self):
         self.assertEqual(parser.parse_string_value("123"), 123)
         self.assertEqual(parser.parse_string_value("12.3"), 12.3)
@@ -336,6 +384,107 @@ class TestParserBasic(unittest.TestCase):
         )
         self.assertEqual(value, "ABCabc123abc--abc123abc")
 
+    def test_compile_string(self):
+        compiled = parser.compile_string("/api/$$${add($a, b=2)}?uid=${uid}")
+        self.assertEqual(
+            [node_type for node_type, _ in compiled.nodes],
+            ["literal", "function", "literal", "variable"],
+        )
+        self.assertEqual(compiled.nodes[0], ("literal", "/api/$"))
+        self.assertFalse(compiled.is_single_node)
+
+        self.assertTrue(parser.compile_string("${add(1, 2)}").is_single_node)
+        self.assertTrue(parser.compile_string("$uid").is_single_node)
+        self.assertFalse(parser.compile_string("$$uid").is_single_node)
+
+    def test_compile_string_cache(self):
+        parser.compile_string.cache_clear()
+        functions_mapping = {"add": lambda a, b: a + b}
+        for index in range(3):
+            value = parser.parse_data(
+                "/api/${add($a, $b)}/$a", {"a": index, "b": 1}, functions_mapping
+            )
+            self.assertEqual(value, f"/api/{index + 1}/{index}")
+
+        cache_info = parser.compile_string.cache_info()
+        # outer string and the two function arguments are compiled only once,
+        # compiled arguments are kept in outer compiled string
+        self.assertEqual(cache_info.misses, 3)
+        self.assertEqual(cache_info.hits, 2)
+
+        # string without $ notation is not compiled
+        self.assertEqual(parser.parse_data("/api/users", {}), "/api/users")
+        self.assertEqual(parser.compile_string.cache_info().currsize, 3)
+
+    def test_get_mapping_function(self):
+        self.addCleanup(setattr, loader, "project_meta", None)
+        self.addCleanup(loader.reset_functions_table)
+
+        # HttpRunner builtin, special functions and Python builtins
+        self.assertIs(
+            parser.get_mapping_function("gen_random_string", {}),
+            loader.load_builtin_functions()["gen_random_string"],
+        )
+        self.assertIs(parser.get_mapping_function("P", {}), loader.load_csv_file)
+        self.assertIs(parser.get_mapping_function("len", {}), len)
+        with self.assertRaises(FunctionNotFound):
+            parser.get_mapping_function("not_exist", {})
+
+        # functions mapping takes precedence over builtin functions
+        def gen_random_string(str_len):
+            return "a" * str_len
+
+        self.assertIs(
+            parser.get_mapping_function(
+                "gen_random_string", {"gen_random_string": gen_random_string}
+            ),
+            gen_random_string,
+        )
+
+        # project functions are merged in table, which is reset when project reloaded
+        loader.project_meta = ProjectMeta(functions={"len": gen_random_string})
+        functions_mapping = loader.project_meta.functions
+        self.assertIs(
+            parser.get_mapping_function("len", functions_mapping), gen_random_string
+        )
+        self.assertIs(
+            loader.load_functions_table(functions_mapping),
+            loader.load_functions_table(functions_mapping),
+        )
+        functions_mapping["sum_two"] = sum
+        self.assertIs(parser.get_mapping_function("sum_two", functions_mapping), sum)
+        # project table is rebuilt if mapping is replaced, or reset explicitly
+        functions_mapping["sum_two"] = max
+        loader.reset_functions_table()
+        self.assertIs(parser.get_mapping_function("sum_two", functions_mapping), max)
+        loader.project_meta.functions = {"len": gen_random_string, "sum_two": min}
+        functions_mapping = loader.project_meta.functions
+        self.assertIs(parser.get_mapping_function("sum_two", functions_mapping), min)
+
+        load_project_meta("", reload=True)
+        functions_mapping = loader.project_meta.functions
+        self.assertIs(parser.get_mapping_function("len", functions_mapping), len)
+
+    def test_get_mapping_function_cost(self):
+        self.addCleanup(setattr, loader, "project_meta", None)
+        self.addCleanup(loader.reset_functions_table)
+
+        def lookup_cost(functions_count: int) -> float:
+            functions = {f"func_{index}": len for index in range(functions_count)}
+            loader.project_meta = ProjectMeta(functions=functions)
+            functions_mapping = loader.project_meta.functions
+            parser.get_mapping_function("func_0", functions_mapping)
+            return min(
+                timeit.repeat(
+                    lambda: parser.get_mapping_function("func_0", functions_mapping),
+                    number=2000,
+                    repeat=5,
+                )
+            )
+
+        # lookup cost does not grow with count of project functions
+        self.assertLess(lookup_cost(2000), lookup_cost(10) * 3)
+
     def test_parse_data_func_abnormal(self):
         variables_mapping = {
             "var_1": "abc",
@@ -471,6 +620,7 @@ class TestParserBasic(unittest.TestCase):
             ),
         )
         parsed_params = parser.parse_parameters(parameters)
+        self.assertIsInstance(parsed_params, list)
         self.assertEqual(len(parsed_params), 2 * 3 * 2)
 
         self.assertIn(
@@ -545,3 +695,24 @@ class TestParserBasic(unittest.TestCase):
             },
             parsed_params,
         )
+
+    def test_parse_parameters_csv_stream(self):
+        parameters = {
+            "username-password": "${parameterize(request_methods/account.csv, true)}",
+            "user_agent": ["iOS/10.1", "iOS/10.2"],
+        }
+        load_project_meta(
+            os.path.join(
+                os.path.dirname(os.path.dirname(__file__)),
+                "examples",
+                "postman_echo",
+                "request_methods",
+            ),
+        )
+        parsed_params = parser.parse_parameters_lazy(parameters)
+        self.assertIsInstance(parsed_params, utils.StreamCartesianProduct)
+        parameters["username-password"] = "${parameterize(request_methods/account.csv)}"
+        self.assertIsInstance(
+            parser.parse_parameters_lazy(parameters), utils.CartesianProduct
+        )
+        self.assertEqual(list(parsed_params), parser.parse_parameters(parameters))
@@ -0,0 +1,79 @@
+import unittest
+
+from httprunner import plan
+from httprunner.loader import load_testcase
+from httprunner.models import TStep
+
+
+class TestPlan(unittest.TestCase):
+    def setUp(self) -> None:
+        self.testcase = load_testcase(
+            {
+                "config": {"name": "demo plan", "variables": {"uid": 1000}},
+                "teststeps": [
+                    {
+                        "name": "get user",
+                        "variables": {"token": "abc"},
+                        "request": {
+                            "method": "GET",
+                            "url": "/api/users/$uid",
+                            "headers": {"Accept": "application/json"},
+                            "params": {"token": "$token"},
+                        },
+                        "validate": [
+                            {"eq": ["status_code", 200]},
+                            {"check": "body.uid", "comparator": "gt", "expect": 0},
+                        ],
+                    },
+                    {"name": "ref testcase", "testcase": "path/to/ref.yml"},
+                ],
+            }
+        )
+
+    def test_step_plan_request(self):
+        step_plan = plan.StepPlan(self.testcase.teststeps[0])
+        self.assertFalse(step_plan.request.is_static)
+
+        static_fields = step_plan.get_static_request_fields()
+        self.assertIn("method", static_fields)
+        self.assertIn("headers", static_fields)
+        self.assertNotIn("url", static_fields)
+        self.assertNotIn("params", static_fields)
+
+        request_dict = step_plan.request.render({"uid": 1000, "token": "abc"})
+        self.assertEqual(request_dict["url"], "/api/users/1000")
+        self.assertEqual(request_dict["params"], {"token": "abc"})
+        self.assertEqual(request_dict["headers"], {"Accept": "application/json"})
+
+        # rendered request can be modified without affecting plan
+        request_dict["headers"]["HRUN-Request-ID"] = "123"
+        request_dict = step_plan.request.render({"uid": 1001, "token": "abc"})
+        self.assertEqual(request_dict["url"], "/api/users/1001")
+        self.assertEqual(request_dict["headers"], {"Accept": "application/json"})
+
+    def test_step_plan_validators(self):
+        step_plan = plan.StepPlan(self.testcase.teststeps[0])
+        self.assertEqual(
+            [
+                (v.check, v.assert_method, v.expect, v.assert_func.__name__)
+                for v in step_plan.validators
+            ],
+            [
+                ("status_code", "equal", 200, "equal"),
+                ("body.uid", "greater_than", 0, "greater_than"),
+            ],
+        )
+
+        # invalid validators are kept and reported when validating
+        step = TStep(name="invalid", validate=[{"eq": ["status_code"]}])
+        self.assertEqual(plan.StepPlan(step).validators, [{"eq": ["status_code"]}])
+
+    def test_testcase_plan(self):
+        testcase_plan = plan.TestCasePlan(self.testcase.teststeps)
+        self.assertEqual(len(testcase_plan.steps), 2)
+        self.assertIsNone(testcase_plan.steps[1].request)
+        self.assertEqual(testcase_plan.steps[1].get_static_request_fields(), [])
+
+        # step variables are snapshotted
+        testcase_plan.steps[0].variables["token"] = "changed"
+        self.assertEqual(self.testcase.teststeps[0].variables, {"token": "abc"})
@@ -1,8 +1,17 @@
+import json
 import unittest
 
+import jmespath
 import requests
 
-from httprunner.response import ResponseObject
+from httprunner.exceptions import ValidationFailure
+from httprunner.response import (
+    ResponseObject,
+    compile_jmespath,
+    compile_validators,
+    FieldPathExpression,
+)
+from httprunner.utils import load_response_json
 
 
 class TestResponse(unittest.TestCase):
@@ -53,3 +62,138 @@ class TestResponse(unittest.TestCase):
             variables_mapping=variables_mapping,
             functions_mapping=functions_mapping,
         )
+
+
+class TestResponseJmespath(unittest.TestCase):
+    def setUp(self) -> None:
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.encoding = "utf-8"
+        resp._content = json.dumps(
+            {"locations": [{"name": "Seattle"}, {"name": "New York"}]}
+        ).encode("utf-8")
+        self.resp_obj = ResponseObject(resp)
+
+    def test_compile_jmespath_cached(self):
+        self.assertIs(
+            compile_jmespath("body.locations[0].name"),
+            compile_jmespath("body.locations[0].name"),
+        )
+
+    def test_search_with_meta_built_once(self):
+        self.assertEqual(self.resp_obj._search_jmespath("status_code"), 200)
+        resp_obj_meta = self.resp_obj.resp_obj_meta
+        self.assertEqual(
+            self.resp_obj._search_jmespath("body.locations[1].name"), "New York"
+        )
+        self.assertIs(self.resp_obj.resp_obj_meta, resp_obj_meta)
+        # not response field, return expression itself
+        self.assertEqual(self.resp_obj._search_jmespath("abc"), "abc")
+
+    def test_copy_body(self):
+        resp_obj = ResponseObject(self.resp_obj.resp_obj, copy_body=True)
+        resp_obj.json["locations"][0]["name"] = "Bellevue"
+        self.assertEqual(
+            resp_obj._search_jmespath("body.locations[0].name"), "Bellevue"
+        )
+        # decoded body shared with request & response recording is kept
+        self.assertEqual(
+            load_response_json(resp_obj.resp_obj)["locations"][0]["name"], "Seattle"
+        )
+
+    def test_compile_field_path(self):
+        data = {"body": {"a": [{"b": 1}, [1, 2]], "s": "str", "n": None}}
+        for expr in [
+            "body.a[0].b",
+            "body.a[-1][1]",
+            "body.a[5]",
+            "body.s.x",
+            "body.s[0]",
+            "body.n.x",
+            "body.a.b",
+        ]:
+            compiled = compile_jmespath(expr)
+            self.assertIsInstance(compiled, FieldPathExpression)
+            self.assertEqual(compiled.search(data), jmespath.search(expr, data))
+
+        for expr in ["body.a[*].b", "length(body.a)", "body.a[0:1]"]:
+            compiled = compile_jmespath(expr)
+            self.assertNotIsInstance(compiled, FieldPathExpression)
+            self.assertEqual(compiled.search(data), jmespath.search(expr, data))
+
+
+class TestResponseValidators(unittest.TestCase):
+    def setUp(self) -> None:
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.encoding = "utf-8"
+        resp._content = json.dumps(
+            {"locations": [{"name": "Seattle"}, {"name": "New York"}]}
+        ).encode("utf-8")
+        self.resp_obj = ResponseObject(resp)
+
+    def test_validate_compiled_validators(self):
+        validators = compile_validators(
+            [
+                {"eq": ["status_code", 200]},
+                {"eq": ["body.locations[$index].name", "$name"]},
+                {"len_eq": ["body.locations", 2, "count $name"]},
+            ]
+        )
+        self.assertIsNone(validators[0].compiled_check)
+        self.assertTrue(validators[0].compiled_expect.is_static)
+        self.assertFalse(validators[1].compiled_expect.is_static)
+        # compiled validators are kept
+        self.assertIs(compile_validators(validators)[0], validators[0])
+
+        for index, name in enumerate(["Seattle", "New York"]):
+            self.resp_obj.validate(validators, {"index": index, "name": name})
+            results = self.resp_obj.validation_results["validate_extractor"]
+            self.assertEqual(results[1]["check"], f"body.locations[{index}].name")
+            self.assertEqual(results[1]["expect"], "$name")
+            self.assertEqual(results[1]["expect_value"], name)
+            self.assertEqual(results[2]["message"], f"count {name}")
+
+        with self.assertRaises(ValidationFailure):
+            self.resp_obj.validate(validators, {"index": 0, "name": "Olympia"})
+
+        results = self.resp_obj.validation_results["validate_extractor"]
+        self.assertEqual(
+            [result["check_result"] for result in results], ["pass", "fail", "pass"]
+        )
+
+    def test_validate_custom_comparator(self):
+        validators = compile_validators(
+            [{"equal": ["status_code", 201]}, {"is_ok": ["status_code", 200]}]
+        )
+        self.assertIsNotNone(validators[0].assert_func)
+        self.assertIsNone(validators[1].assert_func)
+
+        # comparator in functions mapping takes precedence over builtin comparator
+        functions_mapping = {
+            "equal": lambda check_value, expect_value, message: None,
+            "is_ok": lambda check_value, expect_value, message: None,
+        }
+        self.resp_obj.validate(validators, functions_mapping=functions_mapping)
+
+        with self.assertRaises(ValidationFailure):
+            self.resp_obj.validate(validators[:1])
+
+    def test_validate_v2_format_validators(self):
+        # v2 format1 validators, comparator in `assert` key without message
+        validators = compile_validators(
+            [
+                {"check": "status_code", "assert": "eq", "expect": 200},
+                {"check": "body.locations", "assert": "len_eq", "expect": 2},
+            ]
+        )
+        self.assertEqual(validators[0].assert_method, "equal")
+        self.assertEqual(validators[1].assert_method, "length_equal")
+        self.resp_obj.validate(validators)
+
+        with self.assertRaises(ValidationFailure):
+            self.resp_obj.validate(
+                compile_validators(
+                    [{"check": "status_code", "assert": "eq", "expect": 201}]
+                )
+            )
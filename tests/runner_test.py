@@ -1,11 +1,33 @@
+import json
 import os
 import unittest
 
-from httprunner import loader
+from requests import Response
+from requests.adapters import BaseAdapter
+
+from httprunner import loader, memoization
 from httprunner.cli import main_run
+from httprunner.client import HttpSession
+from httprunner.exceptions import ValidationFailure
+from httprunner.models import ProjectMeta
 from httprunner.runner import HttpRunner
 
 
+class EchoAdapter(BaseAdapter):
+    """ echo request url in response body, without network io """
+
+    def send(self, request, **kwargs):
+        resp = Response()
+        resp.status_code = 200
+        resp._content = json.dumps({"url": request.url}).encode("utf-8")
+        resp.request = request
+        resp.url = request.url
+        return resp
+
+    def close(self):
+        pass
+
+
 class TestHttpRunner(unittest.TestCase):
     def setUp(self):
         loader.project_meta = None
@@ -38,3 +60,159 @@ class TestHttpRunner(unittest.TestCase):
         self.assertTrue(os.path.exists("tests/data/debugtalk.py"))
         self.assertTrue(os.path.exists("tests/data/a_b_c/T1_test.py"))
         self.assertTrue(os.path.exists("tests/data/a_b_c/T2_3_test.py"))
+
+    def test_run_testcase_repeatedly(self):
+        testcase = loader.load_testcase(
+            {
+                "config": {"name": "echo", "base_url": "http://echo.local"},
+                "teststeps": [
+                    {
+                        "name": "get user",
+                        "variables": {"uid": "${gen_uid()}"},
+                        "request": {"method": "GET", "url": "/users/$uid"},
+                        "extract": {"url": "body.url"},
+                        "validate": [{"eq": ["status_code", 200]}],
+                    },
+                    {
+                        "name": "echo url",
+                        "request": {"method": "GET", "url": "/echo?from=$url"},
+                        "validate": [{"startswith": ["body.url", "http://echo.local"]}],
+                    },
+                ],
+            }
+        )
+        uid_list = iter(range(100, 110))
+        project_meta = ProjectMeta(functions={"gen_uid": lambda: next(uid_list)})
+        session = HttpSession()
+        session.mount("http://", EchoAdapter())
+        runner = HttpRunner().with_project_meta(project_meta).with_session(session)
+
+        for uid in range(100, 103):
+            runner.run_testcase(testcase)
+            step_datas = runner.get_step_datas()
+            self.assertTrue(runner.success)
+            self.assertEqual(
+                step_datas[0].export_vars, {"url": f"http://echo.local/users/{uid}"}
+            )
+
+        # teststeps are not modified by runs
+        self.assertEqual(testcase.teststeps[0].variables, {"uid": "${gen_uid()}"})
+        self.assertEqual(testcase.teststeps[1].variables, {})
+
+    def test_run_testcase_state_not_shared(self):
+        testcase = loader.load_testcase(
+            {
+                "config": {"name": "echo", "base_url": "http://echo.local"},
+                "teststeps": [
+                    {
+                        "name": "get user",
+                        "request": {"method": "GET", "url": "/users/100"},
+                        "validate": [{"eq": ["status_code", 200]}],
+                    },
+                ],
+            }
+        )
+        project_meta = ProjectMeta(functions={})
+        summaries = []
+        for _ in range(2):
+            session = HttpSession()
+            session.mount("http://", EchoAdapter())
+            runner = HttpRunner().with_project_meta(project_meta).with_session(session)
+            self.assertEqual(runner.get_step_datas(), [])
+            runner.run_testcase(testcase)
+            summaries.append(runner.get_summary())
+
+        self.assertIsNot(summaries[0].connection_stat, summaries[1].connection_stat)
+        self.assertIsNot(summaries[0].memoize_stats, summaries[1].memoize_stats)
+        self.assertEqual(len(summaries[1].step_datas), 1)
+
+        # state of runs is kept in runner instances, not in class attributes
+        self.assertIsNone(HttpRunner._HttpRunner__connection_stat)
+        self.assertIsNone(HttpRunner._HttpRunner__memoize_stats)
+        self.assertIsNone(HttpRunner._HttpRunner__unrecorded_req_resps)
+
+    def test_run_testcase_with_request_listener(self):
+        testcase = loader.load_testcase(
+            {
+                "config": {
+                    "name": "echo",
+                    "base_url": "http://echo.local",
+                    "variables": {"uid": 100},
+                },
+                "teststeps": [
+                    {
+                        "name": "get user",
+                        "request": {"method": "GET", "url": "/users/$uid"},
+                        "validate": [{"eq": ["status_code", 200]}],
+                    },
+                    {
+                        "name": "get user again",
+                        "request": {"method": "GET", "url": "/users/$uid"},
+                        "validate": [{"eq": ["status_code", 404]}],
+                    },
+                ],
+            }
+        )
+        session = HttpSession()
+        session.mount("http://", EchoAdapter())
+        events = []
+
+        def listener(**kwargs):
+            events.append(kwargs)
+
+        runner = (
+            HttpRunner()
+            .with_project_meta(ProjectMeta())
+            .with_session(session)
+            .with_variables({})
+            .with_request_listener(listener)
+        )
+        with self.assertRaises(ValidationFailure):
+            runner.run_testcase(testcase)
+
+        # one request event per step, failed validation is failure of the step
+        self.assertEqual(
+            [event["name"] for event in events], ["get user", "get user again"]
+        )
+        self.assertEqual(events[0]["request_type"], "GET")
+        self.assertIsNone(events[0]["exception"])
+        self.assertIsInstance(events[1]["exception"], ValidationFailure)
+        content = json.dumps({"url": "http://echo.local/users/100"})
+        self.assertEqual(events[0]["response_length"], len(content))
+        self.assertGreater(events[0]["response_time"], 0)
+
+        # named by url template
+        events.clear()
+        runner.with_request_listener(listener, name_by_url=True)
+        with self.assertRaises(ValidationFailure):
+            runner.run_testcase(testcase)
+        self.assertEqual([event["name"] for event in events], ["/users/$uid"] * 2)
+
+    def test_run_testcase_session_error(self):
+        testcase = loader.load_testcase(
+            {
+                "config": {"name": "error", "base_url": "http://echo.local"},
+                "teststeps": [
+                    {"name": "get", "request": {"method": "GET", "url": "/get"}}
+                ],
+            }
+        )
+
+        class ErrorSession(object):
+            def request(self, method, url, **kwargs):
+                raise RuntimeError("session error")
+
+        runner = (
+            HttpRunner()
+            .with_project_meta(ProjectMeta())
+            .with_session(ErrorSession())
+            .with_variables({})
+        )
+        try:
+            runner.run_testcase(testcase)
+        except RuntimeError as ex:
+            # memoize scope of the run is exited, while traceback is still alive
+            self.assertIsNotNone(ex.__traceback__)
+            self.assertIsNone(memoization.testcase_scope.get())
+        else:
+            self.fail("RuntimeError not raised")
@@ -1,8 +1,12 @@
 import decimal
+import itertools
 import json
 import os
+import time
 import unittest
 
+import requests
+
 from httprunner import loader, utils
 from httprunner.utils import (
     ExtendJSONEncoder,
@@ -152,3 +156,116 @@ class TestUtils(unittest.TestCase):
         parameters_content_list = []
         product_list = utils.gen_cartesian_product(*parameters_content_list)
         self.assertEqual(product_list, [])
+
+    def test_cartesian_product_lazy(self):
+        parameters_content_list = [
+            [{"a": 1}, {"a": 2}, {"a": 3}],
+            [{"x": 111, "y": 112}, {"x": 121, "y": 122}],
+            [{"b": 1}, {"b": 2}],
+        ]
+        product = utils.CartesianProduct(*parameters_content_list)
+        product_list = utils.gen_cartesian_product(*parameters_content_list)
+        self.assertEqual(len(product), 12)
+        self.assertEqual(list(product), product_list)
+        self.assertEqual(product[5], product_list[5])
+        self.assertEqual(product[-1], product_list[-1])
+        self.assertEqual(list(product[2:9:3]), product_list[2:9:3])
+        self.assertEqual(list(product.shard(1, 5)), product_list[1::5])
+
+        # compared with sequence of combinations
+        self.assertEqual(product, product_list)
+        self.assertEqual(product[2:9:3], tuple(product_list[2:9:3]))
+        self.assertNotEqual(product, product_list[:-1])
+        self.assertNotEqual(product, "abc")
+
+        sampled = product.sample(4, seed=1)
+        self.assertEqual(len(sampled), 4)
+        self.assertEqual(list(product.sample(4, seed=1)), list(sampled))
+        for item in sampled:
+            self.assertIn(item, product_list)
+
+        self.assertEqual(len(utils.CartesianProduct()), 0)
+        self.assertEqual(len(utils.CartesianProduct([{"a": 1}], [])), 0)
+
+    def test_cartesian_product_not_expanded(self):
+        parameters_content_list = [
+            [{f"p{index}": value} for value in range(1000)] for index in range(3)
+        ]
+        product = utils.CartesianProduct(*parameters_content_list)
+        self.assertEqual(len(product), 1000 ** 3)
+        self.assertEqual(product[123456789], {"p0": 123, "p1": 456, "p2": 789})
+        self.assertEqual(len(product[::1000]), 1000 ** 2)
+
+    def test_cartesian_product_pairwise(self):
+        parameters_content_list = [
+            [{"a": value} for value in range(3)],
+            [{"b": value} for value in range(4)],
+            [{"c": value} for value in range(5)],
+            [{"d": value} for value in range(2)],
+        ]
+        product = utils.CartesianProduct(*parameters_content_list)
+        pairwise_list = list(product.pairwise())
+        self.assertLess(len(pairwise_list), len(product))
+
+        for key1, key2 in itertools.combinations("abcd", 2):
+            covered = {(item[key1], item[key2]) for item in pairwise_list}
+            self.assertEqual(
+                len(covered),
+                len(parameters_content_list["abcd".index(key1)])
+                * len(parameters_content_list["abcd".index(key2)]),
+            )
+
+        # all combinations are needed for less than 3 parameters lists
+        product = utils.CartesianProduct(*parameters_content_list[:2])
+        self.assertEqual(list(product.pairwise()), list(product))
+
+    def test_cartesian_product_pairwise_large(self):
+        # e.g. two csv files of hundreds of rows after a small parameters list
+        parameters_content_list = [
+            [{"a": value} for value in range(3)],
+            [{"b": value} for value in range(100)],
+            [{"c": value} for value in range(250)],
+            [{"d": value} for value in range(4)],
+        ]
+        product = utils.CartesianProduct(*parameters_content_list)
+        start_at = time.time()
+        pairwise_list = list(product.pairwise())
+        self.assertLess(time.time() - start_at, 5)
+        self.assertLess(len(pairwise_list), len(product))
+
+        for key1, key2 in itertools.combinations("abcd", 2):
+            covered = {(item[key1], item[key2]) for item in pairwise_list}
+            self.assertEqual(
+                len(covered),
+                len(parameters_content_list["abcd".index(key1)])
+                * len(parameters_content_list["abcd".index(key2)]),
+            )
+
+    def test_load_response_json(self):
+        resp = requests.Response()
+        resp.encoding = "utf-8"
+        resp._content = json.dumps({"name": "中文"}).encode("utf-8")
+        body = utils.load_response_json(resp)
+        self.assertEqual(body, {"name": "中文"})
+        # decoded only once
+        self.assertIs(utils.load_response_json(resp), body)
+
+        resp = requests.Response()
+        resp.encoding = "gbk"
+        resp._content = '{"name": "中文"}'.encode("gbk")
+        self.assertEqual(utils.load_response_json(resp), {"name": "中文"})
+
+        resp = requests.Response()
+        resp._content = b"<html></html>"
+        with self.assertRaises(ValueError):
+            utils.load_response_json(resp)
+        with self.assertRaises(ValueError):
+            utils.load_response_json(resp)
+
+        # integers larger than 64 bits
+        resp = requests.Response()
+        resp.encoding = "utf-8"
+        resp._content = b'{"id": 123456789012345678901234567890}'
+        self.assertEqual(
+            utils.load_response_json(resp), {"id": 123456789012345678901234567890}
+        )